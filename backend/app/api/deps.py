@@ -1,24 +1,85 @@
+import hashlib
+import time
+from typing import Optional
 from fastapi import Depends,HTTPException,status
+from starlette.requests import HTTPConnection
 from fastapi.security import HTTPBearer , HTTPAuthorizationCredentials
+from jose import jwt, JWTError, ExpiredSignatureError
+from supabase import AuthApiError
 from app.db.supabase_client import get_global_supabase
 from app.core.config import settings
+from app.core.rate_limit import limiter, route_limit
+from app.core.tracing import span
+from app.services.auth_service import verify_token, user_from_claims
+from app.utils.ttl_cache import TTLCache
 
 security = HTTPBearer(auto_error=False)
 
+user_cache = TTLCache(
+    "auth_user",
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+    max_bytes=settings.AUTH_USER_CACHE_MAX_BYTES,
+    default_ttl=settings.AUTH_USER_CACHE_TTL_SECONDS,
+)
+
 async def get_current_user(
+    request: HTTPConnection,
     token : HTTPAuthorizationCredentials = Depends(security)
 ):
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Credentials")
-    
+    return await authenticate(token.credentials, request)
+
+async def _verified_claims(access_token: str, connection: Optional[HTTPConnection] = None):
+    # the rate limiter runs first and already checked this token; its claims are kept on the request
+    stashed = getattr(connection.state, "token_claims", None) if connection is not None else None
+    if stashed is not None and stashed[0] == access_token:
+        return stashed[1]
+    with span("auth.verify"):
+        claims = await verify_token(access_token)
+    if connection is not None:
+        connection.state.token_claims = (access_token, claims)
+    return claims
+
+async def authenticate(access_token: str, connection: Optional[HTTPConnection] = None):
+    """The user for a bearer token; 401 when it doesn't check out."""
+    if settings.AUTH_VERIFY_MODE == "local":
+        try:
+            claims = await _verified_claims(access_token, connection)
+            return user_from_claims(claims)
+        except ExpiredSignatureError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired")
+        except JWTError:
+            if not settings.AUTH_REMOTE_FALLBACK:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    return await user_cache.get_or_load(key, lambda: _load_user_remote(access_token))
+
+def _token_ttl(access_token: str):
+    # never keep a user around longer than the token it was resolved from
+    try:
+        exp = jwt.get_unverified_claims(access_token).get("exp")
+    except JWTError:
+        return None
+    return exp - time.time() if exp else None
+
+async def _load_user_remote(access_token: str):
+    user = await _get_user_remote(access_token)
+    size = len(access_token) + len(user["raw_data"].model_dump_json())
+    return user, _token_ttl(access_token), size
+
+async def _get_user_remote(access_token: str):
     supabase = get_global_supabase()
     if supabase is None:
         raise HTTPException(status_code=500,detail="Supabase client not initialized")
 
-    access_token = token.credentials
-    
-    resp = await supabase.auth.get_user(access_token)
-    
+    try:
+        with span("auth.get_user"):
+            resp = await supabase.auth.get_user(access_token)
+    except AuthApiError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,detail="Invalid token")
+
     _user = None
     if resp is not None and hasattr(resp, "user") and resp.user is not None:
         _user = resp.user
@@ -30,5 +91,39 @@ async def get_current_user(
         "email" : _user.email,
         "raw_data" : _user
     }
-        
-        
+
+# Not worth a bucket: health check and scrapes
+RATE_LIMIT_EXEMPT = {"/", "/metrics"}
+
+async def _rate_limit_key(request: HTTPConnection) -> str:
+    # Resolved without any network call: a local JWT check, or the users already
+    # in the auth cache. Anything else is limited by client address.
+    auth = request.headers.get("authorization", "")
+    # /realtime takes the token as a query param (EventSource can't set headers)
+    access_token = auth[7:] if auth[:7].lower() == "bearer " else request.query_params.get("access_token")
+    if access_token:
+        if settings.AUTH_VERIFY_MODE == "local":
+            try:
+                return "user:" + (await _verified_claims(access_token, request))["sub"]
+            except JWTError:
+                pass
+        else:
+            user = user_cache.get(hashlib.sha256(access_token.encode()).hexdigest())
+            if user is not None:
+                return f"user:{user['id']}"
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+async def rate_limit(request: HTTPConnection):
+    # HTTPConnection so the same dependency also covers the websocket handshake
+    route = request.scope.get("route")
+    route_path = getattr(route, "path", request.url.path)
+    if not settings.RATE_LIMIT_ENABLED or route_path in RATE_LIMIT_EXEMPT:
+        return
+    scope, limit = route_limit(request.scope.get("method", "GET"), route_path)
+    allowed, retry_after = limiter.hit(scope, await _rate_limit_key(request), limit)
+    if not allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded",
+            headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+        )
@@ -5,7 +5,10 @@ def supabase_error_to_http(exc: Exception, fallback_message: str = "Service erro
     msg = str(exc)
     if "permission denied" in msg.lower():
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-    if "duplicate key value" in msg.lower():
+    if "duplicate key value" in msg.lower() or "unique constraint failed" in msg.lower():
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Conflict: duplicate")
+    if "foreign key constraint" in msg.lower():
+        # e.g. a todo linked to a study plan that doesn't exist or isn't the caller's
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Linked item not found")
     # default
     raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=fallback_message)
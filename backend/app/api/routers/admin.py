@@ -1,15 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
 from app.api.deps import get_current_user
+from app.core.config import settings
+from app.schemas.admin import AdminStatsOut
+from app.services.admin_stats import admin_stats, bucketed
 from app.utils.roles import require_admin
-from app.db.supabase_client import get_global_supabase
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-@router.get("/stats")
-async def stats(user=Depends(get_current_user)):
+@router.get("/stats", response_model=AdminStatsOut)
+async def stats(
+    user=Depends(get_current_user),
+    days: int = Query(30, ge=1, le=settings.ADMIN_STATS_SERIES_DAYS),
+    bucket: Literal["day", "week", "month"] = "day"
+):
+    """Precomputed counters, at most ADMIN_STATS_MAX_STALENESS_SECONDS old (see `age_seconds`)."""
     require_admin(user)
-    supabase = get_global_supabase()
-    # Example stats: total users, total items
-    users_count = await supabase.table("auth.users").select("id", count="exact").execute()
-    # adapt to your SDK's response shape
-    return {"users": users_count}
+    snapshot = await admin_stats.get()
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    return {
+        "totals": snapshot["totals"],
+        "active_users": {
+            "last_7_days": snapshot["active_users_7d"],
+            "last_30_days": snapshot["active_users_30d"],
+        },
+        "series": bucketed(snapshot["daily"], since, bucket),
+        "bucket": bucket,
+        "generated_at": snapshot["generated_at"],
+        "age_seconds": round(admin_stats.age(), 3),
+    }
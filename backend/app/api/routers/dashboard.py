@@ -0,0 +1,77 @@
+# app/api/routers/dashboard.py
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Dict
+from fastapi import APIRouter, Depends, Request
+from pydantic import TypeAdapter
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.db.repository import todos_repo, study_plans_repo, events_repo, marketplace_repo
+from app.schemas.dashboard import DashboardOut
+from app.utils.etag import conditional_response
+from app.utils.recurrence import expand, span_filter
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+logger = logging.getLogger("taskhive.dashboard")
+
+_dashboard_adapter = TypeAdapter(DashboardOut)
+
+OVERDUE_LIMIT = 10
+NEXT_EVENTS_LIMIT = 5
+NEXT_EVENTS_HORIZON = timedelta(days=90)
+STUDY_PLANS_LIMIT = 10
+
+async def _next_events(user_id: str, now: datetime):
+    rows = events_repo.iter_all(
+        user_id=user_id, filters=[span_filter(now)], order="starts_at", desc=False, page_size=NEXT_EVENTS_LIMIT * 4
+    )
+    upcoming = []
+    async for occurrence in expand(rows, now, now + NEXT_EVENTS_HORIZON):
+        upcoming.append(occurrence)
+        if len(upcoming) == NEXT_EVENTS_LIMIT:
+            break
+    return upcoming
+
+async def _bounded(name: str, query: Awaitable[Any]):
+    """(name, result); result is None when the query fails or times out, so the rest can still be served."""
+    try:
+        return name, await asyncio.wait_for(query, settings.DASHBOARD_QUERY_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("dashboard query timed out", extra={"section": name})
+    except Exception:
+        logger.exception("dashboard query failed", extra={"section": name})
+    return name, None
+
+@router.get("", response_model=DashboardOut)
+async def get_dashboard(request: Request, user=Depends(get_current_user)):
+    """Everything the home screen needs in one round trip; the queries run concurrently."""
+    user_id = user["id"]
+    now = datetime.now(timezone.utc)
+    open_todos = [("completed", "eq", False)]
+    overdue = [*open_todos, ("due_date", "lt", now.isoformat())]
+    queries: Dict[str, Awaitable[Any]] = {
+        "counts.open_todos": todos_repo.count(user_id=user_id, filters=open_todos),
+        "counts.overdue_todos": todos_repo.count(user_id=user_id, filters=overdue),
+        "counts.study_plans": study_plans_repo.count(user_id=user_id),
+        "counts.upcoming_events": events_repo.count(user_id=user_id, filters=[span_filter(now)]),
+        "counts.marketplace_listings": marketplace_repo.count(user_id=user_id, filters=[("available", "eq", True)]),
+        "overdue_todos": todos_repo.list(
+            user_id=user_id, filters=overdue, order="due_date", desc=False, limit=OVERDUE_LIMIT
+        ),
+        "next_events": _next_events(user_id, now),
+        "study_plans": study_plans_repo.list(
+            user_id=user_id, filters=[("status", "neq", "completed")], limit=STUDY_PLANS_LIMIT
+        ),
+    }
+    results = dict(await asyncio.gather(*(_bounded(name, query) for name, query in queries.items())))
+
+    payload = {
+        "counts": {name[len("counts."):]: value for name, value in results.items() if name.startswith("counts.")},
+        "overdue_todos": results["overdue_todos"],
+        "next_events": results["next_events"],
+        "study_plans": results["study_plans"],
+        "unavailable": [name for name, value in results.items() if value is None],
+    }
+    return conditional_response(request, payload, _dashboard_adapter)
@@ -1,71 +1,183 @@
 # app/api/routers/events.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
+from pydantic import TypeAdapter
 from app.api.deps import get_current_user
-from app.db.supabase_client import get_global_supabase
-from app.schemas.event import EventCreate, EventUpdate, EventOut
+from app.core.cache import feed_cache
+from app.db.repository import events_repo
+from app.services.realtime import publish_batch, publish_change
+from app.services.batch import batch_create, batch_update, batch_delete
+from app.services.updates import conditional_update, update_response
+from app.utils.etag import conditional_response
+from app.utils.ical import CALENDAR_FOOTER, CALENDAR_HEADER, vevent
+from app.utils.pagination import next_cursor_headers
+from app.utils.recurrence import expand, series_columns, span_filter, to_utc
+from app.schemas.batch import BatchDelete, BatchResult
+from app.schemas.event import EventBatchUpdate, EventCreate, EventUpdate, EventOut
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+CACHE_NAMESPACE = "events"
+_event_adapter = TypeAdapter(EventOut)
+_event_list_adapter = TypeAdapter(List[EventOut])
+
+RANGE_MAX_DAYS = 400
+RANGE_PAGE_SIZE = 200
+# set when /range stopped at `limit` occurrences; ask again with a later `from`
+RANGE_TRUNCATED_HEADER = "X-Range-Truncated"
+# the public feed leaves out events that ended more than this long ago
+FEED_HISTORY_DAYS = 30
+ICAL_PAGE_SIZE = 500
+
+async def _ical(rows, host: str):
+    yield CALENDAR_HEADER
+    async for row in rows:
+        yield vevent(row, host)
+    yield CALENDAR_FOOTER
+
+def _ical_response(rows, request: Request, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        _ical(rows, request.url.hostname or "taskhive"),
+        media_type="text/calendar; charset=utf-8",
+        headers={"Content-Disposition": f'inline; filename="{filename}"'},
+    )
+
 @router.post("/", response_model=EventOut, status_code=status.HTTP_201_CREATED)
 async def create_event(payload: EventCreate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    resp = await supabase.table("events").insert({
-        "user_id": user["id"],
-        "title": payload.title,
-        "description": payload.description,
-        "starts_at": payload.starts_at,
-        "ends_at": payload.ends_at,
-        "location": payload.location
-    }).select("*").execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data or len(data) == 0:
+    values = payload.model_dump(mode="json")
+    data = await events_repo.create(user["id"], {**values, **series_columns(values)})
+    if not data:
         raise HTTPException(status_code=500, detail="Failed to create event")
-    return data[0]
+    await publish_change(events_repo.table, "create", user["id"], row=data)
+    await feed_cache.invalidate(CACHE_NAMESPACE)
+    return data
 
 @router.get("/", response_model=List[EventOut])
 async def list_events(
+    request: Request,
     limit: int = Query(20, ge=1, le=100),
     offset: int = 0,
+    cursor: Optional[str] = None,
     upcoming: Optional[bool] = None
 ):
-    supabase = get_global_supabase()
-    query = supabase.table("events").select("*")
-    if upcoming is True:
-        # This uses Supabase filter; older SDKs require different syntax; this is the intended logic.
-        query = query.gt("starts_at", "now()")
-    resp = await query.order("starts_at", {"ascending": True}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+    async def load():
+        filters = []
+        if upcoming is True:
+            filters.append(("starts_at", "gt", datetime.now(timezone.utc).isoformat()))
+        page = await events_repo.page(
+            filters=filters, order="starts_at", desc=False, limit=limit, offset=offset, cursor=cursor
+        )
+        return page.rows, next_cursor_headers(page)
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _event_list_adapter, load)
 
 @router.get("/mine", response_model=List[EventOut])
-async def list_my_events(user=Depends(get_current_user), limit: int = Query(50, ge=1, le=200), offset: int = 0):
-    supabase = get_global_supabase()
-    resp = await supabase.table("events").select("*").eq("user_id", user["id"]).order("starts_at", {"ascending": False}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+async def list_my_events(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = 0,
+    cursor: Optional[str] = None
+):
+    page = await events_repo.page(
+        user_id=user["id"], order="starts_at", desc=True, limit=limit, offset=offset, cursor=cursor
+    )
+    return conditional_response(request, page.rows, _event_list_adapter, next_cursor_headers(page))
+
+@router.get("/range", response_model=List[EventOut])
+async def list_events_in_range(
+    request: Request,
+    from_: datetime = Query(..., alias="from"),
+    to: datetime = Query(...),
+    limit: int = Query(500, ge=1, le=2000)
+):
+    """
+    Every occurrence overlapping [from, to), ordered by start. Recurring events
+    appear once per occurrence with starts_at/ends_at shifted to it.
+    """
+    start, end = to_utc(from_), to_utc(to)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'to' must be after 'from'")
+    if end - start > timedelta(days=RANGE_MAX_DAYS):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Range is limited to {RANGE_MAX_DAYS} days")
+
+    async def load():
+        rows = events_repo.iter_all(
+            filters=[span_filter(start, end)],
+            order="starts_at", desc=False, page_size=RANGE_PAGE_SIZE,
+        )
+        occurrences = []
+        # series pages are only fetched while more occurrences are needed
+        async for occurrence in expand(rows, start, end):
+            if len(occurrences) == limit:
+                return occurrences, {RANGE_TRUNCATED_HEADER: "true"}
+            occurrences.append(occurrence)
+        return occurrences, {}
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _event_list_adapter, load)
+
+@router.get("/feed.ics")
+async def events_calendar(request: Request):
+    since = datetime.now(timezone.utc) - timedelta(days=FEED_HISTORY_DAYS)
+    rows = events_repo.iter_all(
+        filters=[span_filter(since)], order="starts_at", desc=False, page_size=ICAL_PAGE_SIZE
+    )
+    return _ical_response(rows, request, "events.ics")
+
+@router.get("/mine.ics")
+async def my_events_calendar(request: Request, user=Depends(get_current_user)):
+    rows = events_repo.iter_all(user_id=user["id"], order="starts_at", desc=False, page_size=ICAL_PAGE_SIZE)
+    return _ical_response(rows, request, "my-events.ics")
+
+# Batch routes are declared before /{event_id} so "batch" isn't parsed as an id.
+@router.post("/batch", response_model=BatchResult)
+async def create_events_batch(items: List[EventCreate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_create(events_repo, user["id"], items, series_columns)
+    await publish_batch(events_repo.table, "create", user["id"], result)
+    await feed_cache.invalidate(CACHE_NAMESPACE)
+    return result
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_events_batch(items: List[EventBatchUpdate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_update(events_repo, user["id"], items, series_columns)
+    await publish_batch(events_repo.table, "update", user["id"], result)
+    await feed_cache.invalidate(CACHE_NAMESPACE)
+    return result
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_events_batch(payload: BatchDelete, user=Depends(get_current_user)):
+    result = await batch_delete(events_repo, user["id"], payload.ids)
+    await publish_batch(events_repo.table, "delete", user["id"], result)
+    await feed_cache.invalidate(CACHE_NAMESPACE)
+    return result
 
 @router.get("/{event_id}", response_model=EventOut)
-async def get_event(event_id: int):
-    supabase = get_global_supabase()
-    resp = await supabase.table("events").select("*").eq("id", event_id).single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-    return data
+async def get_event(event_id: int, request: Request):
+    async def load():
+        data = await events_repo.get(event_id)
+        if not data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
+        return data, {}
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _event_adapter, load)
 
 @router.patch("/{event_id}", response_model=EventOut)
-async def update_event(event_id: int, payload: EventUpdate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    updates = payload.model_dump(exclude_unset=True)
-    resp = await supabase.table("events").update(updates).eq("id", event_id).eq("user_id", user["id"]).select("*").single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found or not allowed")
-    return data
+async def update_event(event_id: int, payload: EventUpdate, request: Request, user=Depends(get_current_user)):
+    data, changed = await conditional_update(
+        request, events_repo, event_id, user["id"], payload, _event_adapter, "Event not found or not allowed",
+        derive=series_columns,
+    )
+    if changed:
+        await publish_change(events_repo.table, "update", user["id"], row=data)
+        await feed_cache.invalidate(CACHE_NAMESPACE)
+    return update_response(request, data, _event_adapter, changed)
 
 @router.delete("/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_event(event_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    await supabase.table("events").delete().eq("id", event_id).eq("user_id", user["id"]).execute()
+    if not await events_repo.delete(event_id, user["id"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found or not allowed")
+    await publish_change(events_repo.table, "delete", user["id"], ids=[event_id])
+    await feed_cache.invalidate(CACHE_NAMESPACE)
     return None
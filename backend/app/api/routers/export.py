@@ -0,0 +1,75 @@
+# app/api/routers/export.py
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Literal
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from app.api.deps import get_current_user
+from app.db.repository import todos_repo, study_plans_repo, events_repo, marketplace_repo
+from app.utils.decimal_encoder import dumps
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# (record type, repository, keyset order column)
+SOURCES = [
+    ("todo", todos_repo, "created_at"),
+    ("study_plan", study_plans_repo, "created_at"),
+    ("event", events_repo, "starts_at"),
+    ("marketplace_item", marketplace_repo, "created_at"),
+]
+
+EXPORT_PAGE_SIZE = 500
+
+def _csv_columns():
+    columns = ["type"]
+    for _, repo, _ in SOURCES:
+        columns.extend(c for c in repo.out_model.model_fields if c not in columns)
+    return columns
+
+CSV_COLUMNS = _csv_columns()
+
+async def _rows(user_id: str):
+    for kind, repo, order in SOURCES:
+        async for row in repo.iter_all(user_id=user_id, order=order, desc=False, page_size=EXPORT_PAGE_SIZE):
+            yield kind, row
+
+async def _ndjson(user_id: str):
+    async for kind, row in _rows(user_id):
+        yield dumps({"type": kind, **row}) + "\n"
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return dumps(value)
+    return value
+
+async def _csv(user_id: str):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+
+    def flush():
+        out = buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+        return out
+
+    writer.writerow(CSV_COLUMNS)
+    yield flush()
+    async for kind, row in _rows(user_id):
+        row = {**row, "type": kind}
+        writer.writerow([_csv_cell(row.get(c)) for c in CSV_COLUMNS])
+        yield flush()
+
+@router.get("")
+async def export_data(format: Literal["ndjson", "csv"] = "ndjson", user=Depends(get_current_user)):
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d")
+    if format == "csv":
+        body, media_type = _csv(user["id"]), "text/csv"
+    else:
+        body, media_type = _ndjson(user["id"]), "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="taskhive-export-{stamp}.{format}"'}
+    return StreamingResponse(body, media_type=media_type, headers=headers)
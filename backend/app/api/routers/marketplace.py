@@ -1,73 +1,131 @@
 # app/api/routers/marketplace.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from decimal import Decimal
+from typing import List, Literal, Optional
+from pydantic import TypeAdapter
 from app.api.deps import get_current_user
-from app.db.supabase_client import get_global_supabase
+from app.core.cache import feed_cache
+from app.db.repository import marketplace_repo
+from app.services.realtime import publish_change
+from app.services.updates import conditional_update, update_response
+from app.utils.etag import conditional_response
+from app.utils.media import is_user_path
+from app.utils.pagination import next_cursor_headers
 from app.schemas.marketplace import MarketplaceItemCreate, MarketplaceItemUpdate, MarketplaceItemOut
 
 router = APIRouter(prefix="/marketplace", tags=["marketplace"])
 
+CACHE_NAMESPACE = "marketplace"
+_item_adapter = TypeAdapter(MarketplaceItemOut)
+_item_list_adapter = TypeAdapter(List[MarketplaceItemOut])
+
+# sort name -> (order column, descending); each has a matching (available, column, id) index
+SEARCH_SORTS = {
+    "recent": ("created_at", True),
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+}
+
+def _check_image_path(image_path, user):
+    # listings may only point at images the seller uploaded (see /storage/presign)
+    if image_path and not is_user_path(user["id"], image_path):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="image_path must be one of your uploads")
+
 @router.post("/", response_model=MarketplaceItemOut, status_code=status.HTTP_201_CREATED)
 async def create_item(payload: MarketplaceItemCreate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    price_val = str(payload.price) if isinstance(payload.price, Decimal) else payload.price
-    resp = await supabase.table("marketplace_items").insert({
-        "user_id": user["id"],
-        "title": payload.title,
-        "description": payload.description,
-        "price": price_val,
-        "available": payload.available
-    }).select("*").execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data or len(data) == 0:
+    _check_image_path(payload.image_path, user)
+    # mode="json" keeps price as a string so no precision is lost on the way to numeric(12,2)
+    data = await marketplace_repo.create(user["id"], payload.model_dump(mode="json"))
+    if not data:
         raise HTTPException(status_code=500, detail="Failed to create marketplace item")
-    return data[0]
+    await publish_change(marketplace_repo.table, "create", user["id"], row=data)
+    await feed_cache.invalidate(CACHE_NAMESPACE)
+    return data
 
 @router.get("/", response_model=List[MarketplaceItemOut])
 async def list_items(
+    request: Request,
     limit: int = Query(20, ge=1, le=100),
     offset: int = 0,
+    cursor: Optional[str] = None,
     available: Optional[bool] = True
 ):
-    supabase = get_global_supabase()
-    query = supabase.table("marketplace_items").select("*")
-    if available is not None:
-        query = query.eq("available", available)
-    resp = await query.order("created_at", {"ascending": False}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+    async def load():
+        filters = [("available", "eq", available)] if available is not None else []
+        page = await marketplace_repo.page(
+            filters=filters, order="created_at", desc=True, limit=limit, offset=offset, cursor=cursor
+        )
+        return page.rows, next_cursor_headers(page)
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _item_list_adapter, load)
 
 @router.get("/mine", response_model=List[MarketplaceItemOut])
-async def list_my_items(user=Depends(get_current_user), limit: int = Query(50, ge=1, le=200), offset: int = 0):
-    supabase = get_global_supabase()
-    resp = await supabase.table("marketplace_items").select("*").eq("user_id", user["id"]).order("created_at", {"ascending": False}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+async def list_my_items(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = 0,
+    cursor: Optional[str] = None
+):
+    page = await marketplace_repo.page(
+        user_id=user["id"], order="created_at", desc=True, limit=limit, offset=offset, cursor=cursor
+    )
+    return conditional_response(request, page.rows, _item_list_adapter, next_cursor_headers(page))
+
+@router.get("/search", response_model=List[MarketplaceItemOut])
+async def search_items(
+    request: Request,
+    q: Optional[str] = Query(None, max_length=200),
+    min_price: Optional[Decimal] = Query(None, ge=0),
+    max_price: Optional[Decimal] = Query(None, ge=0),
+    sort: Literal["recent", "price_asc", "price_desc"] = "recent",
+    available: Optional[bool] = True,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None
+):
+    """Web-search syntax in `q` ("calculator -broken", "\"lab coat\""); matches title and description."""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="min_price is greater than max_price")
+
+    async def load():
+        filters = [("available", "eq", available)] if available is not None else []
+        if q and q.strip():
+            filters.append(("search", "wfts(english)", q.strip()))
+        if min_price is not None:
+            filters.append(("price", "gte", str(min_price)))
+        if max_price is not None:
+            filters.append(("price", "lte", str(max_price)))
+        order, desc = SEARCH_SORTS[sort]
+        page = await marketplace_repo.page(filters=filters, order=order, desc=desc, limit=limit, cursor=cursor)
+        return page.rows, next_cursor_headers(page)
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _item_list_adapter, load)
 
 @router.get("/{item_id}", response_model=MarketplaceItemOut)
-async def get_item(item_id: int):
-    supabase = get_global_supabase()
-    resp = await supabase.table("marketplace_items").select("*").eq("id", item_id).single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
-    return data
+async def get_item(item_id: int, request: Request):
+    async def load():
+        data = await marketplace_repo.get(item_id)
+        if not data:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found")
+        return data, {}
+
+    return await feed_cache.respond(request, CACHE_NAMESPACE, _item_adapter, load)
 
 @router.patch("/{item_id}", response_model=MarketplaceItemOut)
-async def update_item(item_id: int, payload: MarketplaceItemUpdate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    updates = payload.model_dump(exclude_unset=True)
-    if "price" in updates:
-        updates["price"] = str(updates["price"])
-    resp = await supabase.table("marketplace_items").update(updates).eq("id", item_id).eq("user_id", user["id"]).select("*").single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found or not allowed")
-    return data
+async def update_item(item_id: int, payload: MarketplaceItemUpdate, request: Request, user=Depends(get_current_user)):
+    _check_image_path(payload.image_path, user)
+    data, changed = await conditional_update(
+        request, marketplace_repo, item_id, user["id"], payload, _item_adapter, "Item not found or not allowed"
+    )
+    if changed:
+        await publish_change(marketplace_repo.table, "update", user["id"], row=data)
+        await feed_cache.invalidate(CACHE_NAMESPACE)
+    return update_response(request, data, _item_adapter, changed)
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(item_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    await supabase.table("marketplace_items").delete().eq("id", item_id).eq("user_id", user["id"]).execute()
+    if not await marketplace_repo.delete(item_id, user["id"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Item not found or not allowed")
+    await publish_change(marketplace_repo.table, "delete", user["id"], ids=[item_id])
+    await feed_cache.invalidate(CACHE_NAMESPACE)
     return None
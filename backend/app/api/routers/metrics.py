@@ -0,0 +1,28 @@
+import secrets
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.core import metrics
+from app.core.config import settings
+
+router = APIRouter(tags=["metrics"])
+
+bearer = HTTPBearer(auto_error=False)
+
+def require_scraper(token: Optional[HTTPAuthorizationCredentials] = Depends(bearer)):
+    # queue depths, cache sizes and route names aren't for the public
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if token is None or not secrets.compare_digest(token.credentials.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+@router.get(
+    "/metrics", response_class=PlainTextResponse, include_in_schema=False, dependencies=[Depends(require_scraper)]
+)
+async def scrape():
+    return metrics.render()
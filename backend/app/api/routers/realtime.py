@@ -0,0 +1,105 @@
+# app/api/routers/realtime.py
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import HTTPConnection
+from app.api.deps import authenticate, security
+from app.core.config import settings
+from app.services.realtime import PUBLIC_TABLES, SlowConsumer, hub, public_channel, user_channel
+
+router = APIRouter(prefix="/realtime", tags=["realtime"])
+
+# WebSocket close code 1013: "try again later"
+WS_TRY_AGAIN_LATER = 1013
+
+async def _user_for(connection: HTTPConnection, credentials: Optional[str]):
+    # EventSource and browser WebSockets can't set headers, so the token may come as ?access_token=
+    if not credentials:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Credentials")
+    return await authenticate(credentials, connection)
+
+def _channels(user, public: bool) -> List[str]:
+    channels = [user_channel(user["id"])]
+    if public:
+        channels += [public_channel(table) for table in sorted(PUBLIC_TABLES)]
+    return channels
+
+@router.get("/sse")
+async def stream_changes(
+    request: Request,
+    token: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    access_token: Optional[str] = None,
+    public: bool = True,
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events. Browsers resend `Last-Event-ID` on reconnect; an
+    `event: reset` means the gap couldn't be replayed and lists should be refetched.
+    """
+    user = await _user_for(request, token.credentials if token else access_token)
+    sub = hub.subscribe(_channels(user, public), last_event_id_header or last_event_id)
+
+    async def frames():
+        try:
+            # tell EventSource how long to wait before reconnecting
+            yield b"retry: 2000\n\n"
+            while True:
+                try:
+                    event = await sub.next(settings.REALTIME_HEARTBEAT_SECONDS)
+                except SlowConsumer:
+                    yield b"event: evicted\ndata: {}\n\n"
+                    return
+                if event is None:
+                    if await request.is_disconnected():
+                        return
+                    yield b": ping\n\n"
+                else:
+                    yield event.sse()
+        finally:
+            hub.unsubscribe(sub)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def websocket_changes(
+    websocket: WebSocket,
+    access_token: Optional[str] = None,
+    public: bool = True,
+    last_event_id: Optional[str] = None,
+):
+    """Same feed as /sse; each message is `{"id", "type", "data"}`, with `{"type": "ping"}` heartbeats."""
+    auth = websocket.headers.get("authorization", "")
+    user = await _user_for(websocket, auth[7:] if auth[:7].lower() == "bearer " else access_token)
+    await websocket.accept()
+    sub = hub.subscribe(_channels(user, public), last_event_id)
+
+    async def watch_disconnect():
+        # clients don't send anything; this only notices when they go away
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+
+    closed = asyncio.create_task(watch_disconnect())
+    try:
+        while not closed.done():
+            try:
+                event = await sub.next(settings.REALTIME_HEARTBEAT_SECONDS)
+            except SlowConsumer:
+                await websocket.close(code=WS_TRY_AGAIN_LATER, reason="slow consumer")
+                return
+            if event is None:
+                await websocket.send_text('{"type":"ping"}')
+            else:
+                await websocket.send_text(f'{{"id":"{event.id}","type":"{event.type}","data":{event.data.decode()}}}')
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: sent after the client had already gone
+        pass
+    finally:
+        closed.cancel()
+        hub.unsubscribe(sub)
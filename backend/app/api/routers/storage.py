@@ -1,15 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status
 from app.api.deps import get_current_user
-from app.services.storage_service import create_presigned_upload
+from app.services.storage_service import StorageUnavailable, storage_signer
+from app.services.thumbnails import thumbnails
+from app.utils.media import is_clean_key, thumbnails_for
 from app.core.config import settings
+from app.schemas.storage import (
+    DownloadUrls, DownloadUrlsRequest, PresignBatch, PresignBatchResult, PresignedUpload,
+    ResumableSession, ResumableUploadCreate, UploadComplete, UploadCompleteResult,
+)
 
 router = APIRouter(prefix="/storage", tags=["storage"])
 
-@router.post("/presign")
+def _check_bucket(bucket: str):
+    if bucket not in settings.STORAGE_BUCKETS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unknown bucket")
+
+def _user_path(user, filename: str) -> str:
+    # everything a user uploads lives under their own folder
+    if not is_clean_key(filename):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid filename")
+    return f"{user['id']}/{filename}"
+
+def _check_own_path(user, path: str):
+    # a path from the client: under the user's folder, with no segment that could climb out of it
+    user_id, _, filename = path.partition("/")
+    if user_id != user["id"]:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not allowed")
+    _user_path(user, filename)
+
+@router.post("/presign", response_model=PresignedUpload)
 async def presign_upload(filename: str, user=Depends(get_current_user), bucket: str = "public", expires: int = 60):
-    path = f"{user['id']}/{filename}"
+    # `expires` is accepted for old clients; Supabase fixes signed upload URLs at two hours.
+    _check_bucket(bucket)
+    path = _user_path(user, filename)
     try:
-        signed = await create_presigned_upload(bucket, path, expires)
-    except Exception as e:
+        return await storage_signer.presign_upload(bucket, path)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception:
         raise HTTPException(status_code=500, detail="Failed to create signed URL")
-    return {"url": signed}
+
+@router.post("/presign/batch", response_model=PresignBatchResult)
+async def presign_upload_batch(payload: PresignBatch, user=Depends(get_current_user)):
+    _check_bucket(payload.bucket)
+    if len(payload.filenames) > settings.STORAGE_PRESIGN_BATCH_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.STORAGE_PRESIGN_BATCH_MAX} files per batch",
+        )
+    paths = [_user_path(user, filename) for filename in payload.filenames]
+    return {"results": await storage_signer.presign_uploads(payload.bucket, paths, payload.upsert)}
+
+@router.post("/uploads/resumable", response_model=ResumableSession, status_code=status.HTTP_201_CREATED)
+async def create_resumable_upload(payload: ResumableUploadCreate, user=Depends(get_current_user)):
+    """
+    A TUS session for large files: POST to `endpoint` with `headers` (which
+    carry Upload-Length from `size`), then PATCH `chunk_size` chunks.
+    Interrupted uploads resume from the server's Upload-Offset.
+    """
+    _check_bucket(payload.bucket)
+    path = _user_path(user, payload.filename)
+    try:
+        return await storage_signer.resumable_session(
+            payload.bucket, path, payload.size, payload.content_type, payload.upsert
+        )
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to create upload session")
+
+@router.post("/download-urls", response_model=DownloadUrls)
+async def signed_download_urls(payload: DownloadUrlsRequest, user=Depends(get_current_user)):
+    _check_bucket(payload.bucket)
+    for path in payload.paths:
+        _check_own_path(user, path)
+    try:
+        urls = await storage_signer.signed_download_urls(payload.bucket, payload.paths, payload.expires_in)
+    except StorageUnavailable as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception:
+        raise HTTPException(status_code=500, detail="Failed to create signed URLs")
+    return {"urls": urls}
+
+@router.post("/uploads/complete", response_model=UploadCompleteResult, status_code=status.HTTP_202_ACCEPTED)
+async def complete_upload(payload: UploadComplete, user=Depends(get_current_user)):
+    """Call after an image upload finishes; thumbnails are generated in the background."""
+    _check_bucket(payload.bucket)
+    _check_own_path(user, payload.path)
+    return {
+        "path": payload.path,
+        "queued": thumbnails.enqueue(payload.bucket, payload.path),
+        "thumbnails": thumbnails_for(payload.path, payload.bucket),
+    }
@@ -1,63 +1,83 @@
 # app/api/routers/study.py
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request
 from typing import List, Optional
+from pydantic import TypeAdapter
 from app.api.deps import get_current_user
-from app.db.supabase_client import get_global_supabase
-from app.schemas.study import StudyPlanCreate, StudyPlanUpdate, StudyPlanOut
+from app.db.repository import study_plans_repo
+from app.services.realtime import publish_batch, publish_change
+from app.services.batch import batch_create, batch_update, batch_delete
+from app.services.updates import conditional_update, update_response
+from app.utils.etag import conditional_response
+from app.utils.pagination import next_cursor_headers
+from app.schemas.batch import BatchDelete, BatchResult
+from app.schemas.study import StudyPlanBatchUpdate, StudyPlanCreate, StudyPlanUpdate, StudyPlanOut
 
 router = APIRouter(prefix="/study", tags=["study"])
 
+_plan_adapter = TypeAdapter(StudyPlanOut)
+_plan_list_adapter = TypeAdapter(List[StudyPlanOut])
+
 @router.post("/", response_model=StudyPlanOut, status_code=status.HTTP_201_CREATED)
 async def create_study_plan(payload: StudyPlanCreate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    resp = await supabase.table("study_plans").insert({
-        "user_id": user["id"],
-        "title": payload.title,
-        "subjects": payload.subjects,
-        "duration": payload.duration,
-        "deadline": payload.deadline
-    }).select("*").execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data or len(data) == 0:
+    data = await study_plans_repo.create(user["id"], payload.model_dump(mode="json"))
+    if not data:
         raise HTTPException(status_code=500, detail="Failed to create study plan")
-    return data[0]
+    await publish_change(study_plans_repo.table, "create", user["id"], row=data)
+    return data
 
 @router.get("/", response_model=List[StudyPlanOut])
 async def list_study_plans(
+    request: Request,
     user=Depends(get_current_user),
     limit: int = Query(20, ge=1, le=100),
     offset: int = 0,
+    cursor: Optional[str] = None,
     status: Optional[str] = None
 ):
-    supabase = get_global_supabase()
-    query = supabase.table("study_plans").select("*").eq("user_id", user["id"])
-    if status:
-        query = query.eq("status", status)
-    resp = await query.order("created_at", {"ascending": False}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+    filters = [("status", "eq", status)] if status else []
+    page = await study_plans_repo.page(
+        user_id=user["id"], filters=filters, order="created_at", desc=True, limit=limit, offset=offset, cursor=cursor
+    )
+    return conditional_response(request, page.rows, _plan_list_adapter, next_cursor_headers(page))
+
+# Batch routes are declared before /{plan_id} so "batch" isn't parsed as an id.
+@router.post("/batch", response_model=BatchResult)
+async def create_study_plans_batch(items: List[StudyPlanCreate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_create(study_plans_repo, user["id"], items)
+    await publish_batch(study_plans_repo.table, "create", user["id"], result)
+    return result
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_study_plans_batch(items: List[StudyPlanBatchUpdate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_update(study_plans_repo, user["id"], items)
+    await publish_batch(study_plans_repo.table, "update", user["id"], result)
+    return result
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_study_plans_batch(payload: BatchDelete, user=Depends(get_current_user)):
+    result = await batch_delete(study_plans_repo, user["id"], payload.ids)
+    await publish_batch(study_plans_repo.table, "delete", user["id"], result)
+    return result
 
 @router.get("/{plan_id}", response_model=StudyPlanOut)
-async def get_study_plan(plan_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    resp = await supabase.table("study_plans").select("*").eq("id", plan_id).eq("user_id", user["id"]).single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
+async def get_study_plan(plan_id: int, request: Request, user=Depends(get_current_user)):
+    data = await study_plans_repo.get(plan_id, user["id"])
     if not data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study plan not found")
-    return data
+    return conditional_response(request, data, _plan_adapter)
 
 @router.patch("/{plan_id}", response_model=StudyPlanOut)
-async def update_study_plan(plan_id: int, payload: StudyPlanUpdate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    updates = payload.model_dump(exclude_unset=True)
-    resp = await supabase.table("study_plans").update(updates).eq("id", plan_id).eq("user_id", user["id"]).select("*").single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study plan not found or not allowed")
-    return data
+async def update_study_plan(plan_id: int, payload: StudyPlanUpdate, request: Request, user=Depends(get_current_user)):
+    data, changed = await conditional_update(
+        request, study_plans_repo, plan_id, user["id"], payload, _plan_adapter, "Study plan not found or not allowed"
+    )
+    if changed:
+        await publish_change(study_plans_repo.table, "update", user["id"], row=data)
+    return update_response(request, data, _plan_adapter, changed)
 
 @router.delete("/{plan_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_study_plan(plan_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    await supabase.table("study_plans").delete().eq("id", plan_id).eq("user_id", user["id"]).execute()
+    if not await study_plans_repo.delete(plan_id, user["id"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Study plan not found or not allowed")
+    await publish_change(study_plans_repo.table, "delete", user["id"], ids=[plan_id])
     return None
@@ -1,56 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import List
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query, Request
+from typing import List, Optional
+from pydantic import TypeAdapter
 from app.api.deps import get_current_user
-from app.schemas.todo import TodoCreate, TodoUpdate, TodoOut
-from app.db.supabase_client import get_global_supabase
+from app.schemas.batch import BatchDelete, BatchResult
+from app.schemas.todo import TodoBatchUpdate, TodoCreate, TodoUpdate, TodoOut
+from app.db.repository import todos_repo
+from app.services.realtime import publish_batch, publish_change
+from app.services.batch import batch_create, batch_update, batch_delete
+from app.services.updates import conditional_update, update_response
+from app.utils.etag import conditional_response
+from app.utils.pagination import next_cursor_headers
 
 router = APIRouter(prefix="/todos", tags=["todos"])
 
+_todo_adapter = TypeAdapter(TodoOut)
+_todo_list_adapter = TypeAdapter(List[TodoOut])
+
 @router.post("/", response_model=TodoOut, status_code=status.HTTP_201_CREATED)
 async def create_todo(payload: TodoCreate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    if supabase is None:
-        raise HTTPException(status_code=500, detail="Supabase client not initialized")
-    resp = await supabase.table("todos").insert({
-        "user_id": user["id"],
-        "title": payload.title,
-        "description": payload.description,
-        "due_date": payload.due_date,
-        "completed": payload.completed
-    }).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
+    data = await todos_repo.create(user["id"], payload.model_dump(mode="json"))
     if not data:
         raise HTTPException(status_code=500, detail="Insert failed")
-    return data[0]
+    await publish_change(todos_repo.table, "create", user["id"], row=data)
+    return data
 
 @router.get("/", response_model=List[TodoOut])
-async def list_todos(user=Depends(get_current_user), limit: int = Query(20, ge=1, le=100), offset: int = 0):
-    supabase = get_global_supabase()
-    resp = await supabase.table("todos").select("*").eq("user_id", user["id"]).order("created_at", {"ascending": False}).limit(limit).offset(offset).execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    return data
+async def list_todos(
+    request: Request,
+    user=Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = 0,
+    cursor: Optional[str] = None
+):
+    page = await todos_repo.page(
+        user_id=user["id"], order="created_at", desc=True, limit=limit, offset=offset, cursor=cursor
+    )
+    return conditional_response(request, page.rows, _todo_list_adapter, next_cursor_headers(page))
+
+# Batch routes are declared before /{todo_id} so "batch" isn't parsed as an id.
+@router.post("/batch", response_model=BatchResult)
+async def create_todos_batch(items: List[TodoCreate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_create(todos_repo, user["id"], items)
+    await publish_batch(todos_repo.table, "create", user["id"], result)
+    return result
+
+@router.patch("/batch", response_model=BatchResult)
+async def update_todos_batch(items: List[TodoBatchUpdate] = Body(...), user=Depends(get_current_user)):
+    result = await batch_update(todos_repo, user["id"], items)
+    await publish_batch(todos_repo.table, "update", user["id"], result)
+    return result
+
+@router.delete("/batch", response_model=BatchResult)
+async def delete_todos_batch(payload: BatchDelete, user=Depends(get_current_user)):
+    result = await batch_delete(todos_repo, user["id"], payload.ids)
+    await publish_batch(todos_repo.table, "delete", user["id"], result)
+    return result
 
 @router.get("/{todo_id}", response_model=TodoOut)
-async def get_todo(todo_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    resp = await supabase.table("todos").select("*").eq("id", todo_id).eq("user_id", user["id"]).single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
+async def get_todo(todo_id: int, request: Request, user=Depends(get_current_user)):
+    data = await todos_repo.get(todo_id, user["id"])
     if not data:
         raise HTTPException(status_code=404, detail="Todo not found")
-    return data
+    return conditional_response(request, data, _todo_adapter)
 
 @router.patch("/{todo_id}", response_model=TodoOut)
-async def update_todo(todo_id: int, payload: TodoUpdate, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    updates = payload.model_dump(exclude_unset=True)
-    resp = await supabase.table("todos").update(updates).eq("id", todo_id).eq("user_id", user["id"]).select("*").single().execute()
-    data = getattr(resp, "data", None) or resp.get("data", None) or resp
-    if not data:
-        raise HTTPException(status_code=404, detail="Todo not found or not allowed")
-    return data
+async def update_todo(todo_id: int, payload: TodoUpdate, request: Request, user=Depends(get_current_user)):
+    data, changed = await conditional_update(
+        request, todos_repo, todo_id, user["id"], payload, _todo_adapter, "Todo not found or not allowed"
+    )
+    if changed:
+        await publish_change(todos_repo.table, "update", user["id"], row=data)
+    return update_response(request, data, _todo_adapter, changed)
 
 @router.delete("/{todo_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_todo(todo_id: int, user=Depends(get_current_user)):
-    supabase = get_global_supabase()
-    await supabase.table("todos").delete().eq("id", todo_id).eq("user_id", user["id"]).execute()
+    if not await todos_repo.delete(todo_id, user["id"]):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Todo not found or not allowed")
+    await publish_change(todos_repo.table, "delete", user["id"], ids=[todo_id])
     return None
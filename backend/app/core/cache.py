@@ -0,0 +1,211 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.utils.etag import etag_for, etag_matches
+from app.utils.responses import serialize
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("taskhive.cache")
+
+# expired counters are swept once there are more than this many
+COUNTER_SWEEP_THRESHOLD = 10_000
+
+
+class MemoryCacheBackend:
+    """Per-process backend. Fine for one worker; other workers only see their own writes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, default_ttl: float):
+        self._entries = TTLCache("response", max_entries, max_bytes, default_ttl)
+        self._counters: Dict[str, Tuple[int, Optional[float]]] = {}  # key -> (value, expires_at)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        self._entries.set(key, value, ttl, size=len(value))
+
+    def _counter(self, key: str, now: float) -> int:
+        value, expires_at = self._counters.get(key, (0, None))
+        if expires_at is not None and expires_at <= now:
+            del self._counters[key]
+            return 0
+        return value
+
+    async def get_int(self, key: str) -> int:
+        return self._counter(key, time.monotonic())
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        now = time.monotonic()
+        value = self._counter(key, now) + amount
+        expires_at = now + ttl if ttl is not None else self._counters.get(key, (0, None))[1]
+        self._counters[key] = (value, expires_at)
+        if len(self._counters) > COUNTER_SWEEP_THRESHOLD:
+            self._sweep(now)
+        return value
+
+    async def incr_many(self, amounts: Sequence[Tuple[str, int]], ttl: float) -> List[int]:
+        """incr() for several keys; one round trip on shared backends."""
+        return [await self.incr(key, amount, ttl=ttl) for key, amount in amounts]
+
+    async def add(self, key: str, ttl: float) -> bool:
+        """Sets `key` only if it isn't set yet; True when this call set it."""
+        now = time.monotonic()
+        if self._counter(key, now):
+            return False
+        self._counters[key] = (1, now + ttl)
+        return True
+
+    async def delete(self, key: str):
+        self._counters.pop(key, None)
+
+    def _sweep(self, now: float):
+        for k in [k for k, (_, exp) in self._counters.items() if exp is not None and exp <= now]:
+            del self._counters[k]
+
+
+class RedisCacheBackend:
+    """Shared backend so every gunicorn worker and node sees the same entries and invalidations."""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as exc:  # pragma: no cover - only when CACHE_BACKEND=redis without redis installed
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from exc
+        self._redis = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._redis.set(key, value, px=int(ttl * 1000))
+
+    async def get_int(self, key: str) -> int:
+        value = await self._redis.get(key)
+        return int(value) if value is not None else 0
+
+    async def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        if ttl is None:
+            return await self._redis.incrby(key, amount)
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.incrby(key, amount)
+            pipe.expire(key, int(ttl))
+            total, _ = await pipe.execute()
+        return total
+
+    async def incr_many(self, amounts: Sequence[Tuple[str, int]], ttl: float) -> List[int]:
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for key, amount in amounts:
+                pipe.incrby(key, amount)
+                pipe.expire(key, int(ttl))
+            results = await pipe.execute()
+        return results[::2]
+
+    async def add(self, key: str, ttl: float) -> bool:
+        return bool(await self._redis.set(key, 1, nx=True, px=int(ttl * 1000)))
+
+    async def delete(self, key: str):
+        await self._redis.delete(key)
+
+
+def _build_backend():
+    if settings.CACHE_BACKEND == "redis":
+        if not settings.CACHE_REDIS_URL:
+            raise RuntimeError("CACHE_BACKEND=redis requires CACHE_REDIS_URL")
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    return MemoryCacheBackend(
+        settings.CACHE_MAX_ENTRIES, settings.CACHE_MAX_BYTES, settings.PUBLIC_FEED_CACHE_TTL_SECONDS
+    )
+
+
+cache_backend = _build_backend()
+
+Loader = Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]
+
+
+class ResponseCache:
+    """
+    Read-through cache of fully serialized JSON responses for public, per-visitor
+    identical reads. Each namespace has a generation counter; writes bump it,
+    which orphans every cached key of that namespace at once. The TTL is only a
+    safety net for writes that bypass the API.
+    """
+
+    def __init__(self, backend, ttl: float, max_age: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.cache_control = f"public, max-age={max_age}"
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def _gen_key(namespace: str) -> str:
+        return f"taskhive:gen:{namespace}"
+
+    async def _key(self, namespace: str, request: Request) -> str:
+        gen = await self.backend.get_int(self._gen_key(namespace))
+        # normalized so ?a=1&b=2 and ?b=2&a=1 share an entry
+        params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"taskhive:resp:{namespace}:{gen}:{request.url.path}?{params}"
+
+    def _response(self, request: Request, body: bytes, etag: str, headers: Dict[str, str]) -> Response:
+        headers = {**headers, "ETag": etag, "Cache-Control": self.cache_control}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    @staticmethod
+    async def _render(adapter: TypeAdapter, loader: Loader) -> Tuple[bytes, str, Dict[str, str]]:
+        payload, headers = await loader()
+        body = serialize(payload, adapter)
+        return body, etag_for(body), headers
+
+    async def respond(self, request: Request, namespace: str, adapter: TypeAdapter, loader: Loader) -> Response:
+        try:
+            key = await self._key(namespace, request)
+            cached = await self.backend.get(key)
+        except Exception as exc:
+            # the cache being down must not take the endpoint with it: answer from the loader, uncached
+            logger.warning("response cache unavailable", extra={"namespace": namespace, "error": str(exc)})
+            return self._response(request, *await self._render(adapter, loader))
+        if cached is not None:
+            header_len = int.from_bytes(cached[:4], "big")
+            meta = json.loads(cached[4:4 + header_len])
+            return self._response(request, cached[4 + header_len:], meta["etag"], meta["headers"])
+
+        # concurrent misses for the same key in this process share one load, as in TTLCache.get_or_load
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return self._response(request, *await asyncio.shield(pending))
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            body, etag, headers = await self._render(adapter, loader)
+            meta = json.dumps({"etag": etag, "headers": headers}).encode()
+            try:
+                await self.backend.set(key, len(meta).to_bytes(4, "big") + meta + body, self.ttl)
+            except Exception as exc:
+                logger.warning("response cache write failed", extra={"namespace": namespace, "error": str(exc)})
+            fut.set_result((body, etag, headers))
+        except BaseException as exc:
+            fut.set_exception(exc)
+            # mark retrieved so a failure nobody else awaited isn't logged
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return self._response(request, body, etag, headers)
+
+    async def invalidate(self, namespace: str):
+        await self.backend.incr(self._gen_key(namespace))
+
+
+feed_cache = ResponseCache(
+    cache_backend, settings.PUBLIC_FEED_CACHE_TTL_SECONDS, settings.PUBLIC_FEED_MAX_AGE_SECONDS
+)
@@ -1,16 +1,157 @@
+import atexit
+import copy
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import random
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+from app.core import metrics
 from app.core.config import settings
 
+# Set per request by the instrumentation middleware, attached to every record logged while handling it.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+# LogRecord attributes that aren't user-supplied `extra=` fields
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        out = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            out["request_id"] = record.request_id
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED:
+                out[key] = value
+        if record.exc_text:
+            out["exc"] = record.exc_text
+        return json.dumps(out, default=str)
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of INFO-and-below records; warnings and errors always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the caller: when the bounded queue is full the record is
+    dropped and counted instead of stalling the event loop.
+    """
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now (args may not be safe to touch later),
+        # but leave formatting to the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        record.stack_info = None
+        return record
+
+    def collect(self):
+        yield "taskhive_log_records_dropped_total", "counter", {}, self.dropped
+        yield "taskhive_log_queue_depth", "gauge", {}, self.queue.qsize()
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[DroppingQueueHandler] = None
+_dropped_before = 0  # by handlers from earlier setup/shutdown cycles, so the counter never goes down
+
+
+def _collect():
+    if _handler is not None:
+        for name, kind, labels, value in _handler.collect():
+            yield name, kind, labels, value + _dropped_before if kind == "counter" else value
+    else:
+        yield "taskhive_log_records_dropped_total", "counter", {}, _dropped_before
+
+
+metrics.register_collector(_collect)
+
+
 def setup_logging():
+    """Attaches the queue handler and starts the writer thread; a no-op while they're running.
+    Called at import and again by every app lifespan, so a restart in the same process logs again."""
+    global _listener, _handler
     logger = logging.getLogger("taskhive")
-    logger.setLevel(logging.INFO)
-    os.makedirs("logs", exist_ok=True) 
-    handler = RotatingFileHandler("logs/taskhive.log", maxBytes=10_000_000, backupCount=3)
-    fmt = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
-    handler.setFormatter(fmt)
+    logger.setLevel(settings.LOG_LEVEL)
+    if _listener is not None:
+        return logger
+
+    log_dir = os.path.dirname(settings.LOG_FILE)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+    # File I/O and rotation happen on the listener's thread, never on the event loop.
+    file_handler = RotatingFileHandler(
+        settings.LOG_FILE, maxBytes=settings.LOG_MAX_BYTES, backupCount=settings.LOG_BACKUP_COUNT
+    )
+    if settings.LOG_JSON:
+        file_handler.setFormatter(JsonFormatter())
+    else:
+        file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s]: %(message)s"))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    handler.addFilter(SamplingFilter(settings.LOG_INFO_SAMPLE_RATE))
+    handler.addFilter(RequestIdFilter())
     logger.addHandler(handler)
+
+    _handler = handler
+    _listener = QueueListener(handler.queue, file_handler, respect_handler_level=True)
+    _listener.start()
     return logger
 
+
+def shutdown_logging():
+    """Flushes whatever is still queued and detaches the handler; safe to call more than once."""
+    global _listener, _handler, _dropped_before
+    if _handler is not None:
+        # detach first: records logged from here on would sit in a queue nobody reads
+        logging.getLogger("taskhive").removeHandler(_handler)
+        _dropped_before += _handler.dropped
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
 logger = setup_logging()
@@ -0,0 +1,80 @@
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# A collector yields (name, type, labels, value) samples when /metrics is scraped.
+Sample = Tuple[str, str, Dict[str, str], float]
+
+_collectors: List[Callable[[], Iterable[Sample]]] = []
+
+
+def register_collector(fn: Callable[[], Iterable[Sample]]):
+    _collectors.append(fn)
+
+
+def _fmt_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    return "{" + inner + "}"
+
+
+def _family_name(name: str, kind: str) -> str:
+    if kind == "histogram":
+        for suffix in ("_bucket", "_sum", "_count"):
+            if name.endswith(suffix):
+                return name[: -len(suffix)]
+    return name
+
+
+def render() -> str:
+    """Prometheus text exposition format."""
+    # samples of one metric family must be contiguous, whichever collector produced them
+    families: Dict[str, Tuple[str, List[str]]] = {}
+    for collect in _collectors:
+        for name, kind, labels, value in collect():
+            family = families.setdefault(_family_name(name, kind), (kind, []))
+            family[1].append(f"{name}{_fmt_labels(labels)} {value}")
+    lines: List[str] = []
+    for name, (kind, samples) in families.items():
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with a fixed label set, rendered the Prometheus way."""
+
+    def __init__(self, name: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count], sum
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        register_collector(self._collect)
+
+    def observe(self, value: float, *label_values: str):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = series
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        total[0] += value
+
+    def _collect(self):
+        for label_values, (counts, total) in self._series.items():
+            labels = dict(zip(self.label_names, label_values))
+            running = 0
+            for bound, count in zip(self.buckets, counts):
+                running += count
+                yield f"{self.name}_bucket", "histogram", {**labels, "le": str(bound)}, running
+            running += counts[-1]
+            yield f"{self.name}_bucket", "histogram", {**labels, "le": "+Inf"}, running
+            yield f"{self.name}_sum", "histogram", labels, total[0]
+            yield f"{self.name}_count", "histogram", labels, running
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from typing import Dict, Optional, Tuple
+
+from app.core import metrics
+from app.core.cache import cache_backend
+from app.core.config import settings
+
+WINDOW_SECONDS = 60
+# buckets untouched for this long are forgotten
+IDLE_SECONDS = 2 * WINDOW_SECONDS
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending", "window", "last_global", "used")
+
+    def __init__(self, capacity: float, now: float):
+        self.tokens = capacity
+        self.updated = now
+        self.pending = 0  # taken locally since the last sync
+        self.window = int(now // WINDOW_SECONDS)
+        self.last_global = 0  # shared window count seen at the last sync
+        self.used = now
+
+
+class RateLimiter:
+    """
+    Per-worker token buckets (capacity = limit, refilled at limit/minute) that
+    answer every request locally. A background task periodically pushes local
+    consumption to the shared store's per-minute window counter and debits each
+    bucket by what the *other* workers consumed, so limits hold across workers
+    and nodes without a network hop on the request path.
+    """
+
+    def __init__(self, backend, sync_interval: float, shared: bool):
+        self.backend = backend
+        self.sync_interval = sync_interval
+        self.shared = shared
+        self._buckets: Dict[Tuple[str, str], Tuple[_Bucket, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.allowed = 0
+        self.limited = 0
+        metrics.register_collector(self._collect)
+
+    def hit(self, scope: str, key: str, limit: int) -> Tuple[bool, float]:
+        """Takes one token; returns (allowed, seconds until a token is available)."""
+        now = time.monotonic()
+        entry = self._buckets.get((scope, key))
+        if entry is None or entry[1] != limit:
+            entry = (_Bucket(limit, now), limit)
+            self._buckets[(scope, key)] = entry
+        bucket = entry[0]
+        rate = limit / WINDOW_SECONDS
+        bucket.tokens = min(limit, bucket.tokens + (now - bucket.updated) * rate)
+        bucket.updated = now
+        bucket.used = now
+        if bucket.tokens >= 1:
+            bucket.tokens -= 1
+            bucket.pending += 1
+            self.allowed += 1
+            return True, 0.0
+        self.limited += 1
+        return False, (1 - bucket.tokens) / rate
+
+    async def sync(self):
+        now = time.monotonic()
+        wall_window = int(time.time() // WINDOW_SECONDS)
+        flushing = []
+        for (scope, key), (bucket, limit) in list(self._buckets.items()):
+            if now - bucket.used > IDLE_SECONDS:
+                del self._buckets[(scope, key)]
+                continue
+            if not self.shared:
+                bucket.pending = 0
+                continue
+            if bucket.window != wall_window:
+                bucket.window = wall_window
+                bucket.last_global = 0
+            # nothing taken here since the last sync: what the other workers used
+            # is picked up on the next sync that has something to push
+            if bucket.pending:
+                flushing.append((f"taskhive:rl:{scope}:{key}:{wall_window}", bucket, bucket.pending))
+                bucket.pending = 0
+        if not flushing:
+            return
+        totals = await self.backend.incr_many(
+            [(counter, flushed) for counter, _, flushed in flushing], ttl=WINDOW_SECONDS * 2
+        )
+        for (_, bucket, flushed), total in zip(flushing, totals):
+            others = total - bucket.last_global - flushed
+            if others > 0:
+                bucket.tokens = max(0.0, bucket.tokens - others)
+            bucket.last_global = total
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                # the shared store being down must not take the limiter (or the app) with it
+                pass
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _collect(self):
+        yield "taskhive_rate_limit_allowed_total", "counter", {}, self.allowed
+        yield "taskhive_rate_limit_limited_total", "counter", {}, self.limited
+        yield "taskhive_rate_limit_buckets", "gauge", {}, len(self._buckets)
+
+
+def route_limit(method: str, route_path: str) -> Tuple[str, int]:
+    """(bucket scope, requests per minute) for a route; per-route overrides come from Settings."""
+    route_id = f"{method} {route_path}"
+    if route_id in settings.RATE_LIMIT_ROUTES:
+        return route_id, settings.RATE_LIMIT_ROUTES[route_id]
+    return "default", settings.RATE_LIMIT_REQUESTS_PER_MINUTE
+
+
+# with the in-memory backend there is nobody to share counts with
+limiter = RateLimiter(cache_backend, settings.RATE_LIMIT_SYNC_SECONDS, shared=settings.CACHE_BACKEND != "memory")
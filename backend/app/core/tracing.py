@@ -0,0 +1,90 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from app.core import metrics
+from app.core.config import settings
+
+span_seconds = metrics.Histogram("taskhive_span_duration_seconds", ("span",))
+
+# (name, seconds) of every child span recorded while handling the current request
+_request_spans: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_spans", default=None)
+
+_tracer = None
+
+
+def setup_otel(logger):
+    """Export spans to an OTLP collector when OTEL_EXPORTER_OTLP_ENDPOINT is set and the SDK is installed."""
+    global _tracer
+    if not settings.OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        logger.warning("OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk / exporter-otlp are not installed")
+        return
+    provider = TracerProvider(resource=Resource.create({"service.name": settings.OTEL_SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=settings.OTEL_EXPORTER_OTLP_ENDPOINT)))
+    trace.set_tracer_provider(provider)
+    _tracer = trace.get_tracer("taskhive")
+
+
+def start_request():
+    """Begins span collection for the current request; returns a token for `end_request`."""
+    return _request_spans.set([])
+
+
+def request_spans() -> List[Tuple[str, float]]:
+    """The spans collected so far for the current request (shared with its child tasks)."""
+    spans = _request_spans.get()
+    return spans if spans is not None else []
+
+
+def end_request(token) -> List[Tuple[str, float]]:
+    spans = _request_spans.get() or []
+    _request_spans.reset(token)
+    return spans
+
+
+@contextmanager
+def span(name: str):
+    """Times a child operation (Supabase call, auth, serialization) of the current request."""
+    otel_cm = _tracer.start_as_current_span(name) if _tracer is not None else None
+    if otel_cm is not None:
+        otel_cm.__enter__()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if otel_cm is not None:
+            otel_cm.__exit__(None, None, None)
+        span_seconds.observe(elapsed, name)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, elapsed))
+
+
+@contextmanager
+def request_span(name: str):
+    """Root OpenTelemetry span for a request (no-op without a tracer)."""
+    if _tracer is None:
+        yield
+        return
+    with _tracer.start_as_current_span(name):
+        yield
+
+
+def server_timing(spans: List[Tuple[str, float]], total: float) -> str:
+    # repeated calls (e.g. several db queries on one table) are summed into one entry
+    totals: Dict[str, float] = {}
+    for name, elapsed in spans:
+        totals[name] = totals.get(name, 0.0) + elapsed
+    parts = [f"{name.replace('.', '-')};dur={elapsed * 1000:.1f}" for name, elapsed in totals.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
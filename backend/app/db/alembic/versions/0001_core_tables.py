@@ -0,0 +1,141 @@
+"""todos, study_plans, marketplace_items and events with their indexes
+
+The same schema as the Supabase SQL migrations 001-010, minus auth.users and
+RLS: the backend connects as the table owner and scopes every query by user_id.
+app/db/tables.py is the source of truth for the schema at head;
+tests/test_migrations.py fails if upgrading to head doesn't produce it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+ID = sa.BigInteger().with_variant(sa.Integer(), "sqlite")
+TS = sa.DateTime(timezone=True)
+
+
+def _common():
+    return [
+        sa.Column("id", ID, primary_key=True, autoincrement=True),
+        sa.Column("user_id", sa.Uuid(as_uuid=False), nullable=True),
+        sa.Column("title", sa.Text(), nullable=False),
+    ]
+
+
+def _created_at(now: str):
+    return sa.Column("created_at", TS, nullable=False, server_default=sa.text(now))
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == "postgresql"
+    true, false = ("true", "false") if postgres else ("1", "0")
+    # what app.db.tables.utcnow() renders, spelled out: a revision must not change when app code does
+    now = "now()" if postgres else "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+    op.create_table(
+        "todos",
+        *_common(),
+        sa.Column("description", sa.Text()),
+        sa.Column("due_date", TS),
+        sa.Column("completed", sa.Boolean(), nullable=False, server_default=sa.text(false)),
+        _created_at(now),
+        sa.Column("updated_at", TS),
+    )
+    op.create_table(
+        "study_plans",
+        *_common(),
+        sa.Column(
+            "subjects",
+            postgresql.ARRAY(sa.Text()) if postgres else sa.JSON(),
+            nullable=False,
+            server_default=sa.text("'{}'" if postgres else "'[]'"),
+        ),
+        sa.Column("duration", sa.Text()),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("status", sa.Text(), nullable=False, server_default=sa.text("'draft'")),
+        _created_at(now),
+        sa.Column("deadline", TS),
+    )
+    op.create_table(
+        "marketplace_items",
+        *_common(),
+        sa.Column("description", sa.Text()),
+        sa.Column("price", sa.Numeric(12, 2), nullable=False, server_default=sa.text("0")),
+        sa.Column("available", sa.Boolean(), nullable=False, server_default=sa.text(true)),
+        _created_at(now),
+        sa.Column("image_path", sa.Text()),
+    )
+    op.create_table(
+        "events",
+        *_common(),
+        sa.Column("description", sa.Text()),
+        sa.Column("starts_at", TS, nullable=False),
+        sa.Column("ends_at", TS),
+        sa.Column("location", sa.Text()),
+        _created_at(now),
+        sa.Column("rrule", sa.Text()),
+    )
+
+    # keyset pagination: (owner/filter, sort column, id), as in 004
+    op.create_index("idx_todos_user_created_id", "todos", ["user_id", sa.text("created_at desc"), sa.text("id desc")])
+    op.create_index("idx_study_user_created_id", "study_plans", ["user_id", sa.text("created_at desc"), sa.text("id desc")])
+    op.create_index("idx_market_available_created_id", "marketplace_items",
+                    ["available", sa.text("created_at desc"), sa.text("id desc")])
+    op.create_index("idx_market_user_created_id", "marketplace_items",
+                    ["user_id", sa.text("created_at desc"), sa.text("id desc")])
+    op.create_index("idx_events_starts_id", "events", ["starts_at", "id"])
+    op.create_index("idx_events_user_starts_id", "events", ["user_id", sa.text("starts_at desc"), sa.text("id desc")])
+
+    # deadline scans (005) and dashboard lookups (008)
+    open_todos = sa.text(f"completed = {false}")
+    op.create_index("idx_todos_open_due_id", "todos", ["due_date", "id"],
+                    postgresql_where=sa.text("completed = false and due_date is not null"),
+                    sqlite_where=sa.text("completed = 0 and due_date is not null"))
+    op.create_index("idx_todos_user_open_due_id", "todos", ["user_id", "due_date", "id"],
+                    postgresql_where=open_todos, sqlite_where=open_todos)
+    op.create_index("idx_study_deadline_id", "study_plans", ["deadline", "id"],
+                    postgresql_where=sa.text("deadline is not null"), sqlite_where=sa.text("deadline is not null"))
+    available = sa.text(f"available = {true}")
+    op.create_index("idx_market_user_available", "marketplace_items", ["user_id"],
+                    postgresql_where=available, sqlite_where=available)
+
+    # marketplace search by price (006)
+    op.create_index("idx_market_available_price_id", "marketplace_items", ["available", "price", "id"])
+
+    if postgres:
+        # full-text search (006) and calendar ranges (007) use generated columns with GIN/GiST indexes;
+        # elsewhere the repository falls back to LIKE and plain comparisons
+        op.execute("""
+            alter table marketplace_items add column search tsvector
+            generated always as (
+              setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+              setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            ) stored
+        """)
+        op.create_index("idx_market_search", "marketplace_items", ["search"], postgresql_using="gin")
+        op.execute("""
+            alter table events add column span tstzrange
+            generated always as (
+              case
+                when rrule is not null then tstzrange(starts_at, null, '[)')
+                when ends_at is null or ends_at <= starts_at then tstzrange(starts_at, starts_at, '[]')
+                else tstzrange(starts_at, ends_at, '[)')
+              end
+            ) stored
+        """)
+        op.create_index("idx_events_span", "events", ["span"], postgresql_using="gist")
+
+
+def downgrade():
+    op.drop_table("events")
+    op.drop_table("marketplace_items")
+    op.drop_table("study_plans")
+    op.drop_table("todos")
@@ -0,0 +1,29 @@
+"""version column for optimistic concurrency on PATCH
+
+Same as the Supabase migration 011, minus the trigger: on this backend the
+repository bumps `version` in the UPDATE itself.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TABLES = ("todos", "study_plans", "events", "marketplace_items")
+
+
+def upgrade():
+    for table in TABLES:
+        op.add_column(table, sa.Column("version", sa.Integer(), nullable=False, server_default=sa.text("1")))
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.drop_column("version")
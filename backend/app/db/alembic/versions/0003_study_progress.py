@@ -0,0 +1,202 @@
+"""study plan progress counters maintained from linked todos
+
+Same as the Supabase migration 012, minus the grants. Postgres gets the same
+functions, trigger and owner-checking foreign key; SQLite gets equivalent
+triggers and a plain foreign key.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# one statement each: asyncpg runs every execute() as a prepared statement
+POSTGRES_DDL = [
+    "alter table study_plans add constraint study_plans_id_user_key unique (id, user_id)",
+    """alter table todos add constraint todos_study_plan_fk
+       foreign key (study_plan_id, user_id) references study_plans (id, user_id)
+       on delete set null (study_plan_id)""",
+    """create index idx_todos_study_plan on todos (study_plan_id, subject)
+       where study_plan_id is not null""",
+    """create function study_plan_apply(p_plan bigint, p_subject text, p_total integer, p_done integer)
+    returns void language sql as $$
+      update study_plans set
+        todos_total = todos_total + p_total,
+        todos_done = todos_done + p_done,
+        subject_counts = case
+          when p_subject is null then subject_counts
+          -- the subject's last todo left the plan: drop it, as the recount would
+          when coalesce((subject_counts -> p_subject ->> 'total')::integer, 0) + p_total <= 0
+            then subject_counts - p_subject
+          else jsonb_set(subject_counts, array[p_subject], jsonb_build_object(
+            'total', coalesce((subject_counts -> p_subject ->> 'total')::integer, 0) + p_total,
+            'done', coalesce((subject_counts -> p_subject ->> 'done')::integer, 0) + p_done
+          )) end,
+        progress = case when todos_total + p_total > 0
+          then round(100.0 * (todos_done + p_done) / (todos_total + p_total))::integer else progress end,
+        status = case
+          when todos_total + p_total > 0 and todos_done + p_done = todos_total + p_total then 'completed'
+          when todos_total + p_total > 0 and status = 'completed' then 'active'
+          else status end
+      where id = p_plan;
+    $$""",
+    """create function todos_track_study_progress()
+    returns trigger language plpgsql as $$
+    begin
+      if tg_op = 'UPDATE' and old.study_plan_id is not distinct from new.study_plan_id
+         and old.subject is not distinct from new.subject and old.completed = new.completed then
+        return null;
+      end if;
+      if tg_op in ('UPDATE', 'DELETE') and old.study_plan_id is not null then
+        perform study_plan_apply(old.study_plan_id, old.subject, -1, case when old.completed then -1 else 0 end);
+      end if;
+      if tg_op in ('INSERT', 'UPDATE') and new.study_plan_id is not null then
+        perform study_plan_apply(new.study_plan_id, new.subject, 1, case when new.completed then 1 else 0 end);
+      end if;
+      return null;
+    end $$""",
+    """create trigger todos_track_study_progress
+       after insert or delete or update of completed, study_plan_id, subject on todos
+       for each row execute function todos_track_study_progress()""",
+    """create function recompute_study_progress()
+    returns integer language plpgsql as $$
+    declare
+      fixed integer;
+    begin
+      -- one recount at a time: a worker that finds one running skips this round
+      if not pg_try_advisory_xact_lock(hashtext('recompute_study_progress')) then
+        return 0;
+      end if;
+      -- Waits for transactions whose triggers already moved a plan's counters and
+      -- holds back new ones until this commits, so the counts below (a fresh
+      -- snapshot under READ COMMITTED) can't overwrite a concurrent delta. One
+      -- table lock rather than FOR UPDATE on every plan row: taken in a single
+      -- step, it can't deadlock with a transaction that touches several plans.
+      lock table study_plans in share row exclusive mode;
+      with counts as (
+        select p.id, count(t.id)::integer as total, (count(t.id) filter (where t.completed))::integer as done
+        from study_plans p left join todos t on t.study_plan_id = p.id
+        group by p.id
+      ), subjects as (
+        select study_plan_id as id, jsonb_object_agg(subject, jsonb_build_object('total', total, 'done', done)) as counts
+        from (
+          select study_plan_id, subject, count(*)::integer as total, (count(*) filter (where completed))::integer as done
+          from todos where study_plan_id is not null and subject is not null
+          group by study_plan_id, subject
+        ) per_subject
+        group by study_plan_id
+      ), fixed_rows as (
+        update study_plans p set
+          todos_total = c.total,
+          todos_done = c.done,
+          subject_counts = coalesce(s.counts, '{}'),
+          progress = case when c.total > 0 then round(100.0 * c.done / c.total)::integer else p.progress end,
+          status = case
+            when c.total > 0 and c.done = c.total then 'completed'
+            when p.status = 'completed' and c.total > 0 then 'active'
+            else p.status end
+        from counts c left join subjects s on s.id = c.id
+        where p.id = c.id
+          and (p.todos_total, p.todos_done, p.subject_counts)
+              is distinct from (c.total, c.done, coalesce(s.counts, '{}'))
+        returning 1
+      )
+      select count(*)::integer into fixed from fixed_rows;
+      return fixed;
+    end $$""",
+]
+
+
+def _sqlite_apply(ref: str, delta: int) -> str:
+    """UPDATE adding `delta` of todo `ref` (new/old) to its plan; mirrors study_plan_apply() in 012."""
+    total, done = f"({delta})", f"({delta} * {ref}.completed)"
+    key = f"'$.\"' || {ref}.subject || '\"'"
+    return f"""
+        UPDATE study_plans SET
+          todos_total = todos_total + {total},
+          todos_done = todos_done + {done},
+          subject_counts = CASE
+            WHEN {ref}.subject IS NULL THEN subject_counts
+            WHEN coalesce(json_extract(subject_counts, {key} || '.total'), 0) + {total} <= 0
+              THEN json_remove(subject_counts, {key})
+            ELSE json_set(subject_counts, {key}, json_object(
+              'total', coalesce(json_extract(subject_counts, {key} || '.total'), 0) + {total},
+              'done', coalesce(json_extract(subject_counts, {key} || '.done'), 0) + {done})) END,
+          progress = CASE WHEN todos_total + {total} > 0
+            THEN CAST(round(100.0 * (todos_done + {done}) / (todos_total + {total})) AS INTEGER) ELSE progress END,
+          status = CASE
+            WHEN todos_total + {total} > 0 AND todos_done + {done} = todos_total + {total} THEN 'completed'
+            WHEN todos_total + {total} > 0 AND status = 'completed' THEN 'active'
+            ELSE status END
+        WHERE id = {ref}.study_plan_id;"""
+
+
+SQLITE_TRIGGERS = {
+    "todos_study_progress_insert": f"""
+        CREATE TRIGGER todos_study_progress_insert AFTER INSERT ON todos
+        WHEN new.study_plan_id IS NOT NULL
+        BEGIN {_sqlite_apply("new", 1)} END""",
+    "todos_study_progress_delete": f"""
+        CREATE TRIGGER todos_study_progress_delete AFTER DELETE ON todos
+        WHEN old.study_plan_id IS NOT NULL
+        BEGIN {_sqlite_apply("old", -1)} END""",
+    "todos_study_progress_update": f"""
+        CREATE TRIGGER todos_study_progress_update AFTER UPDATE OF completed, study_plan_id, subject ON todos
+        WHEN old.study_plan_id IS NOT new.study_plan_id OR old.subject IS NOT new.subject
+          OR old.completed IS NOT new.completed
+        BEGIN {_sqlite_apply("old", -1)} {_sqlite_apply("new", 1)} END""",
+}
+
+
+def upgrade():
+    postgres = op.get_bind().dialect.name == "postgresql"
+
+    op.add_column("study_plans", sa.Column("todos_total", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.add_column("study_plans", sa.Column("todos_done", sa.Integer(), nullable=False, server_default=sa.text("0")))
+    op.add_column("study_plans", sa.Column(
+        "subject_counts", postgresql.JSONB() if postgres else sa.JSON(),
+        nullable=False, server_default=sa.text("'{}'"),
+    ))
+    op.add_column("todos", sa.Column("subject", sa.Text()))
+    if postgres:
+        op.add_column("todos", sa.Column("study_plan_id", sa.BigInteger()))
+        for ddl in POSTGRES_DDL:
+            op.execute(ddl)
+        return
+
+    # SQLite can't add a foreign key in place; batch mode rebuilds the table
+    with op.batch_alter_table("todos") as batch:
+        batch.add_column(sa.Column("study_plan_id", sa.Integer()))
+        batch.create_foreign_key("todos_study_plan_fk", "study_plans", ["study_plan_id"], ["id"], ondelete="SET NULL")
+    op.create_index("idx_todos_study_plan", "todos", ["study_plan_id", "subject"],
+                    sqlite_where=sa.text("study_plan_id is not null"))
+    for ddl in SQLITE_TRIGGERS.values():
+        op.execute(ddl)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("drop trigger if exists todos_track_study_progress on todos")
+        op.execute("drop function if exists todos_track_study_progress()")
+        op.execute("drop function if exists recompute_study_progress()")
+        op.execute("drop function if exists study_plan_apply(bigint, text, integer, integer)")
+        op.execute("alter table todos drop constraint if exists todos_study_plan_fk")
+        op.execute("alter table study_plans drop constraint if exists study_plans_id_user_key")
+    else:
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.drop_index("idx_todos_study_plan", table_name="todos")
+    with op.batch_alter_table("todos") as batch:
+        batch.drop_column("study_plan_id")
+        batch.drop_column("subject")
+    with op.batch_alter_table("study_plans") as batch:
+        batch.drop_column("subject_counts")
+        batch.drop_column("todos_done")
+        batch.drop_column("todos_total")
@@ -0,0 +1,47 @@
+"""series_ends_at bounds recurring events' span
+
+Same as the Supabase migration 013. SQLite has no `span`; the repository
+checks series_ends_at directly there.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def _span(recurring_upper: str) -> str:
+    return f"""
+        alter table events add column span tstzrange
+        generated always as (
+          case
+            when rrule is not null then tstzrange(starts_at, {recurring_upper}, '[]')
+            when ends_at is null or ends_at <= starts_at then tstzrange(starts_at, starts_at, '[]')
+            else tstzrange(starts_at, ends_at, '[)')
+          end
+        ) stored
+    """
+
+
+def upgrade():
+    op.add_column("events", sa.Column("series_ends_at", sa.DateTime(timezone=True)))
+    if op.get_bind().dialect.name == "postgresql":
+        # a generated column's expression can't be altered; dropping it drops idx_events_span
+        op.drop_column("events", "span")
+        op.execute(_span("series_ends_at"))
+        op.create_index("idx_events_span", "events", ["span"], postgresql_using="gist")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_column("events", "span")
+        op.execute(_span("null"))
+        op.create_index("idx_events_span", "events", ["span"], postgresql_using="gist")
+    with op.batch_alter_table("events") as batch:
+        batch.drop_column("series_ends_at")
@@ -0,0 +1,64 @@
+"""study plans with linked todos ignore client progress/status
+
+Same as the Supabase migration 014 on Postgres. SQLite triggers can't assign
+to NEW, so there an AFTER UPDATE trigger puts the values back; the stored row
+is right, but that one UPDATE's RETURNING shows what the client sent.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+POSTGRES_DDL = [
+    """create function study_plans_progress_follows_todos()
+    returns trigger language plpgsql as $$
+    begin
+      new.progress := round(100.0 * new.todos_done / new.todos_total)::integer;
+      new.status := case
+        when new.todos_done = new.todos_total then 'completed'
+        when old.status = 'completed' then 'active'
+        else old.status end;
+      return new;
+    end $$""",
+    """create trigger study_plans_progress_follows_todos
+       before update on study_plans
+       for each row when (new.todos_total > 0)
+       execute function study_plans_progress_follows_todos()""",
+]
+
+_SQLITE_PROGRESS = "CAST(round(100.0 * new.todos_done / new.todos_total) AS INTEGER)"
+_SQLITE_STATUS = """CASE
+    WHEN new.todos_done = new.todos_total THEN 'completed'
+    WHEN old.status = 'completed' THEN 'active'
+    ELSE old.status END"""
+
+# recursive_triggers is off by default, so the inner UPDATE doesn't fire it again
+SQLITE_TRIGGER = f"""
+    CREATE TRIGGER study_plans_progress_follows_todos AFTER UPDATE ON study_plans
+    WHEN new.todos_total > 0
+      AND (new.progress IS NOT {_SQLITE_PROGRESS} OR new.status IS NOT {_SQLITE_STATUS})
+    BEGIN
+      UPDATE study_plans SET progress = {_SQLITE_PROGRESS}, status = {_SQLITE_STATUS} WHERE id = new.id;
+    END"""
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        for ddl in POSTGRES_DDL:
+            op.execute(ddl)
+    else:
+        op.execute(SQLITE_TRIGGER)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("drop trigger if exists study_plans_progress_follows_todos on study_plans")
+        op.execute("drop function if exists study_plans_progress_follows_todos()")
+    else:
+        op.execute("DROP TRIGGER IF EXISTS study_plans_progress_follows_todos")
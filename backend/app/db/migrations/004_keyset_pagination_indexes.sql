@@ -0,0 +1,34 @@
+-- 004_keyset_pagination_indexes.sql
+-- Composite indexes matching the (sort column, id) keyset order used by the list endpoints,
+-- so every page is an index range scan no matter how deep the cursor is.
+-- Run in your Supabase project's SQL editor.
+
+-- GET /todos/  (user_id = ? order by created_at desc, id desc)
+create index if not exists idx_todos_user_created_id
+  on public.todos (user_id, created_at desc, id desc);
+
+-- GET /study/  (user_id = ? order by created_at desc, id desc)
+create index if not exists idx_study_user_created_id
+  on public.study_plans (user_id, created_at desc, id desc);
+
+-- GET /marketplace/  (available = ? order by created_at desc, id desc)
+create index if not exists idx_market_available_created_id
+  on public.marketplace_items (available, created_at desc, id desc);
+
+-- GET /marketplace/mine
+create index if not exists idx_market_user_created_id
+  on public.marketplace_items (user_id, created_at desc, id desc);
+
+-- GET /events/  (order by starts_at asc, id asc)
+create index if not exists idx_events_starts_id
+  on public.events (starts_at, id);
+
+-- GET /events/mine  (user_id = ? order by starts_at desc, id desc)
+create index if not exists idx_events_user_starts_id
+  on public.events (user_id, starts_at desc, id desc);
+
+-- The single-column user_id indexes from 001 are prefixes of the ones above.
+drop index if exists public.idx_todos_userid;
+drop index if exists public.idx_study_userid;
+drop index if exists public.idx_market_userid;
+drop index if exists public.idx_events_userid;
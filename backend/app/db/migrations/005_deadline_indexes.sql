@@ -0,0 +1,14 @@
+-- 005_deadline_indexes.sql
+-- Range indexes for the notification scheduler's deadline scans
+-- (where <deadline> >= now() and <deadline> < now() + lead order by <deadline>, id).
+-- Events already have (starts_at, id) from 004.
+-- Run in your Supabase project's SQL editor.
+
+-- Only open todos can be due; keep completed ones out of the index entirely.
+create index if not exists idx_todos_open_due_id
+  on public.todos (due_date, id)
+  where completed = false and due_date is not null;
+
+create index if not exists idx_study_deadline_id
+  on public.study_plans (deadline, id)
+  where deadline is not null;
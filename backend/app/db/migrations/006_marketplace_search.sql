@@ -0,0 +1,22 @@
+-- 006_marketplace_search.sql
+-- Full-text search and price filtering for GET /marketplace/search.
+-- Run in your Supabase project's SQL editor.
+
+-- Title matches rank above description matches; kept up to date by Postgres itself.
+alter table public.marketplace_items
+  add column if not exists search tsvector
+  generated always as (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B')
+  ) stored;
+
+-- ?q=  (search @@ websearch_to_tsquery('english', ?))
+create index if not exists idx_market_search
+  on public.marketplace_items using gin (search);
+
+-- ?sort=price_asc|price_desc, ?min_price= / ?max_price=
+-- (available = ? and price between ? and ? order by price, id; scanned backwards for desc)
+create index if not exists idx_market_available_price_id
+  on public.marketplace_items (available, price, id);
+
+-- ?sort=recent is served by idx_market_available_created_id from 004.
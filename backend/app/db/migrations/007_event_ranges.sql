@@ -0,0 +1,23 @@
+-- 007_event_ranges.sql
+-- Recurring events and calendar range reads for GET /events/range.
+-- Run in your Supabase project's SQL editor.
+
+-- RFC 5545 RRULE; starts_at/ends_at describe the first occurrence.
+alter table public.events add column if not exists rrule text;
+
+-- The time an event covers, as one range the overlap query can use an index for.
+-- Events without ends_at are instants (an inclusive [t, t] range so they aren't empty);
+-- a recurring series is open-ended here and trimmed when its RRULE is expanded.
+alter table public.events
+  add column if not exists span tstzrange
+  generated always as (
+    case
+      when rrule is not null then tstzrange(starts_at, null, '[)')
+      when ends_at is null or ends_at <= starts_at then tstzrange(starts_at, starts_at, '[]')
+      else tstzrange(starts_at, ends_at, '[)')
+    end
+  ) stored;
+
+-- span && tstzrange(from, to, '[)')
+create index if not exists idx_events_span
+  on public.events using gist (span);
@@ -0,0 +1,14 @@
+-- 008_dashboard_indexes.sql
+-- Per-user lookups behind GET /dashboard. The other dashboard queries reuse
+-- the (user_id, ...) indexes from 004 and the span index from 007.
+-- Run in your Supabase project's SQL editor.
+
+-- open / overdue todos  (user_id = ? and completed = false [and due_date < now()] order by due_date, id)
+create index if not exists idx_todos_user_open_due_id
+  on public.todos (user_id, due_date, id)
+  where completed = false;
+
+-- active listings  (user_id = ? and available = true)
+create index if not exists idx_market_user_available
+  on public.marketplace_items (user_id)
+  where available = true;
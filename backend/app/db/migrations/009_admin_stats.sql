@@ -0,0 +1,165 @@
+-- 009_admin_stats.sql
+-- Counters behind GET /admin/stats, maintained by triggers as rows are written so
+-- reading them never scans auth.users or the app tables.
+-- Run in your Supabase project's SQL editor.
+--
+-- Each counter is split over 16 shards (a random one is bumped per write) so
+-- concurrent inserts don't all queue on the same row lock; readers sum the shards.
+
+create table if not exists public.admin_totals (
+  metric text not null,
+  shard smallint not null,
+  value bigint not null default 0,
+  primary key (metric, shard)
+);
+
+create table if not exists public.admin_daily (
+  metric text not null,
+  day date not null,
+  shard smallint not null,
+  value bigint not null default 0,
+  primary key (metric, day, shard)
+);
+
+-- one row per user per day they signed in; distinct counts over a day range are index scans
+create table if not exists public.admin_user_activity (
+  day date not null,
+  user_id uuid not null,
+  primary key (day, user_id)
+);
+
+-- only the backend's service role reads or writes these
+alter table public.admin_totals enable row level security;
+alter table public.admin_daily enable row level security;
+alter table public.admin_user_activity enable row level security;
+
+create or replace function public.admin_bump_total(p_metric text, p_delta bigint)
+returns void language sql as $$
+  insert into public.admin_totals (metric, shard, value)
+  values (p_metric, floor(random() * 16)::smallint, p_delta)
+  on conflict (metric, shard) do update set value = admin_totals.value + excluded.value;
+$$;
+
+create or replace function public.admin_bump_daily(p_metric text, p_day date, p_delta bigint)
+returns void language sql as $$
+  insert into public.admin_daily (metric, day, shard, value)
+  values (p_metric, p_day, floor(random() * 16)::smallint, p_delta)
+  on conflict (metric, day, shard) do update set value = admin_daily.value + excluded.value;
+$$;
+
+-- ---- auth.users: users, signups per day, sign-in activity ----
+
+create or replace function public.admin_track_users()
+returns trigger language plpgsql security definer set search_path = public as $$
+begin
+  if tg_op = 'INSERT' then
+    perform admin_bump_total('users', 1);
+    perform admin_bump_daily('signups', (new.created_at at time zone 'utc')::date, 1);
+  elsif tg_op = 'DELETE' then
+    perform admin_bump_total('users', -1);
+  end if;
+  if tg_op <> 'DELETE' and new.last_sign_in_at is not null
+     and new.last_sign_in_at is distinct from (case when tg_op = 'UPDATE' then old.last_sign_in_at end) then
+    insert into admin_user_activity (day, user_id)
+    values ((new.last_sign_in_at at time zone 'utc')::date, new.id)
+    on conflict do nothing;
+  end if;
+  return null;
+end $$;
+
+drop trigger if exists admin_track_users on auth.users;
+create trigger admin_track_users
+  after insert or delete or update of last_sign_in_at on auth.users
+  for each row execute function public.admin_track_users();
+
+-- ---- todos: created per day ----
+
+create or replace function public.admin_track_todos()
+returns trigger language plpgsql security definer set search_path = public as $$
+begin
+  perform admin_bump_daily('todos_created', (new.created_at at time zone 'utc')::date, 1);
+  return null;
+end $$;
+
+drop trigger if exists admin_track_todos on public.todos;
+create trigger admin_track_todos
+  after insert on public.todos
+  for each row execute function public.admin_track_todos();
+
+-- ---- marketplace_items: listings by availability, created per day ----
+
+create or replace function public.admin_track_listings()
+returns trigger language plpgsql security definer set search_path = public as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    perform admin_bump_total(case when old.available then 'listings_available' else 'listings_unavailable' end, -1);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') then
+    perform admin_bump_total(case when new.available then 'listings_available' else 'listings_unavailable' end, 1);
+  end if;
+  if tg_op = 'INSERT' then
+    perform admin_bump_daily('listings_created', (new.created_at at time zone 'utc')::date, 1);
+  end if;
+  return null;
+end $$;
+
+drop trigger if exists admin_track_listings on public.marketplace_items;
+create trigger admin_track_listings
+  after insert or delete or update of available on public.marketplace_items
+  for each row execute function public.admin_track_listings();
+
+-- ---- backfill (one-off full scans; run before traffic resumes, or accept a small drift) ----
+
+delete from public.admin_totals;
+delete from public.admin_daily;
+
+insert into public.admin_totals (metric, shard, value)
+select 'users', 0, count(*) from auth.users;
+
+insert into public.admin_totals (metric, shard, value)
+select case when available then 'listings_available' else 'listings_unavailable' end, 0, count(*)
+from public.marketplace_items group by available;
+
+insert into public.admin_daily (metric, day, shard, value)
+select 'signups', (created_at at time zone 'utc')::date, 0, count(*) from auth.users group by 1, 2;
+
+insert into public.admin_daily (metric, day, shard, value)
+select 'todos_created', (created_at at time zone 'utc')::date, 0, count(*) from public.todos group by 1, 2;
+
+insert into public.admin_daily (metric, day, shard, value)
+select 'listings_created', (created_at at time zone 'utc')::date, 0, count(*) from public.marketplace_items group by 1, 2;
+
+insert into public.admin_user_activity (day, user_id)
+select (last_sign_in_at at time zone 'utc')::date, id from auth.users where last_sign_in_at is not null
+on conflict do nothing;
+
+-- ---- read side: everything the admin page needs in one call ----
+
+create or replace function public.admin_stats(p_since date)
+returns jsonb language sql stable security definer set search_path = public as $$
+  select jsonb_build_object(
+    'totals', coalesce((
+      select jsonb_object_agg(metric, value)
+      from (select metric, sum(value)::bigint as value from admin_totals group by metric) t
+    ), '{}'::jsonb),
+    'daily', coalesce((
+      select jsonb_agg(jsonb_build_object('metric', metric, 'day', day, 'value', value) order by metric, day)
+      from (
+        select metric, day, sum(value)::bigint as value
+        from admin_daily where day >= p_since group by metric, day
+        union all
+        select 'active_users', day, count(*) from admin_user_activity where day >= p_since group by day
+      ) d
+    ), '[]'::jsonb),
+    'active_users_7d', (
+      select count(distinct user_id) from admin_user_activity where day > current_date - 7
+    ),
+    'active_users_30d', (
+      select count(distinct user_id) from admin_user_activity where day > current_date - 30
+    )
+  );
+$$;
+
+revoke all on function public.admin_stats(date) from public, anon, authenticated;
+revoke all on function public.admin_bump_total(text, bigint) from public, anon, authenticated;
+revoke all on function public.admin_bump_daily(text, date, bigint) from public, anon, authenticated;
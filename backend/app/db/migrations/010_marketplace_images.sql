@@ -0,0 +1,7 @@
+-- 010_marketplace_images.sql
+-- Listing image for the marketplace. Only the original's object path is stored;
+-- thumbnail keys are derived from it (<path>.<width>w.<format>), so there is
+-- nothing to update when the background job finishes.
+-- Run in your Supabase project's SQL editor.
+
+alter table public.marketplace_items add column if not exists image_path text;
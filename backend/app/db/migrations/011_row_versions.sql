@@ -0,0 +1,34 @@
+-- 011_row_versions.sql
+-- Row versions for optimistic concurrency on PATCH (app/services/updates.py):
+-- a PATCH only applies if `version` is still what the client last read.
+-- Run in your Supabase project's SQL editor.
+
+alter table public.todos add column if not exists version integer not null default 1;
+alter table public.study_plans add column if not exists version integer not null default 1;
+alter table public.events add column if not exists version integer not null default 1;
+alter table public.marketplace_items add column if not exists version integer not null default 1;
+
+-- PostgREST can't send `version = version + 1`, so every update bumps it here,
+-- batch updates and direct SQL included.
+create or replace function public.bump_row_version()
+returns trigger language plpgsql as $$
+begin
+  new.version := old.version + 1;
+  return new;
+end $$;
+
+drop trigger if exists bump_version on public.todos;
+create trigger bump_version before update on public.todos
+  for each row execute function public.bump_row_version();
+
+drop trigger if exists bump_version on public.study_plans;
+create trigger bump_version before update on public.study_plans
+  for each row execute function public.bump_row_version();
+
+drop trigger if exists bump_version on public.events;
+create trigger bump_version before update on public.events
+  for each row execute function public.bump_row_version();
+
+drop trigger if exists bump_version on public.marketplace_items;
+create trigger bump_version before update on public.marketplace_items
+  for each row execute function public.bump_row_version();
@@ -0,0 +1,133 @@
+-- 012_study_progress.sql
+-- Study plan progress from linked todos. A todo can point at one of its owner's
+-- plans (and one of the plan's subjects); triggers keep per-plan and per-subject
+-- counters on study_plans up to date, so each todo write changes one plan row
+-- and reading progress never counts todos.
+-- Run in your Supabase project's SQL editor.
+
+alter table public.study_plans
+  add column if not exists todos_total integer not null default 0,
+  add column if not exists todos_done integer not null default 0,
+  -- {"<subject>": {"total": n, "done": n}}
+  add column if not exists subject_counts jsonb not null default '{}';
+
+alter table public.todos
+  add column if not exists study_plan_id bigint,
+  add column if not exists subject text;
+
+-- a todo can only link to a plan with the same owner; deleting the plan unlinks its todos
+alter table public.study_plans drop constraint if exists study_plans_id_user_key;
+alter table public.study_plans add constraint study_plans_id_user_key unique (id, user_id);
+alter table public.todos drop constraint if exists todos_study_plan_fk;
+alter table public.todos add constraint todos_study_plan_fk
+  foreign key (study_plan_id, user_id) references public.study_plans (id, user_id)
+  on delete set null (study_plan_id);
+
+-- the FK's on-delete lookups and the recompute below
+create index if not exists idx_todos_study_plan
+  on public.todos (study_plan_id, subject)
+  where study_plan_id is not null;
+
+-- Adds (p_total, p_done) to one plan and, when the todo has a subject, to that subject.
+-- While a plan has linked todos its progress follows the counters, and it is
+-- 'completed' exactly when all of them are done (back to 'active' otherwise).
+-- Plans without linked todos keep whatever progress/status the client set.
+create or replace function public.study_plan_apply(p_plan bigint, p_subject text, p_total integer, p_done integer)
+returns void language sql as $$
+  update public.study_plans set
+    todos_total = todos_total + p_total,
+    todos_done = todos_done + p_done,
+    subject_counts = case
+      when p_subject is null then subject_counts
+      -- the subject's last todo left the plan: drop it, as the recount would
+      when coalesce((subject_counts -> p_subject ->> 'total')::integer, 0) + p_total <= 0
+        then subject_counts - p_subject
+      else jsonb_set(subject_counts, array[p_subject], jsonb_build_object(
+        'total', coalesce((subject_counts -> p_subject ->> 'total')::integer, 0) + p_total,
+        'done', coalesce((subject_counts -> p_subject ->> 'done')::integer, 0) + p_done
+      )) end,
+    progress = case when todos_total + p_total > 0
+      then round(100.0 * (todos_done + p_done) / (todos_total + p_total))::integer else progress end,
+    status = case
+      when todos_total + p_total > 0 and todos_done + p_done = todos_total + p_total then 'completed'
+      when todos_total + p_total > 0 and status = 'completed' then 'active'
+      else status end
+  where id = p_plan;
+$$;
+
+create or replace function public.todos_track_study_progress()
+returns trigger language plpgsql security definer set search_path = public as $$
+begin
+  if tg_op = 'UPDATE' and old.study_plan_id is not distinct from new.study_plan_id
+     and old.subject is not distinct from new.subject and old.completed = new.completed then
+    return null;
+  end if;
+  if tg_op in ('UPDATE', 'DELETE') and old.study_plan_id is not null then
+    perform study_plan_apply(old.study_plan_id, old.subject, -1, case when old.completed then -1 else 0 end);
+  end if;
+  if tg_op in ('INSERT', 'UPDATE') and new.study_plan_id is not null then
+    perform study_plan_apply(new.study_plan_id, new.subject, 1, case when new.completed then 1 else 0 end);
+  end if;
+  return null;
+end $$;
+
+drop trigger if exists todos_track_study_progress on public.todos;
+create trigger todos_track_study_progress
+  after insert or delete or update of completed, study_plan_id, subject on public.todos
+  for each row execute function public.todos_track_study_progress();
+
+-- Repairs counters that drifted (manual SQL, restores, trigger bugs) by counting
+-- from scratch. Only plans whose counters were off are written; returns how many.
+-- The backend calls it every STUDY_PROGRESS_REPAIR_SECONDS.
+create or replace function public.recompute_study_progress()
+returns integer language plpgsql security definer set search_path = public as $$
+declare
+  fixed integer;
+begin
+  -- one recount at a time: a worker that finds one running skips this round
+  if not pg_try_advisory_xact_lock(hashtext('recompute_study_progress')) then
+    return 0;
+  end if;
+  -- Waits for transactions whose triggers already moved a plan's counters and
+  -- holds back new ones until this commits, so the counts below (a fresh
+  -- snapshot under READ COMMITTED) can't overwrite a concurrent delta. One
+  -- table lock rather than FOR UPDATE on every plan row: taken in a single
+  -- step, it can't deadlock with a transaction that touches several plans.
+  lock table study_plans in share row exclusive mode;
+  with counts as (
+    select p.id, count(t.id)::integer as total, (count(t.id) filter (where t.completed))::integer as done
+    from study_plans p left join todos t on t.study_plan_id = p.id
+    group by p.id
+  ), subjects as (
+    select study_plan_id as id, jsonb_object_agg(subject, jsonb_build_object('total', total, 'done', done)) as counts
+    from (
+      select study_plan_id, subject, count(*)::integer as total, (count(*) filter (where completed))::integer as done
+      from todos where study_plan_id is not null and subject is not null
+      group by study_plan_id, subject
+    ) per_subject
+    group by study_plan_id
+  ), fixed_rows as (
+    update study_plans p set
+      todos_total = c.total,
+      todos_done = c.done,
+      subject_counts = coalesce(s.counts, '{}'),
+      progress = case when c.total > 0 then round(100.0 * c.done / c.total)::integer else p.progress end,
+      status = case
+        when c.total > 0 and c.done = c.total then 'completed'
+        when p.status = 'completed' and c.total > 0 then 'active'
+        else p.status end
+    from counts c left join subjects s on s.id = c.id
+    where p.id = c.id
+      and (p.todos_total, p.todos_done, p.subject_counts)
+          is distinct from (c.total, c.done, coalesce(s.counts, '{}'))
+    returning 1
+  )
+  select count(*)::integer into fixed from fixed_rows;
+  return fixed;
+end $$;
+
+revoke all on function public.recompute_study_progress() from public, anon, authenticated;
+revoke all on function public.study_plan_apply(bigint, text, integer, integer) from public, anon, authenticated;
+
+-- backfill
+select public.recompute_study_progress();
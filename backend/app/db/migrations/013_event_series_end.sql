@@ -0,0 +1,25 @@
+-- 013_event_series_end.sql
+-- Recurring events end where COUNT/UNTIL ends them, not at infinity.
+-- Run in your Supabase project's SQL editor.
+
+-- End of a series' last occurrence, computed by the API from the RRULE on every
+-- write (app/utils/recurrence.py); null for single events and endless series.
+alter table public.events add column if not exists series_ends_at timestamptz;
+
+-- 007 left every recurring series open-ended, so /events/range had to expand
+-- long-finished series. A generated column's expression can't be altered;
+-- recreate it (this drops idx_events_span too).
+-- Series saved before this migration stay open-ended until they are next written.
+alter table public.events drop column if exists span;
+alter table public.events
+  add column span tstzrange
+  generated always as (
+    case
+      when rrule is not null then tstzrange(starts_at, series_ends_at, '[]')
+      when ends_at is null or ends_at <= starts_at then tstzrange(starts_at, starts_at, '[]')
+      else tstzrange(starts_at, ends_at, '[)')
+    end
+  ) stored;
+
+create index if not exists idx_events_span
+  on public.events using gist (span);
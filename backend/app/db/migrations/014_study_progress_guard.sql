@@ -0,0 +1,24 @@
+-- 014_study_progress_guard.sql
+-- While a plan has linked todos its progress and status follow them (see 012),
+-- whoever writes the row: a client's progress/status is ignored then.
+-- Run in your Supabase project's SQL editor.
+
+-- Same rule as study_plan_apply() and recompute_study_progress(): progress is
+-- the share of done todos, and status is 'completed' exactly when all of them
+-- are done; any other status the plan had before is kept.
+create or replace function public.study_plans_progress_follows_todos()
+returns trigger language plpgsql as $$
+begin
+  new.progress := round(100.0 * new.todos_done / new.todos_total)::integer;
+  new.status := case
+    when new.todos_done = new.todos_total then 'completed'
+    when old.status = 'completed' then 'active'
+    else old.status end;
+  return new;
+end $$;
+
+drop trigger if exists study_plans_progress_follows_todos on public.study_plans;
+create trigger study_plans_progress_follows_todos
+  before update on public.study_plans
+  for each row when (new.todos_total > 0)
+  execute function public.study_plans_progress_follows_todos();
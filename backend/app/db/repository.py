@@ -0,0 +1,199 @@
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException
+from postgrest.exceptions import APIError
+from postgrest.types import CountMethod
+from pydantic import BaseModel
+
+from app.api.errors import supabase_error_to_http
+from app.core.config import settings
+from app.core.tracing import span
+from app.db.supabase_client import get_global_supabase
+from app.schemas.event import EventOut
+from app.schemas.marketplace import MarketplaceItemOut
+from app.schemas.study import StudyPlanOut
+from app.schemas.todo import TodoOut
+from app.utils.pagination import Page, encode_cursor, keyset_bound, keyset_filter, to_cursor_paging
+
+# (column, operator, value) where operator is one of the postgrest filter names:
+# eq, neq, gt, gte, lt, lte, in, is -- or a raw postgrest operator such as "wfts(english)"
+Filter = Tuple[str, str, Any]
+
+# postgrest-py names these with a trailing underscore (python keywords)
+_KEYWORD_OPS = {"in", "is"}
+
+# set by the database, never written back from a read row
+_DB_MAINTAINED = ("id", "created_at", "version")
+
+
+def unwrap(resp) -> Any:
+    """The one place that knows the shape of a Supabase/PostgREST response."""
+    if resp is None:
+        return None
+    data = getattr(resp, "data", None)
+    if data is None and isinstance(resp, dict):
+        data = resp.get("data")
+    return data
+
+
+def columns_for(model: Type[BaseModel]) -> str:
+    """Select only what the response schema exposes instead of `*`."""
+    return ",".join(model.model_fields)
+
+
+def _apply_filters(query, filters: Iterable[Filter]):
+    for column, op, value in filters:
+        if op in _KEYWORD_OPS:
+            query = getattr(query, op + "_")(column, value)
+        elif op.isidentifier():
+            query = getattr(query, op)(column, value)
+        else:
+            # operators with arguments, e.g. wfts(english)
+            query = query.filter(column, op, value)
+    return query
+
+
+class Repository:
+    """
+    CRUD for one table, scoped by owner. Values must already be JSON-ready
+    (use `model_dump(mode="json")`).
+    """
+
+    def __init__(
+        self, table: str, out_model: Type[BaseModel], owner_column: str = "user_id", maintained: Sequence[str] = (),
+    ):
+        self.table = table
+        self.out_model = out_model
+        self.columns = columns_for(out_model)
+        self.owner_column = owner_column
+        # out_model fields that may be written back from a read row: not database-set ones, nor
+        # `maintained` ones the database keeps up to date itself (e.g. trigger counters)
+        self.writable = [name for name in out_model.model_fields if name not in {*_DB_MAINTAINED, *maintained}]
+
+    def _table(self):
+        supabase = get_global_supabase()
+        if supabase is None:
+            raise HTTPException(status_code=500, detail="Supabase client not initialized")
+        return supabase.table(self.table)
+
+    async def _run(self, query, error_message: str = "Service error"):
+        try:
+            with span(f"db.{self.table}"):
+                return await query.execute()
+        except APIError as exc:
+            supabase_error_to_http(exc, error_message)
+
+    async def _execute(self, query, error_message: str = "Service error"):
+        return unwrap(await self._run(query, error_message))
+
+    def _scoped(self, query, user_id: Optional[str]):
+        if user_id is not None:
+            query = query.eq(self.owner_column, user_id)
+        return query
+
+    async def create(self, user_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        row = {**values, self.owner_column: user_id}
+        data = await self._execute(self._table().insert(row), f"Failed to create {self.table}")
+        return data[0] if data else None
+
+    async def get(self, id: int, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query = self._scoped(self._table().select(self.columns).eq("id", id), user_id)
+        data = await self._execute(query.limit(1))
+        return data[0] if data else None
+
+    async def list(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        filters: Sequence[Filter] = (),
+        order: str = "created_at",
+        desc: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        query = self._scoped(self._table().select(self.columns), user_id)
+        query = _apply_filters(query, filters)
+        _, after = to_cursor_paging(limit, cursor)
+        if after is not None:
+            query = _apply_filters(query, [keyset_bound(order, desc, after)]).or_(keyset_filter(order, desc, after))
+        query = query.order(order, desc=desc).order("id", desc=desc).limit(limit)
+        if offset and after is None:
+            # offset is only honoured for old clients that don't send a cursor
+            query = query.offset(offset)
+        return await self._execute(query) or []
+
+    async def count(self, *, user_id: Optional[str] = None, filters: Sequence[Filter] = ()) -> int:
+        """Exact row count (a HEAD request; no rows are transferred)."""
+        query = self._scoped(self._table().select("id", count=CountMethod.exact, head=True), user_id)
+        resp = await self._run(_apply_filters(query, filters))
+        return getattr(resp, "count", None) or 0
+
+    async def page(self, *, order: str = "created_at", limit: int = 20, **kwargs) -> Page:
+        """`list` plus the cursor for the following page (None on the last page)."""
+        rows = await self.list(order=order, limit=limit + 1, **kwargs)
+        if len(rows) <= limit:
+            return Page(rows, None)
+        rows = rows[:limit]
+        last = rows[-1]
+        return Page(rows, encode_cursor(last[order], last["id"]))
+
+    async def iter_all(self, *, page_size: int = 500, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Every matching row, fetched one keyset page at a time."""
+        cursor = None
+        while True:
+            page = await self.page(limit=page_size, cursor=cursor, **kwargs)
+            for row in page.rows:
+                yield row
+            if not page.next_cursor:
+                return
+            cursor = page.next_cursor
+
+    async def update(
+        self, id: int, user_id: str, values: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        """None if the row doesn't exist, isn't owned, or (with `expected_version`) has moved on."""
+        if not values:
+            return await self.get(id, user_id)
+        query = self._table().update(values).eq("id", id).eq(self.owner_column, user_id)
+        if expected_version is not None:
+            # the version trigger (migration 011) bumps it on every update
+            query = query.eq("version", expected_version)
+        # the same columns, in the same order, as get(): the row's ETag must match a later GET's
+        data = await self._execute(query.select(self.columns), f"Failed to update {self.table}")
+        return data[0] if data else None
+
+    async def delete(self, id: int, user_id: str) -> Optional[Dict[str, Any]]:
+        """The deleted row; None if it doesn't exist or isn't owned (nothing was deleted)."""
+        query = self._table().delete().eq("id", id).eq(self.owner_column, user_id)
+        data = await self._execute(query, f"Failed to delete {self.table}")
+        return data[0] if data else None
+
+    async def create_many(self, user_id: str, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One multi-row insert. Returned rows are in the same order as `rows`."""
+        payload = [{**values, self.owner_column: user_id} for values in rows]
+        data = await self._execute(self._table().insert(payload), f"Failed to create {self.table}") or []
+        # RETURNING order isn't guaranteed, but one insert takes its ids from the sequence in input order
+        return sorted(data, key=lambda row: row["id"])
+
+    async def delete_many(self, ids: Sequence[int], user_id: str) -> List[Dict[str, Any]]:
+        """Deletes every owned row in `ids`; returns the rows that were actually deleted."""
+        query = self._table().delete().in_("id", list(ids)).eq(self.owner_column, user_id)
+        return await self._execute(query, f"Failed to delete {self.table}") or []
+
+
+def build_repository(table: str, out_model: Type[BaseModel], maintained: Sequence[str] = ()) -> Repository:
+    if settings.DATA_BACKEND == "sql":
+        from app.db.sql_repository import SqlRepository
+
+        return SqlRepository(table, out_model, maintained=maintained)
+    return Repository(table, out_model, maintained=maintained)
+
+
+todos_repo = build_repository("todos", TodoOut)
+# the counters belong to the todos trigger (migration 012), and progress/status follow them (014)
+study_plans_repo = build_repository(
+    "study_plans", StudyPlanOut, maintained=("todos_total", "todos_done", "subject_counts", "progress", "status"),
+)
+events_repo = build_repository("events", EventOut)
+marketplace_repo = build_repository("marketplace_items", MarketplaceItemOut)
@@ -0,0 +1,84 @@
+"""
+Engine for DATA_BACKEND=sql. One pooled AsyncEngine per process, created in
+the app lifespan; asyncpg for Postgres, aiosqlite for local runs and tests.
+"""
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core import metrics
+from app.core.config import settings
+
+_engine: Optional[AsyncEngine] = None
+
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        options = {"connect_args": {"timeout": settings.DB_POOL_TIMEOUT_SECONDS}}
+        if ":memory:" in url or url.rstrip("/").endswith("sqlite+aiosqlite:"):
+            # an in-memory database only exists on its one connection
+            options["poolclass"] = StaticPool
+        return options
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        # drop connections before the server or a proxy in between times them out,
+        # instead of pinging on every checkout
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "connect_args": {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    }
+
+
+def build_engine(url: Optional[str] = None) -> AsyncEngine:
+    url = url or settings.DATABASE_URL
+    engine = create_async_engine(url, echo=settings.DB_ECHO, **_engine_options(url))
+    if url.startswith("sqlite"):
+        event.listen(engine.sync_engine, "connect", _sqlite_foreign_keys)
+    return engine
+
+
+def _sqlite_foreign_keys(dbapi_connection, _record):
+    # SQLite ignores REFERENCES (and ON DELETE SET NULL) unless asked per connection
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+async def init_sql_engine():
+    global _engine
+    if _engine is None:
+        _engine = build_engine()
+
+
+async def close_sql_engine():
+    global _engine
+    if _engine is not None:
+        await _engine.dispose()
+    _engine = None
+
+
+def get_engine() -> Optional[AsyncEngine]:
+    return _engine
+
+
+async def create_all():
+    """Creates every table on the current engine (tests and throwaway SQLite files; use Alembic otherwise)."""
+    from app.db.tables import metadata
+
+    async with _engine.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+
+
+def collect():
+    pool = _engine.pool if _engine is not None else None
+    if pool is None or not hasattr(pool, "checkedout"):
+        return
+    yield "taskhive_db_pool_size", "gauge", {}, pool.size()
+    yield "taskhive_db_pool_checked_out", "gauge", {}, pool.checkedout()
+    yield "taskhive_db_pool_overflow", "gauge", {}, max(0, pool.overflow())
+
+
+metrics.register_collector(collect)
@@ -0,0 +1,227 @@
+"""
+Repository over SQLAlchemy Core (DATA_BACKEND=sql).
+
+Same interface and row shapes as the PostgREST repository: values come in
+JSON-ready (`model_dump(mode="json")`) and rows go out the way PostgREST would
+return them (ISO timestamps, numbers, string ids), so routers, caches and
+cursors can't tell the two apart.
+"""
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import (
+    Date, DateTime, Numeric, and_, delete, func, insert, literal, literal_column, or_, select, tuple_, update,
+)
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.api.errors import supabase_error_to_http
+from app.core.tracing import span
+from app.db.repository import Filter, Repository
+from app.db.sql import get_engine
+from app.db.tables import TABLES
+from app.utils.pagination import to_cursor_paging
+from app.utils.recurrence import parse_ts
+
+_COMPARISONS = {
+    "eq": lambda c, v: c == v,
+    "neq": lambda c, v: c != v,
+    "gt": lambda c, v: c > v,
+    "gte": lambda c, v: c >= v,
+    "lt": lambda c, v: c < v,
+    "lte": lambda c, v: c <= v,
+}
+
+
+def _to_utc(value: datetime) -> datetime:
+    # SQLite drops the offset, so everything is stored as UTC and read back as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return _to_utc(value).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _bind(column, value: Any) -> Any:
+    """JSON-ready value -> what the driver expects for `column`."""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        return _to_utc(parse_ts(value) if isinstance(value, str) else value)
+    if isinstance(column.type, Date) and isinstance(value, str):
+        return date.fromisoformat(value)
+    if isinstance(column.type, Numeric) and not isinstance(value, Decimal):
+        return Decimal(str(value))
+    return value
+
+
+# ---- raw PostgREST operators ----
+
+def _websearch(table, dialect: str, column: str, value: str):
+    if dialect == "postgresql":
+        # `search` is the generated tsvector column from the Alembic migration (GIN indexed)
+        return literal_column(column).op("@@")(func.websearch_to_tsquery(literal_column("'english'"), value))
+    # no full-text index elsewhere: every word must appear in the title or description
+    terms = [term.strip('"') for term in value.split() if term.strip('"')]
+    return and_(*(
+        or_(table.c.title.ilike(f"%{term}%"), table.c.description.ilike(f"%{term}%")) for term in terms
+    ))
+
+
+def _overlaps(table, dialect: str, column: str, value: str):
+    # value is span_filter's "[from,to)"; `to` may be empty (open-ended)
+    lower, upper = value[1:-1].split(",")
+    c = table.c
+    start = _bind(c.starts_at, lower)
+    end = _bind(c.starts_at, upper) if upper else None
+    if dialect == "postgresql":
+        # `span` is the generated tstzrange column from the Alembic migration (GiST indexed)
+        bounds = func.tstzrange(literal(start, c.starts_at.type), literal(end, c.starts_at.type), literal_column("'[)'"))
+        return literal_column(column).op("&&")(bounds)
+    # the same ranges `span` describes in 013_event_series_end.sql
+    clauses = [c.starts_at < end] if end is not None else []
+    clauses.append(or_(
+        and_(c.rrule.is_not(None), or_(c.series_ends_at.is_(None), c.series_ends_at >= start)),
+        and_(or_(c.ends_at.is_(None), c.ends_at <= c.starts_at), c.starts_at >= start),
+        and_(c.ends_at > c.starts_at, c.ends_at > start),
+    ))
+    return and_(*clauses)
+
+
+_RAW_OPS = {"wfts(english)": _websearch, "ov": _overlaps}
+
+
+class SqlRepository(Repository):
+    def __init__(
+        self, table: str, out_model: Type[BaseModel], owner_column: str = "user_id", maintained: Sequence[str] = (),
+    ):
+        super().__init__(table, out_model, owner_column, maintained)
+        self.t = TABLES[table]
+        self.out_columns = [self.t.c[name] for name in out_model.model_fields]
+        self.owner = self.t.c[owner_column]
+
+    def _engine(self):
+        engine = get_engine()
+        if engine is None:
+            raise HTTPException(status_code=500, detail="Database engine not initialized")
+        return engine
+
+    async def _rows(self, stmt, error_message: str = "Service error", params=None) -> List[Dict[str, Any]]:
+        try:
+            with span(f"db.{self.table}"):
+                async with self._engine().begin() as conn:
+                    result = await conn.execute(stmt, params)
+                    rows = result.mappings().all() if result.returns_rows else []
+        except SQLAlchemyError as exc:
+            supabase_error_to_http(exc, error_message)
+        # keys are sqlalchemy quoted_name (a str subclass orjson won't take)
+        return [{str(key): _jsonable(value) for key, value in row.items()} for row in rows]
+
+    def _values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: _bind(self.t.c[key], value) for key, value in values.items()}
+
+    def _where(self, filters: Iterable[Filter], user_id: Optional[str], dialect: str):
+        clauses = [self.owner == user_id] if user_id is not None else []
+        for column, op, value in filters:
+            if op in _RAW_OPS:
+                clauses.append(_RAW_OPS[op](self.t, dialect, column, value))
+                continue
+            col = self.t.c[column]
+            if op == "in":
+                clauses.append(col.in_([_bind(col, v) for v in value]))
+            elif op == "is":
+                clauses.append(col.is_(None if value in (None, "null") else value))
+            else:
+                clauses.append(_COMPARISONS[op](col, _bind(col, value)))
+        return clauses
+
+    @property
+    def _dialect(self) -> str:
+        return self._engine().dialect.name
+
+    async def create(self, user_id: str, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        stmt = insert(self.t).values(self._values({**values, self.owner_column: user_id})).returning(*self.out_columns)
+        data = await self._rows(stmt, f"Failed to create {self.table}")
+        return data[0] if data else None
+
+    async def get(self, id: int, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        stmt = select(*self.out_columns).where(self.t.c.id == id, *self._where((), user_id, self._dialect)).limit(1)
+        data = await self._rows(stmt)
+        return data[0] if data else None
+
+    async def list(
+        self,
+        *,
+        user_id: Optional[str] = None,
+        filters: Sequence[Filter] = (),
+        order: str = "created_at",
+        desc: bool = True,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        sort, id_col = self.t.c[order], self.t.c.id
+        stmt = select(*self.out_columns).where(*self._where(filters, user_id, self._dialect))
+        _, after = to_cursor_paging(limit, cursor)
+        if after is not None:
+            key = tuple_(sort, id_col)
+            position = tuple_(_bind(sort, after[0]), after[1])
+            stmt = stmt.where(key < position if desc else key > position)
+        if desc:
+            stmt = stmt.order_by(sort.desc(), id_col.desc())
+        else:
+            stmt = stmt.order_by(sort.asc(), id_col.asc())
+        stmt = stmt.limit(limit)
+        if offset and after is None:
+            stmt = stmt.offset(offset)
+        return await self._rows(stmt)
+
+    async def count(self, *, user_id: Optional[str] = None, filters: Sequence[Filter] = ()) -> int:
+        stmt = select(func.count().label("n")).select_from(self.t).where(*self._where(filters, user_id, self._dialect))
+        data = await self._rows(stmt)
+        return data[0]["n"] if data else 0
+
+    def _bumped(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        # what the version trigger does on Supabase
+        return {**self._values(values), "version": self.t.c.version + 1}
+
+    async def update(
+        self, id: int, user_id: str, values: Dict[str, Any], expected_version: Optional[int] = None
+    ) -> Optional[Dict[str, Any]]:
+        if not values:
+            return await self.get(id, user_id)
+        stmt = update(self.t).where(self.t.c.id == id, self.owner == user_id)
+        if expected_version is not None:
+            stmt = stmt.where(self.t.c.version == expected_version)
+        stmt = stmt.values(self._bumped(values)).returning(*self.out_columns)
+        data = await self._rows(stmt, f"Failed to update {self.table}")
+        return data[0] if data else None
+
+    async def delete(self, id: int, user_id: str) -> Optional[Dict[str, Any]]:
+        stmt = delete(self.t).where(self.t.c.id == id, self.owner == user_id).returning(*self.out_columns)
+        rows = await self._rows(stmt, f"Failed to delete {self.table}")
+        return rows[0] if rows else None
+
+    async def create_many(self, user_id: str, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """One multi-row insert. Returned rows are in the same order as `rows`."""
+        if not rows:
+            return []
+        payload = [self._values({**values, self.owner_column: user_id}) for values in rows]
+        # executemany with RETURNING; SQLAlchemy batches it into multi-row INSERTs ("insertmanyvalues")
+        stmt = insert(self.t).returning(*self.out_columns, sort_by_parameter_order=True)
+        return await self._rows(stmt, f"Failed to create {self.table}", payload)
+
+    async def delete_many(self, ids: Sequence[int], user_id: str) -> List[Dict[str, Any]]:
+        stmt = delete(self.t).where(self.t.c.id.in_(list(ids)), self.owner == user_id).returning(*self.out_columns)
+        return await self._rows(stmt, f"Failed to delete {self.table}")
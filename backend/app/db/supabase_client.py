@@ -1,19 +1,48 @@
 from typing import Optional
-from supabase import create_client, Client, AsyncClient, acreate_client
+import httpx
+from supabase import create_client, AsyncClient, AsyncClientOptions, acreate_client
 from app.core.config import settings
 
 SUPABASE_URL = str(settings.SUPABASE_URL)
 SERVICE_ROLE = settings.SUPABASE_SERVICE_ROLE_KEY
 
 _async_client: Optional[AsyncClient] = None
+_http_client: Optional[httpx.AsyncClient] = None
+
+def _build_http_client() -> httpx.AsyncClient:
+    # One pooled client shared by postgrest, storage and auth. Every request goes
+    # to the same Supabase host, so the pool limits are effectively per-host.
+    return httpx.AsyncClient(
+        http2=settings.SUPABASE_HTTP2,
+        limits=httpx.Limits(
+            max_connections=settings.SUPABASE_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.SUPABASE_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=settings.SUPABASE_HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.SUPABASE_HTTP_TIMEOUT, connect=settings.SUPABASE_HTTP_CONNECT_TIMEOUT),
+    )
 
 async def init_supabase_client():
-    global _async_client
+    global _async_client, _http_client
     if _async_client is None:
         try:
-            _async_client = await acreate_client(SUPABASE_URL, SERVICE_ROLE)
+            _http_client = _build_http_client()
+            _async_client = await acreate_client(
+                SUPABASE_URL, SERVICE_ROLE, options=AsyncClientOptions(httpx_client=_http_client)
+            )
         except Exception:
+            # the sync client brings its own connections; don't leave the pool open
+            if _http_client is not None:
+                await _http_client.aclose()
+                _http_client = None
             _async_client = create_client(SUPABASE_URL, SERVICE_ROLE)  # type: ignore
 
+async def close_supabase_client():
+    global _async_client, _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _async_client = None
+
 def get_global_supabase():
     return _async_client
@@ -0,0 +1,149 @@
+"""
+SQLAlchemy table definitions for DATA_BACKEND=sql, mirroring the Supabase
+schema in app/db/migrations. These are the schema at head: new revisions in
+app/db/alembic are autogenerated from them (`alembic revision --autogenerate`)
+and tests/test_migrations.py checks that upgrading to head matches them. Only
+what SQLAlchemy can't declare portably lives in the revisions alone: the
+Postgres generated columns (`search`, `span`) with their indexes, the
+owner-checking foreign key and the study progress triggers.
+"""
+from sqlalchemy import (
+    JSON, BigInteger, Boolean, Column, DateTime, ForeignKey, Index, Integer, MetaData, Numeric, Table, Text, Uuid,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+
+metadata = MetaData()
+
+# bigserial on Postgres; SQLite only autoincrements an INTEGER primary key
+_ID = BigInteger().with_variant(Integer(), "sqlite")
+_TEXT_ARRAY = ARRAY(Text()).with_variant(JSON(), "sqlite")
+_JSON = JSON().with_variant(JSONB(), "postgresql")
+
+
+class utcnow(FunctionElement):
+    """now() that SQLite stores in the same text format SQLAlchemy binds datetimes in, so they compare."""
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _utcnow_default(element, compiler, **kw):
+    return "now()"
+
+
+@compiles(utcnow, "sqlite")
+def _utcnow_sqlite(element, compiler, **kw):
+    return "(strftime('%Y-%m-%d %H:%M:%f000', 'now'))"
+
+
+def _id():
+    return Column("id", _ID, primary_key=True, autoincrement=True)
+
+
+def _owner():
+    return Column("user_id", Uuid(as_uuid=False), nullable=True)
+
+
+def _version():
+    return Column("version", Integer, nullable=False, server_default=text("1"))
+
+
+def _created_at():
+    return Column("created_at", DateTime(timezone=True), nullable=False, server_default=utcnow())
+
+
+todos = Table(
+    "todos", metadata,
+    _id(),
+    _owner(),
+    Column("title", Text, nullable=False),
+    Column("description", Text),
+    Column("due_date", DateTime(timezone=True)),
+    Column("completed", Boolean, nullable=False, server_default=text("false")),
+    _created_at(),
+    Column("updated_at", DateTime(timezone=True)),
+    _version(),
+    # the plan (and which of its subjects) this todo counts towards
+    Column("study_plan_id", _ID, ForeignKey("study_plans.id", ondelete="SET NULL", name="todos_study_plan_fk")),
+    Column("subject", Text),
+    Index("idx_todos_user_created_id", "user_id", text("created_at desc"), text("id desc")),
+    Index("idx_todos_open_due_id", "due_date", "id",
+          postgresql_where=text("completed = false and due_date is not null"),
+          sqlite_where=text("completed = 0 and due_date is not null")),
+    Index("idx_todos_user_open_due_id", "user_id", "due_date", "id",
+          postgresql_where=text("completed = false"), sqlite_where=text("completed = 0")),
+    Index("idx_todos_study_plan", "study_plan_id", "subject", postgresql_where=text("study_plan_id is not null"),
+          sqlite_where=text("study_plan_id is not null")),
+)
+
+study_plans = Table(
+    "study_plans", metadata,
+    _id(),
+    _owner(),
+    Column("title", Text, nullable=False),
+    Column("subjects", _TEXT_ARRAY, nullable=False, default=lambda: []),
+    Column("duration", Text),
+    Column("progress", Integer, nullable=False, server_default=text("0")),
+    Column("status", Text, nullable=False, server_default=text("'draft'")),
+    _created_at(),
+    Column("deadline", DateTime(timezone=True)),
+    _version(),
+    # maintained by triggers on todos; see migration 012
+    Column("todos_total", Integer, nullable=False, server_default=text("0")),
+    Column("todos_done", Integer, nullable=False, server_default=text("0")),
+    Column("subject_counts", _JSON, nullable=False, server_default=text("'{}'")),
+    Index("idx_study_user_created_id", "user_id", text("created_at desc"), text("id desc")),
+    Index("idx_study_deadline_id", "deadline", "id", postgresql_where=text("deadline is not null"),
+          sqlite_where=text("deadline is not null")),
+)
+
+marketplace_items = Table(
+    "marketplace_items", metadata,
+    _id(),
+    _owner(),
+    Column("title", Text, nullable=False),
+    Column("description", Text),
+    Column("price", Numeric(12, 2), nullable=False, server_default=text("0")),
+    Column("available", Boolean, nullable=False, server_default=text("true")),
+    _created_at(),
+    Column("image_path", Text),
+    _version(),
+    Index("idx_market_available_created_id", "available", text("created_at desc"), text("id desc")),
+    Index("idx_market_user_created_id", "user_id", text("created_at desc"), text("id desc")),
+    Index("idx_market_available_price_id", "available", "price", "id"),
+    Index("idx_market_user_available", "user_id", postgresql_where=text("available = true"),
+          sqlite_where=text("available = 1")),
+)
+
+events = Table(
+    "events", metadata,
+    _id(),
+    _owner(),
+    Column("title", Text, nullable=False),
+    Column("description", Text),
+    Column("starts_at", DateTime(timezone=True), nullable=False),
+    Column("ends_at", DateTime(timezone=True)),
+    Column("location", Text),
+    _created_at(),
+    Column("rrule", Text),
+    _version(),
+    Column("series_ends_at", DateTime(timezone=True)),
+    Index("idx_events_starts_id", "starts_at", "id"),
+    Index("idx_events_user_starts_id", "user_id", text("starts_at desc"), text("id desc")),
+)
+
+TABLES = {t.name: t for t in (todos, study_plans, marketplace_items, events)}
+
+# declared by the revisions only (see the module docstring); autogenerate leaves them alone
+REVISION_ONLY = {
+    "search", "span", "idx_market_search", "idx_events_span",
+    "study_plans_id_user_key", "todos_study_plan_fk",
+}
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """Alembic `include_object` hook for comparing a database against `metadata`."""
+    return name not in REVISION_ONLY
@@ -0,0 +1,71 @@
+# app/instrumentation.py
+import time
+import uuid
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.core.logging import request_id_var
+
+request_seconds = metrics.Histogram(
+    "taskhive_http_request_duration_seconds", ("method", "route", "status")
+)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_KEY = REQUEST_ID_HEADER.lower().encode("latin-1")
+
+# Scrapes shouldn't show up in their own latency numbers.
+SKIP_PATHS = {"/metrics"}
+
+def _observe(scope: Scope, status_code: int, elapsed: float):
+    # route template (/todos/{todo_id}) rather than the raw path keeps label cardinality bounded;
+    # the router has put the matched route into the scope by the time the response starts
+    route = scope.get("route")
+    request_seconds.observe(elapsed, scope["method"], getattr(route, "path", "unmatched"), str(status_code))
+
+class InstrumentationMiddleware:
+    """
+    Request id, per-request spans, the latency histogram and (with
+    SERVER_TIMING_ENABLED) Server-Timing, as pure ASGI: the headers go onto
+    the response start message and the body is passed through, so nothing is
+    buffered or run in an extra task. Latency is measured to the start of the
+    response, as before.
+    """
+
+    def __init__(self, app: ASGIApp, server_timing: bool = settings.SERVER_TIMING_ENABLED):
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in SKIP_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == _REQUEST_ID_KEY), None
+        ) or uuid.uuid4().hex
+        rid_token = request_id_var.set(request_id)
+        token = tracing.start_request()
+        spans = tracing.request_spans()
+        start = time.perf_counter()
+        started = False
+
+        async def send_instrumented(message: Message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                elapsed = time.perf_counter() - start
+                _observe(scope, message["status"], elapsed)
+                headers = [*(message.get("headers") or []), (_REQUEST_ID_KEY, request_id.encode("latin-1"))]
+                if self.server_timing:
+                    headers.append((b"server-timing", tracing.server_timing(spans, elapsed).encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            with tracing.request_span(f"{scope['method']} {scope['path']}"):
+                await self.app(scope, receive, send_instrumented)
+        finally:
+            if not started:
+                _observe(scope, 500, time.perf_counter() - start)
+            tracing.end_request(token)
+            request_id_var.reset(rid_token)
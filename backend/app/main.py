@@ -1,41 +1,81 @@
-import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import Response
+from fastapi import Depends, FastAPI
 from starlette.middleware.cors import CORSMiddleware
-from starlette.middleware.trustedhost import TrustedHostMiddleware
-from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 from contextlib import asynccontextmanager
 
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-
-from secure import Secure 
 from app.core.config import settings
-from app.core.logging import logger
-from app.db.supabase_client import init_supabase_client
-from app.api.routers import todos, study, marketplace, events, storage, admin
-from app.security_headers import add_security_headers_middleware
-
+from app.core.logging import logger, setup_logging, shutdown_logging
+from app.db.supabase_client import init_supabase_client, close_supabase_client
+from app.api.routers import todos, study, marketplace, events, storage, admin, metrics, export, realtime, dashboard
+from app.security_headers import SecurityHeadersMiddleware
+from app.instrumentation import InstrumentationMiddleware, REQUEST_ID_HEADER
+from app.core.tracing import setup_otel
+from app.utils.pagination import NEXT_CURSOR_HEADER
+from app.utils.responses import FastJSONResponse
+from app.api.deps import rate_limit
+from app.core.rate_limit import limiter
+from app.services.auth_service import check_local_verification
+from app.services.notifications import build_notification_service
+from app.services.realtime import relay
+from app.services.admin_stats import admin_stats
+from app.services.study_progress import study_progress
+from app.services.storage_service import storage_signer
+from app.services.thumbnails import thumbnails
+from app.services import updates
 
-# Rate limiter (example)
-limiter = Limiter(key_func=get_remote_address, default_limits=[f"{settings.RATE_LIMIT_REQUESTS_PER_MINUTE}/minute"])
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    setup_logging()  # again after a previous lifespan's shutdown_logging()
+    setup_otel(logger)
+    await check_local_verification()
     logger.info("Initializing Supabase client...")
     await init_supabase_client()
+    if settings.DATA_BACKEND == "sql":
+        # SQLAlchemy is only imported when it's used; it's a big part of a cold start
+        from app.db.sql import init_sql_engine
+        await init_sql_engine()
+    storage_signer.configure()
+    limiter.start()
+    admin_stats.start()
+    study_progress.start()
+    thumbnails.start()
+    if relay:
+        relay.start()
+    notifications = build_notification_service() if settings.NOTIFICATIONS_ENABLED else None
+    if notifications:
+        notifications.start()
     yield   # ← this hands control back to FastAPI to run the application
     logger.info("Shutting down...")
+    await limiter.stop()
+    await admin_stats.stop()
+    await study_progress.stop()
+    await thumbnails.stop()
+    if relay:
+        await relay.stop()
+    if notifications:
+        await notifications.stop()
+    if settings.DATA_BACKEND == "sql":
+        from app.db.sql import close_sql_engine
+        await close_sql_engine()
+    await close_supabase_client()
+    shutdown_logging()
 
 app = FastAPI(
     title="Taskhive Backend",
     version="0.2.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
+    # per-user (or per-IP) limits on every route; see app/core/rate_limit.py
+    dependencies=[Depends(rate_limit)],
 )
 
-app.middleware("http")(add_security_headers_middleware)
+# Pure ASGI middlewares (no call_next): they only touch the response start message.
+# Added last = outermost, so requests pass CORS -> instrumentation -> security headers.
+app.add_middleware(SecurityHeadersMiddleware)
+app.add_middleware(InstrumentationMiddleware)
 
 # Optional: enforce HTTPS in production (only enable when you actually run under HTTPS)
+# from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
 # app.add_middleware(HTTPSRedirectMiddleware)
 
 # CORS — lock this down in production to your frontend origin(s)
@@ -46,19 +86,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
-)
-
-secure_headers = (
-    Secure()
-    
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER, events.RANGE_TRUNCATED_HEADER, *updates.RESPONSE_HEADERS],
 )
 
 app.include_router(todos.router)
 app.include_router(study.router)
 app.include_router(marketplace.router)
 app.include_router(events.router)
+app.include_router(dashboard.router)
 app.include_router(storage.router)
 app.include_router(admin.router)
+app.include_router(export.router)
+app.include_router(realtime.router)
+app.include_router(metrics.router)
+
+if settings.STORAGE_BACKEND == "local":
+    # development stand-in for Supabase's public object URLs
+    from fastapi.staticfiles import StaticFiles
+
+    app.mount(settings.STORAGE_LOCAL_BASE_URL, StaticFiles(directory=settings.STORAGE_LOCAL_ROOT, check_dir=False), name="media")
 
 
 
@@ -71,4 +117,6 @@ async def root():
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run("app.main:app", host=settings.APP_HOST, port=settings.APP_PORT, reload=True)
@@ -0,0 +1,22 @@
+# app/schemas/admin.py
+from pydantic import BaseModel
+from typing import Dict, List, Literal
+from datetime import date, datetime
+
+class SeriesPoint(BaseModel):
+    bucket: date  # first day of the bucket
+    value: int
+
+class ActiveUsers(BaseModel):
+    last_7_days: int
+    last_30_days: int
+
+class AdminStatsOut(BaseModel):
+    # users, listings_available, listings_unavailable
+    totals: Dict[str, int]
+    active_users: ActiveUsers
+    # signups, todos_created, listings_created, active_users (daily buckets only)
+    series: Dict[str, List[SeriesPoint]]
+    bucket: Literal["day", "week", "month"]
+    generated_at: datetime
+    age_seconds: float
@@ -0,0 +1,17 @@
+# app/schemas/batch.py
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+class BatchDelete(BaseModel):
+    ids: List[int] = Field(..., examples=[[1, 2, 3]])
+
+class BatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    ok: bool
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
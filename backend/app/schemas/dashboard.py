@@ -0,0 +1,22 @@
+# app/schemas/dashboard.py
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.event import EventOut
+from app.schemas.study import StudyPlanOut
+from app.schemas.todo import TodoOut
+
+class DashboardCounts(BaseModel):
+    open_todos: Optional[int] = None
+    overdue_todos: Optional[int] = None
+    study_plans: Optional[int] = None
+    upcoming_events: Optional[int] = None
+    marketplace_listings: Optional[int] = None
+
+class DashboardOut(BaseModel):
+    counts: DashboardCounts
+    # a section is null when its query failed or ran past the per-query timeout
+    overdue_todos: Optional[List[TodoOut]] = None
+    next_events: Optional[List[EventOut]] = None
+    study_plans: Optional[List[StudyPlanOut]] = None
+    # names of the sections/counts that are missing from this response
+    unavailable: List[str] = []
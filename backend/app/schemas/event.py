@@ -1,7 +1,8 @@
 # app/schemas/event.py
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, StrictInt, field_validator
 from typing import Optional
 from datetime import datetime
+from app.utils.recurrence import validate_rrule
 
 class EventCreate(BaseModel):
     title: str = Field(..., examples=["Study Group"])
@@ -9,13 +10,23 @@ class EventCreate(BaseModel):
     starts_at: datetime
     ends_at: Optional[datetime]
     location: Optional[str] = None
+    # RFC 5545 recurrence rule; starts_at/ends_at are the first occurrence
+    rrule: Optional[str] = Field(None, examples=["FREQ=WEEKLY;BYDAY=TU,TH;COUNT=12"])
+
+    _check_rrule = field_validator("rrule")(validate_rrule)
 
 class EventUpdate(BaseModel):
-    title: Optional[str]
-    description: Optional[str]
-    starts_at: Optional[datetime]
-    ends_at: Optional[datetime]
-    location: Optional[str]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    location: Optional[str] = None
+    rrule: Optional[str] = None
+
+    _check_rrule = field_validator("rrule")(validate_rrule)
+
+class EventBatchUpdate(EventUpdate):
+    id: StrictInt  # StrictInt: true/false aren't ids
 
 class EventOut(BaseModel):
     id: int
@@ -26,6 +37,9 @@ class EventOut(BaseModel):
     ends_at: Optional[datetime]
     created_at: datetime
     location: Optional[str]
+    rrule: Optional[str] = None
+    # end of the last occurrence when COUNT/UNTIL ends the series; set by the API, null = never ends
+    series_ends_at: Optional[datetime] = None
+    version: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
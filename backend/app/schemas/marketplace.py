@@ -1,20 +1,26 @@
 # app/schemas/marketplace.py
-from pydantic import BaseModel, Field, condecimal
-from typing import Optional,Annotated
+from pydantic import BaseModel, ConfigDict, Field, computed_field, condecimal
+from typing import List, Optional,Annotated
 from datetime import datetime
 from decimal import Decimal
 
+from app.core.config import settings
+from app.schemas.storage import Thumbnail
+from app.utils.media import thumbnails_for
+
 class MarketplaceItemCreate(BaseModel):
     title: str = Field(..., examples=["Used Graphing Calculator"])
     description: Optional[str] = Field(None, examples=["Gently used, works fine"])
     price: Annotated[Decimal, Field(max_digits=12, decimal_places=2)]
     available: bool = True
+    image_path: Optional[str] = None  # object path in MARKETPLACE_IMAGE_BUCKET
 
 class MarketplaceItemUpdate(BaseModel):
-    title: Optional[str]
-    description: Optional[str]
-    price: Optional[Annotated[Decimal, Field(max_digits=12, decimal_places=2)]]
-    available: Optional[bool]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    price: Optional[Annotated[Decimal, Field(max_digits=12, decimal_places=2)]] = None
+    available: Optional[bool] = None
+    image_path: Optional[str] = None
 
 class MarketplaceItemOut(BaseModel):
     id: int
@@ -24,7 +30,14 @@ class MarketplaceItemOut(BaseModel):
     price: Decimal
     available: bool
     created_at: datetime
+    image_path: Optional[str] = None
+    version: int
+
+    @computed_field
+    @property
+    def thumbnails(self) -> List[Thumbnail]:
+        if not self.image_path:
+            return []
+        return [Thumbnail(**t) for t in thumbnails_for(self.image_path, settings.MARKETPLACE_IMAGE_BUCKET)]
 
-    class Config:
-        orm_mode = True
-        json_encoders = {Decimal: lambda v: str(v)}
+    model_config = ConfigDict(from_attributes=True)
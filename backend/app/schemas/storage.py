@@ -0,0 +1,55 @@
+# app/schemas/storage.py
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+class PresignBatch(BaseModel):
+    filenames: List[str] = Field(..., min_length=1, examples=[["front.jpg", "back.jpg"]])
+    bucket: str = "public"
+    upsert: bool = False
+
+class PresignedUpload(BaseModel):
+    path: str
+    url: Optional[str]
+    token: Optional[str]
+    expires_in: Optional[int]
+    error: Optional[str] = None
+
+class PresignBatchResult(BaseModel):
+    results: List[PresignedUpload]
+
+class ResumableUploadCreate(BaseModel):
+    filename: str
+    size: int = Field(..., gt=0)
+    content_type: str = "application/octet-stream"
+    bucket: str = "public"
+    upsert: bool = False
+
+class ResumableSession(BaseModel):
+    path: str
+    endpoint: str  # TUS creation URL
+    chunk_size: int
+    expires_in: int
+    headers: Dict[str, str]  # send with the TUS creation request
+    metadata: Dict[str, str]
+
+class DownloadUrlsRequest(BaseModel):
+    paths: List[str] = Field(..., min_length=1)
+    bucket: str = "public"
+    expires_in: int = Field(3600, ge=60, le=7 * 24 * 3600)
+
+class DownloadUrls(BaseModel):
+    urls: Dict[str, Optional[str]]
+
+class Thumbnail(BaseModel):
+    width: int
+    format: str
+    url: str
+
+class UploadComplete(BaseModel):
+    path: str  # as returned by /storage/presign
+    bucket: str = "public"
+
+class UploadCompleteResult(BaseModel):
+    path: str
+    queued: bool  # False if the same image was already waiting
+    thumbnails: List[Thumbnail]  # served once generated; fall back to the original until then
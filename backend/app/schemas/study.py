@@ -1,6 +1,6 @@
 # app/schemas/study.py
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, StrictInt
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class StudyPlanCreate(BaseModel):
@@ -10,12 +10,20 @@ class StudyPlanCreate(BaseModel):
     deadline: Optional[datetime] = None
 
 class StudyPlanUpdate(BaseModel):
-    title: Optional[str]
-    subjects: Optional[List[str]]
-    duration: Optional[str]
-    deadline: Optional[datetime]
-    progress: Optional[int]
-    status: Optional[str]
+    title: Optional[str] = None
+    subjects: Optional[List[str]] = None
+    duration: Optional[str] = None
+    deadline: Optional[datetime] = None
+    # only stick while the plan has no linked todos; after that the database ignores them (migration 014)
+    progress: Optional[int] = None
+    status: Optional[str] = None
+
+class StudyPlanBatchUpdate(StudyPlanUpdate):
+    id: StrictInt  # StrictInt: true/false aren't ids
+
+class SubjectProgress(BaseModel):
+    total: int
+    done: int
 
 class StudyPlanOut(BaseModel):
     id: int
@@ -27,6 +35,10 @@ class StudyPlanOut(BaseModel):
     status: str
     created_at: datetime
     deadline: Optional[datetime]
+    version: int
+    # linked todos, kept up to date by the database as todos change
+    todos_total: int
+    todos_done: int
+    subject_counts: Dict[str, SubjectProgress]
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, StrictInt
 from typing import List,Optional
 from datetime import datetime
 
@@ -7,12 +7,20 @@ class TodoCreate(BaseModel):
     description: Optional[str] = Field(None, examples=["Chapter 5: Graphs"])
     due_date: Optional[datetime] = None
     completed: bool = False
+    # counts towards this study plan (one of the caller's) and, optionally, one of its subjects
+    study_plan_id: Optional[int] = None
+    subject: Optional[str] = Field(None, max_length=100, examples=["Math"])
 
 class TodoUpdate(BaseModel):
-    title: Optional[str]
-    description: Optional[str]
-    due_date: Optional[datetime]
-    completed: Optional[bool]
+    title: Optional[str] = None
+    description: Optional[str] = None
+    due_date: Optional[datetime] = None
+    completed: Optional[bool] = None
+    study_plan_id: Optional[int] = None  # null unlinks
+    subject: Optional[str] = Field(None, max_length=100)
+
+class TodoBatchUpdate(TodoUpdate):
+    id: StrictInt  # StrictInt: true/false aren't ids
 
 class TodoOut(BaseModel):
     id: int
@@ -23,6 +31,8 @@ class TodoOut(BaseModel):
     completed: bool
     created_at: datetime
     updated_at: Optional[datetime]
+    study_plan_id: Optional[int]
+    subject: Optional[str]
+    version: int  # bumped on every write; see app/services/updates.py
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,9 +1,8 @@
-# app/security_headers.py  (or paste into app/main.py directly)
-from fastapi import Request
-from fastapi.responses import Response
-from typing import Dict
-from datetime import timedelta
+# app/security_headers.py
 import os
+from typing import Dict, List, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Toggle: set ENV var FASTAPI_ENV=production for production behavior
 ENV = os.getenv("FASTAPI_ENV", "development").lower()
@@ -43,22 +42,47 @@ SECURITY_HEADERS = {
 
 CSP_VALUE = build_csp(CSP_DIRECTIVES)
 
-async def add_security_headers_middleware(request: Request, call_next):
-    # Run the request
-    response: Response = await call_next(request)
-
-    # Add standard headers
-    for k, v in SECURITY_HEADERS.items():
-        response.headers.setdefault(k, v)
-
+def response_headers() -> Dict[str, str]:
+    headers = dict(SECURITY_HEADERS)
     # HSTS only in production
     if HSTS_VALUE:
-        response.headers.setdefault("Strict-Transport-Security", HSTS_VALUE)
-
+        headers["Strict-Transport-Security"] = HSTS_VALUE
     # Content-Security-Policy or Report-Only
-    if CSP_REPORT_ONLY:
-        response.headers.setdefault("Content-Security-Policy-Report-Only", CSP_VALUE)
-    else:
-        response.headers.setdefault("Content-Security-Policy", CSP_VALUE)
+    headers["Content-Security-Policy-Report-Only" if CSP_REPORT_ONLY else "Content-Security-Policy"] = CSP_VALUE
+    return headers
+
+# Encoded once: per response the middleware only concatenates two lists.
+ENCODED_HEADERS: List[Tuple[bytes, bytes]] = [
+    (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in response_headers().items()
+]
+_HEADER_NAMES = frozenset(name for name, _ in ENCODED_HEADERS)
+
+
+class SecurityHeadersMiddleware:
+    """
+    Pure ASGI: adds the security headers to the response start message and
+    passes the body through untouched (no call_next, no extra task, streaming
+    responses stay streaming). A header the route set itself is kept.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                headers = message.get("headers") or []
+                if any(name in _HEADER_NAMES for name, _ in headers):
+                    present = {name for name, _ in headers}
+                    extra = [header for header in ENCODED_HEADERS if header[0] not in present]
+                else:
+                    extra = ENCODED_HEADERS
+                # a new list: Starlette hands over the response's own raw_headers
+                message["headers"] = [*headers, *extra]
+            await send(message)
 
-    return response
+        await self.app(scope, receive, send_with_headers)
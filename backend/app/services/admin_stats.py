@@ -0,0 +1,137 @@
+"""
+Admin analytics, served from memory.
+
+The database keeps the counters up to date as rows are written (migration
+009); this module pulls all of them with one `admin_stats` RPC on a timer and
+keeps the snapshot in memory. Requests read the snapshot; only when it's older
+than ADMIN_STATS_MAX_STALENESS_SECONDS (the refresher is stuck or failing)
+does a request refresh it, and concurrent requests share that one refresh.
+
+The counters live in Supabase (including auth.users), so with DATA_BACKEND=sql
+there is nothing to read: the refresher doesn't run and /admin/stats is a 501.
+"""
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.tracing import span
+from app.db.supabase_client import get_global_supabase
+
+logger = logging.getLogger("taskhive.admin_stats")
+
+
+def _bucket_start(day: date, bucket: str) -> date:
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    return day
+
+
+def bucketed(daily: List[Dict[str, Any]], since: date, bucket: str) -> Dict[str, List[Dict[str, Any]]]:
+    """{metric: [{"bucket", "value"}]} from the per-day rows, summed into day/week/month buckets."""
+    sums: Dict[str, Dict[date, int]] = defaultdict(lambda: defaultdict(int))
+    for row in daily:
+        day = date.fromisoformat(row["day"])
+        if day >= since:
+            sums[row["metric"]][_bucket_start(day, bucket)] += row["value"]
+    # active users are distinct per day; summing days would count people twice
+    if bucket != "day":
+        sums.pop("active_users", None)
+    return {
+        metric: [{"bucket": start.isoformat(), "value": value} for start, value in sorted(by_start.items())]
+        for metric, by_start in sums.items()
+    }
+
+
+class AdminStats:
+    def __init__(self, refresh_interval: float, max_staleness: float, series_days: int, enabled: bool = True):
+        self.enabled = enabled
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+        self.series_days = series_days
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.refresh_failures = 0
+
+    async def _fetch(self) -> Dict[str, Any]:
+        supabase = get_global_supabase()
+        if supabase is None:
+            raise HTTPException(status_code=500, detail="Supabase client not initialized")
+        since = datetime.now(timezone.utc).date() - timedelta(days=self.series_days)
+        with span("db.rpc.admin_stats"):
+            resp = await supabase.rpc("admin_stats", {"p_since": since.isoformat()}).execute()
+        return resp.data
+
+    async def refresh(self):
+        snapshot = await self._fetch()
+        self._snapshot = {**snapshot, "generated_at": datetime.now(timezone.utc).isoformat()}
+        self._fetched_at = time.monotonic()
+
+    def age(self) -> Optional[float]:
+        return time.monotonic() - self._fetched_at if self._snapshot is not None else None
+
+    async def get(self) -> Dict[str, Any]:
+        if not self.enabled:
+            raise HTTPException(
+                status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Admin stats need DATA_BACKEND=supabase"
+            )
+        age = self.age()
+        if age is None or age > self.max_staleness:
+            async with self._lock:
+                age = self.age()
+                if age is None or age > self.max_staleness:
+                    try:
+                        await self.refresh()
+                    except Exception:
+                        # network errors and timeouts as well as PostgREST's APIError, as in _run()
+                        self.refresh_failures += 1
+                        logger.exception("admin stats refresh failed")
+                        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Stats unavailable")
+        return self._snapshot
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                self.refresh_failures += 1
+                logger.exception("admin stats refresh failed")
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self):
+        if self._task is None and self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def collect(self):
+        age = self.age()
+        if age is not None:
+            yield "taskhive_admin_stats_age_seconds", "gauge", {}, age
+        yield "taskhive_admin_stats_refresh_failures_total", "counter", {}, self.refresh_failures
+
+
+admin_stats = AdminStats(
+    settings.ADMIN_STATS_REFRESH_SECONDS,
+    settings.ADMIN_STATS_MAX_STALENESS_SECONDS,
+    settings.ADMIN_STATS_SERIES_DAYS,
+    enabled=settings.DATA_BACKEND != "sql",
+)
+metrics.register_collector(admin_stats.collect)
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from jose import jwt, JWTError
+
+from app.core.config import settings
+
+logger = logging.getLogger("taskhive.auth")
+
+SUPABASE_URL = str(settings.SUPABASE_URL).rstrip("/")
+JWKS_URL = settings.AUTH_JWKS_URL or f"{SUPABASE_URL}/auth/v1/.well-known/jwks.json"
+
+# Don't refetch the JWKS more often than this when an unknown `kid` shows up,
+# otherwise garbage tokens could be used to hammer the auth server.
+JWKS_MIN_REFETCH_SECONDS = 30
+
+# Never taken from the token's own header: an HS* token checked against a public
+# JWKS key would let anyone who has the public key sign tokens.
+SECRET_ALGORITHMS = ["HS256"]
+JWKS_ALGORITHMS = ["RS256", "ES256"]
+
+
+class JWKSCache:
+    """Signing keys fetched once, refreshed on a schedule or on a key-rotation miss."""
+
+    def __init__(self, url: str, refresh_seconds: int):
+        self.url = url
+        self.refresh_seconds = refresh_seconds
+        self._keys: Dict[str, dict] = {}
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._fetched_at > self.refresh_seconds
+
+    async def _refresh(self):
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            resp = await client.get(self.url)
+            resp.raise_for_status()
+            keys = resp.json().get("keys", [])
+        self._keys = {k["kid"]: k for k in keys if "kid" in k}
+        self._fetched_at = time.monotonic()
+
+    async def get_key(self, kid: Optional[str]) -> Optional[dict]:
+        key = self._keys.get(kid) if kid else None
+        if key is not None and not self._stale():
+            return key
+        async with self._lock:
+            # another request may have refreshed while we were waiting
+            key = self._keys.get(kid) if kid else None
+            if key is not None and not self._stale():
+                return key
+            since_fetch = time.monotonic() - self._fetched_at
+            if self._stale() or since_fetch > JWKS_MIN_REFETCH_SECONDS:
+                try:
+                    await self._refresh()
+                except httpx.HTTPError:
+                    # keep serving the keys we already have
+                    pass
+            return self._keys.get(kid) if kid else None
+
+
+jwks_cache = JWKSCache(JWKS_URL, settings.AUTH_JWKS_REFRESH_SECONDS)
+
+
+async def verify_token(access_token: str) -> Dict[str, Any]:
+    """
+    Verifies signature, expiry and audience of a Supabase access token locally.
+    Raises jose.JWTError (ExpiredSignatureError for expired tokens) when the token can't be trusted.
+    """
+    header = jwt.get_unverified_header(access_token)
+    if header.get("alg") in SECRET_ALGORITHMS:
+        if not settings.SUPABASE_JWT_SECRET:
+            raise JWTError("SUPABASE_JWT_SECRET not configured")
+        key: Any = settings.SUPABASE_JWT_SECRET
+        algorithms = SECRET_ALGORITHMS
+    else:
+        key = await jwks_cache.get_key(header.get("kid"))
+        if key is None:
+            raise JWTError("Unknown signing key")
+        algorithms = JWKS_ALGORITHMS
+    claims = jwt.decode(
+        access_token,
+        key,
+        algorithms=algorithms,
+        audience=settings.AUTH_JWT_AUDIENCE,
+    )
+    if not claims.get("sub"):
+        raise JWTError("Token has no subject")
+    return claims
+
+
+async def check_local_verification():
+    """
+    Fails startup when AUTH_VERIFY_MODE=local has nothing to verify tokens
+    with (no SUPABASE_JWT_SECRET and no keys published at the JWKS URL), which
+    would otherwise turn every request into a 401. With AUTH_REMOTE_FALLBACK
+    those requests go to the auth server instead, so that's allowed.
+    """
+    if settings.AUTH_VERIFY_MODE != "local" or settings.SUPABASE_JWT_SECRET or settings.AUTH_REMOTE_FALLBACK:
+        return
+    try:
+        await jwks_cache._refresh()
+    except httpx.HTTPError as exc:
+        # can't tell yet; keys are fetched again on the first token
+        logger.warning("could not fetch JWKS at startup", extra={"url": jwks_cache.url, "error": str(exc)})
+        return
+    if not jwks_cache._keys:
+        raise RuntimeError(
+            f"AUTH_VERIFY_MODE=local but SUPABASE_JWT_SECRET is not set and {jwks_cache.url} has no signing keys; "
+            "set SUPABASE_JWT_SECRET, or use AUTH_VERIFY_MODE=remote or AUTH_REMOTE_FALLBACK=true"
+        )
+
+
+def user_from_claims(claims: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": claims["sub"],
+        "email": claims.get("email"),
+        "raw_data": claims,
+    }
@@ -0,0 +1,144 @@
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.db.repository import Repository
+from app.schemas.batch import BatchItemResult, BatchResult
+
+# columns computed from the rest of a row, e.g. recurrence.series_columns for events
+Derive = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+CONFLICT = "Changed or deleted since it was read; retry"
+
+
+def _check_size(n: int):
+    if n == 0:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Empty batch")
+    if n > settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch too large (max {settings.BATCH_MAX_SIZE} items)",
+        )
+
+
+def _chunks(seq: Sequence, size: int):
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
+def _result(results: List[BatchItemResult]) -> BatchResult:
+    results.sort(key=lambda r: r.index)
+    ok = sum(1 for r in results if r.ok)
+    return BatchResult(succeeded=ok, failed=len(results) - ok, results=results)
+
+
+async def batch_create(
+    repo: Repository, user_id: str, items: Sequence[BaseModel], derive: Optional[Derive] = None,
+) -> BatchResult:
+    _check_size(len(items))
+    results: List[BatchItemResult] = []
+    values = [item.model_dump(mode="json") for item in items]
+    indexed = list(enumerate({**v, **derive(v)} if derive else v for v in values))
+    for chunk in _chunks(indexed, settings.BATCH_CHUNK_SIZE):
+        try:
+            rows = await repo.create_many(user_id, [values for _, values in chunk])
+        except HTTPException as exc:
+            results.extend(BatchItemResult(index=index, ok=False, error=exc.detail) for index, _ in chunk)
+            continue
+        if len(rows) != len(chunk):
+            results.extend(BatchItemResult(index=index, ok=False, error="Not created") for index, _ in chunk)
+            continue
+        # create_many hands rows back in input order (by id, which follows it)
+        for (index, _), row in zip(chunk, rows):
+            results.append(BatchItemResult(index=index, id=row.get("id"), ok=True))
+    return _result(results)
+
+
+async def _update_read_rows(
+    repo: Repository, user_id: str, read: Dict[int, Dict[str, Any]], changes: Dict[int, Dict[str, Any]],
+) -> Dict[int, Optional[str]]:
+    """
+    Applies each row's changes with an update guarded by the version it was read
+    at, so nothing is inserted and a row another request changed or deleted in
+    the meantime is left alone. Returns id -> error (None when written).
+    """
+    limit = asyncio.Semaphore(settings.BATCH_UPDATE_CONCURRENCY)
+
+    async def one(item_id: int, values: Dict[str, Any]):
+        async with limit:
+            try:
+                row = await repo.update(item_id, user_id, values, expected_version=read[item_id]["version"])
+            except HTTPException as exc:
+                return item_id, exc.detail
+        return item_id, None if row else CONFLICT
+
+    return dict(await asyncio.gather(*(one(item_id, values) for item_id, values in changes.items())))
+
+
+async def batch_update(
+    repo: Repository, user_id: str, items: Sequence[BaseModel], derive: Optional[Derive] = None,
+) -> BatchResult:
+    """
+    `items` carry the row `id` plus the fields to change. Per chunk, the owned
+    rows are read once; then each row gets one update with all of its items'
+    changes, which only succeeds if the row is still at the version read.
+    """
+    _check_size(len(items))
+    results: List[BatchItemResult] = []
+    pending = []  # (index, id, values)
+    for index, item in enumerate(items):
+        values = item.model_dump(mode="json", exclude_unset=True, exclude={"id"})
+        if not values:
+            results.append(BatchItemResult(index=index, id=item.id, ok=False, error="No fields to update"))
+            continue
+        pending.append((index, item.id, values))
+
+    for chunk in _chunks(pending, settings.BATCH_CHUNK_SIZE):
+        ids = sorted({item_id for _, item_id, _ in chunk})
+        try:
+            current = await repo.list(user_id=user_id, filters=[("id", "in", ids)], order="id", limit=len(ids))
+        except HTTPException as exc:
+            results.extend(BatchItemResult(index=index, id=item_id, ok=False, error=exc.detail)
+                           for index, item_id, _ in chunk)
+            continue
+        read = {row["id"]: row for row in current}
+        changes: Dict[int, Dict[str, Any]] = {}
+        # in item order, so a later item for the same id overrides the earlier one's fields
+        for _, item_id, values in chunk:
+            if item_id in read:
+                changes[item_id] = {**changes.get(item_id, {}), **values}
+        if derive:
+            # derived from the read row, so they must not carry back columns the database maintains
+            for item_id, values in changes.items():
+                derived = derive({**read[item_id], **values})
+                changes[item_id] = {**values, **{name: v for name, v in derived.items() if name in repo.writable}}
+        errors = await _update_read_rows(repo, user_id, read, changes) if changes else {}
+        for index, item_id, _ in chunk:
+            if item_id not in read:
+                results.append(BatchItemResult(index=index, id=item_id, ok=False, error="Not found or not allowed"))
+            elif errors[item_id]:
+                results.append(BatchItemResult(index=index, id=item_id, ok=False, error=errors[item_id]))
+            else:
+                results.append(BatchItemResult(index=index, id=item_id, ok=True))
+    return _result(results)
+
+
+async def batch_delete(repo: Repository, user_id: str, ids: List[int]) -> BatchResult:
+    _check_size(len(ids))
+    deleted = set()
+    error = None
+    try:
+        for chunk in _chunks(ids, settings.BATCH_CHUNK_SIZE):
+            deleted.update(row["id"] for row in await repo.delete_many(chunk, user_id))
+    except HTTPException as exc:
+        error = exc.detail
+    results = [
+        BatchItemResult(index=index, id=item_id, ok=True)
+        if item_id in deleted
+        else BatchItemResult(index=index, id=item_id, ok=False, error=error or "Not found or not allowed")
+        for index, item_id in enumerate(ids)
+    ]
+    return _result(results)
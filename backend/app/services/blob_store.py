@@ -0,0 +1,71 @@
+"""
+Byte-level object storage for server-side processing (the thumbnail pipeline).
+
+Clients never go through here; they upload and download with signed URLs
+(storage_service.py). STORAGE_BACKEND=local keeps everything under
+STORAGE_LOCAL_ROOT/<bucket>/<path> so the pipeline runs without Supabase.
+"""
+import asyncio
+from pathlib import Path
+
+from app.core.config import settings
+from app.services.storage_service import _bucket
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+class SupabaseBlobStore:
+    async def read(self, bucket: str, path: str) -> bytes:
+        try:
+            return await _bucket(bucket).download(path)
+        except Exception as exc:
+            if getattr(exc, "status", None) in (400, 404, "400", "404"):
+                raise BlobNotFound(path) from exc
+            raise
+
+    async def write(self, bucket: str, path: str, data: bytes, content_type: str, max_age: int):
+        await _bucket(bucket).upload(
+            path, data, {"content-type": content_type, "upsert": "true", "cache-control": str(max_age)}
+        )
+
+
+class LocalBlobStore:
+    def __init__(self, root: str):
+        self.root = Path(root).resolve()
+
+    def _file(self, bucket: str, path: str) -> Path:
+        target = (self.root / bucket / path).resolve()
+        if not target.is_relative_to(self.root / bucket):
+            raise ValueError(f"path escapes bucket: {path}")
+        return target
+
+    async def read(self, bucket: str, path: str) -> bytes:
+        target = self._file(bucket, path)
+        try:
+            return await asyncio.to_thread(target.read_bytes)
+        except FileNotFoundError as exc:
+            raise BlobNotFound(path) from exc
+
+    async def write(self, bucket: str, path: str, data: bytes, content_type: str, max_age: int):
+        # served by StaticFiles, which revalidates with ETag/Last-Modified; max_age is not stored
+        target = self._file(bucket, path)
+
+        def _write():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            # write-then-rename so a reader never sees a half-written file
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(target)
+
+        await asyncio.to_thread(_write)
+
+
+def build_blob_store():
+    if settings.STORAGE_BACKEND == "local":
+        return LocalBlobStore(settings.STORAGE_LOCAL_ROOT)
+    return SupabaseBlobStore()
+
+
+blob_store = build_blob_store()
@@ -1 +1,375 @@
-''' TODO ''' 
\ No newline at end of file
+"""
+Deadline notifications (event reminders, todo due dates, study-plan deadlines).
+
+The scheduler scans each table for rows whose deadline falls inside a lead
+window using indexed range queries, and enqueues one job per row. Workers
+drain the queue in batches and hand them to a Notifier. Overlapping scans
+enqueue the same row again; the idempotency key makes sure it's delivered once.
+
+Every worker process runs the service, so both the idempotency keys and the
+scan lease (only one worker scans per interval) live in the shared cache. With
+CACHE_BACKEND=redis that is any number of workers and nodes; with the
+in-process cache (CACHE_BACKEND=memory) and queue it is a single process, as
+each worker would scan and deliver everything on its own.
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import httpx
+
+from app.core import metrics
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.db.repository import Filter, Repository, events_repo, study_plans_repo, todos_repo
+
+logger = logging.getLogger("taskhive.notifications")
+
+# how long a delivered idempotency key is remembered
+IDEMPOTENCY_TTL_SECONDS = 7 * 24 * 3600
+# held by the worker running the current deadline scan
+SCAN_LEASE_KEY = "taskhive:notify:scan-lease"
+
+
+@dataclass
+class NotificationJob:
+    kind: str  # event_reminder | todo_due | study_deadline
+    user_id: str
+    ref_id: int
+    due_at: str
+    title: str
+    attempts: int = 0
+    not_before: float = field(default=0.0, repr=False)
+
+    @property
+    def idempotency_key(self) -> str:
+        return f"taskhive:notified:{self.kind}:{self.ref_id}:{self.due_at}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("not_before")
+        return data
+
+
+# ---- delivery ----
+
+class LogNotifier:
+    """Default notifier: writes the notification to the log. Swap in a real channel via NOTIFY_WEBHOOK_URL."""
+
+    async def send_batch(self, jobs: Sequence[NotificationJob]) -> List[bool]:
+        for job in jobs:
+            logger.info("notification", extra={"notification": job.to_dict()})
+        return [True] * len(jobs)
+
+    async def close(self):
+        pass
+
+
+class WebhookNotifier:
+    """POSTs a whole batch to one endpoint; a non-2xx answer fails every job in it."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self._client = httpx.AsyncClient(timeout=10.0)
+
+    async def send_batch(self, jobs: Sequence[NotificationJob]) -> List[bool]:
+        try:
+            resp = await self._client.post(self.url, json={"notifications": [j.to_dict() for j in jobs]})
+            ok = resp.is_success
+        except httpx.HTTPError:
+            ok = False
+        return [ok] * len(jobs)
+
+    async def close(self):
+        await self._client.aclose()
+
+
+def _build_notifier():
+    if settings.NOTIFY_WEBHOOK_URL:
+        return WebhookNotifier(settings.NOTIFY_WEBHOOK_URL)
+    return LogNotifier()
+
+
+class _Stats:
+    def __init__(self):
+        self.enqueued = 0
+        self.delivered = 0
+        self.duplicates = 0
+        self.retried = 0
+        self.failed = 0
+
+    def collect(self):
+        yield "taskhive_notifications_enqueued_total", "counter", {}, self.enqueued
+        yield "taskhive_notifications_delivered_total", "counter", {}, self.delivered
+        yield "taskhive_notifications_duplicates_total", "counter", {}, self.duplicates
+        yield "taskhive_notifications_retried_total", "counter", {}, self.retried
+        yield "taskhive_notifications_failed_total", "counter", {}, self.failed
+
+
+stats = _Stats()
+metrics.register_collector(stats.collect)
+
+
+async def deliver_batch(jobs: Sequence[NotificationJob], notifier) -> List[NotificationJob]:
+    """Delivers jobs not seen before; returns the ones that failed and should be retried."""
+    fresh = []
+    for job in jobs:
+        # first claim wins; later copies of the same job are skipped
+        if await cache_backend.add(job.idempotency_key, IDEMPOTENCY_TTL_SECONDS):
+            fresh.append(job)
+        else:
+            stats.duplicates += 1
+    if not fresh:
+        return []
+    try:
+        results = await notifier.send_batch(fresh)
+    except Exception:
+        logger.exception("notifier failed")
+        results = [False] * len(fresh)
+    failed = []
+    for job, ok in zip(fresh, results):
+        if ok:
+            stats.delivered += 1
+        else:
+            # release the key so the retry isn't mistaken for a duplicate
+            await cache_backend.delete(job.idempotency_key)
+            failed.append(job)
+    return failed
+
+
+def _backoff(attempts: int) -> float:
+    base = settings.NOTIFY_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    return base + random.uniform(0, base / 2)
+
+
+# ---- queues ----
+
+class InProcessJobQueue:
+    """asyncio queue drained by a worker task on this process. For tests and single-node deployments."""
+
+    def __init__(self, notifier, batch_size: int, batch_wait: float):
+        self.notifier = notifier
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._retries: Set[asyncio.Task] = set()
+
+    async def enqueue(self, job: NotificationJob):
+        stats.enqueued += 1
+        await self._queue.put(job)
+
+    async def _next_batch(self) -> List[NotificationJob]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _retry_later(self, job: NotificationJob):
+        await asyncio.sleep(max(0.0, job.not_before - time.monotonic()))
+        await self._queue.put(job)
+
+    async def _run(self):
+        while True:
+            batch = await self._next_batch()
+            for job in await deliver_batch(batch, self.notifier):
+                job.attempts += 1
+                if job.attempts >= settings.NOTIFY_MAX_ATTEMPTS:
+                    stats.failed += 1
+                    logger.error("notification dropped after retries", extra={"notification": job.to_dict()})
+                    continue
+                stats.retried += 1
+                job.not_before = time.monotonic() + _backoff(job.attempts)
+                retry = asyncio.create_task(self._retry_later(job))
+                self._retries.add(retry)
+                retry.add_done_callback(self._retries.discard)
+
+    async def drain(self):
+        """Delivers everything currently queued, once; stop() calls it so queued jobs aren't lost."""
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait() for _ in range(min(self.batch_size, self._queue.qsize()))]
+            await deliver_batch(batch, self.notifier)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # jobs waiting out a backoff are dropped; the next scan enqueues them again
+        tasks = [*self._retries, *([self._task] if self._task is not None else [])]
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        try:
+            await self.drain()
+        except Exception:
+            logger.exception("delivering queued notifications on shutdown failed")
+        await self.notifier.close()
+
+
+class CeleryJobQueue:
+    """
+    Hands jobs to Celery workers (`celery -A app.services.notifications.celery_app worker`).
+    Retries are Celery's; idempotency needs a shared CACHE_BACKEND (redis).
+    """
+
+    def __init__(self):
+        self.app = get_celery_app()
+
+    async def enqueue(self, job: NotificationJob):
+        stats.enqueued += 1
+        # send_task blocks on the broker connection
+        await asyncio.to_thread(self.app.send_task, "taskhive.deliver_notification", args=[job.to_dict()])
+
+    def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+_celery_app = None
+# one event loop and notifier per Celery worker process: the shared cache's
+# redis.asyncio client is bound to the loop it first ran on, so a fresh
+# asyncio.run() per task would break it after the first task
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_notifier = None
+
+
+def _run_in_worker(coro_fn):
+    global _worker_loop, _worker_notifier
+    if _worker_loop is None:
+        _worker_loop = asyncio.new_event_loop()
+        _worker_notifier = _build_notifier()
+    return _worker_loop.run_until_complete(coro_fn(_worker_notifier))
+
+
+def _close_worker(**kwargs):
+    global _worker_loop, _worker_notifier
+    if _worker_loop is not None:
+        _worker_loop.run_until_complete(_worker_notifier.close())
+        _worker_loop.close()
+        _worker_loop = _worker_notifier = None
+
+
+def get_celery_app():
+    global _celery_app
+    if _celery_app is None:
+        from celery import Celery
+        from celery.signals import worker_process_shutdown
+
+        _celery_app = Celery("taskhive", broker=settings.CELERY_BROKER_URL)
+        worker_process_shutdown.connect(_close_worker, weak=False)
+
+        @_celery_app.task(
+            name="taskhive.deliver_notification",
+            bind=True,
+            # retries after the first attempt
+            max_retries=settings.NOTIFY_MAX_ATTEMPTS - 1,
+        )
+        def deliver_notification(task, job: Dict[str, Any]):
+            failed = _run_in_worker(lambda notifier: deliver_batch([NotificationJob(**job)], notifier))
+            if failed:
+                stats.retried += 1
+                raise task.retry(countdown=_backoff(task.request.retries + 1))
+
+    return _celery_app
+
+
+# ---- scheduler ----
+
+def _scan_targets():
+    """(kind, repository, deadline column, extra filters, lead window) per scanned table."""
+    return [
+        ("event_reminder", events_repo, "starts_at", [],
+         timedelta(minutes=settings.NOTIFY_EVENT_LEAD_MINUTES)),
+        ("todo_due", todos_repo, "due_date", [("completed", "eq", False)],
+         timedelta(hours=settings.NOTIFY_TODO_LEAD_HOURS)),
+        ("study_deadline", study_plans_repo, "deadline", [("status", "neq", "completed")],
+         timedelta(hours=settings.NOTIFY_STUDY_LEAD_HOURS)),
+    ]
+
+
+async def _scan(queue, kind: str, repo: Repository, column: str, extra: List[Filter], lead: timedelta, now: datetime) -> int:
+    # one range query per table over every user, walked by keyset on the deadline index
+    filters = [(column, "gte", now.isoformat()), (column, "lt", (now + lead).isoformat()), *extra]
+    count = 0
+    async for row in repo.iter_all(filters=filters, order=column, desc=False, page_size=settings.NOTIFY_BATCH_SIZE * 10):
+        await queue.enqueue(NotificationJob(
+            kind=kind, user_id=row["user_id"], ref_id=row["id"], due_at=row[column], title=row.get("title", ""),
+        ))
+        count += 1
+    return count
+
+
+async def scan_deadlines(queue) -> int:
+    now = datetime.now(timezone.utc)
+    total = 0
+    for kind, repo, column, extra, lead in _scan_targets():
+        total += await _scan(queue, kind, repo, column, extra, lead, now)
+    return total
+
+
+class NotificationService:
+    def __init__(self, queue):
+        self.queue = queue
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        # lease a little shorter than the interval so a worker whose turn it is still gets it
+        lease = settings.NOTIFY_SCAN_INTERVAL_SECONDS * 0.9
+        while True:
+            try:
+                if await cache_backend.add(SCAN_LEASE_KEY, lease):
+                    await scan_deadlines(self.queue)
+            except Exception:
+                logger.exception("deadline scan failed")
+            await asyncio.sleep(settings.NOTIFY_SCAN_INTERVAL_SECONDS)
+
+    def start(self):
+        self.queue.start()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.queue.stop()
+
+
+def build_notification_service() -> NotificationService:
+    if settings.NOTIFY_QUEUE_BACKEND == "celery":
+        if settings.CACHE_BACKEND != "redis":
+            # Celery workers are other processes: they couldn't see this process's idempotency keys
+            raise RuntimeError("NOTIFY_QUEUE_BACKEND=celery requires CACHE_BACKEND=redis")
+        queue = CeleryJobQueue()
+    else:
+        if settings.CACHE_BACKEND != "redis":
+            logger.warning("notifications use the in-process cache: run a single worker, or each one delivers them all")
+        queue = InProcessJobQueue(_build_notifier(), settings.NOTIFY_BATCH_SIZE, settings.NOTIFY_BATCH_WAIT_SECONDS)
+    return NotificationService(queue)
+
+
+# module-level app for `celery -A app.services.notifications.celery_app worker`
+celery_app = get_celery_app() if settings.NOTIFY_QUEUE_BACKEND == "celery" else None
@@ -0,0 +1,270 @@
+"""
+Change feed behind /realtime.
+
+Write handlers call `publish_change` after a successful write; the hub turns it
+into one event, encodes it once, and appends it to the buffer of every open
+connection subscribed to the channel. Channels are `user:<id>` for a user's own
+rows and `public:<table>` for the public feeds.
+
+Everything runs on the worker's event loop: an idle connection is a deque and
+an asyncio.Event, nothing else. A connection whose buffer fills up (the client
+isn't reading) is evicted rather than buffered without bound; it reconnects
+with its last event id and is replayed from the history ring, or told to
+refetch if it fell further behind than the ring reaches.
+
+Event ids are `<epoch>-<seq>` where the epoch is random per hub, so an id from
+another worker or from before a restart is recognised and answered with a
+reset instead of a wrong replay. With CACHE_BACKEND=redis, events are relayed
+between workers over redis pub/sub.
+"""
+import asyncio
+import logging
+import secrets
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Set
+
+import orjson
+
+from app.core import metrics
+from app.core.config import settings
+from app.schemas.batch import BatchResult
+from app.utils.decimal_encoder import dumps_bytes
+
+logger = logging.getLogger("taskhive.realtime")
+
+RELAY_CHANNEL = "taskhive:realtime"
+# wait before resubscribing after the relay lost redis, doubling up to the max
+RELAY_RETRY_MIN_SECONDS = 0.5
+RELAY_RETRY_MAX_SECONDS = 30.0
+PUBLIC_TABLES = {"events", "marketplace_items"}
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def public_channel(table: str) -> str:
+    return f"public:{table}"
+
+
+@dataclass
+class ChangeEvent:
+    seq: int
+    id: str
+    channels: Sequence[str]
+    type: str  # change | reset
+    data: bytes  # JSON, encoded once for every subscriber
+
+    def sse(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: ".encode() + self.data + b"\n\n"
+
+
+class SlowConsumer(Exception):
+    pass
+
+
+class Subscription:
+    __slots__ = ("channels", "max_size", "buffer", "evicted", "_wakeup")
+
+    def __init__(self, channels: Iterable[str], max_size: int):
+        self.channels = frozenset(channels)
+        self.max_size = max_size
+        self.buffer: Deque[ChangeEvent] = deque()
+        self.evicted = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: ChangeEvent) -> bool:
+        if len(self.buffer) >= self.max_size:
+            self.evicted = True
+            self._wakeup.set()
+            return False
+        self.buffer.append(event)
+        self._wakeup.set()
+        return True
+
+    async def next(self, timeout: float) -> Optional[ChangeEvent]:
+        """The next event, or None when `timeout` passes first (time for a heartbeat)."""
+        if not self.buffer and not self.evicted:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self.evicted:
+            raise SlowConsumer()
+        return self.buffer.popleft()
+
+
+class Hub:
+    def __init__(self, buffer_size: int, history_size: int):
+        self.epoch = secrets.token_hex(4)
+        self.buffer_size = buffer_size
+        self._seq = 0
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._history: Deque[ChangeEvent] = deque(maxlen=history_size)
+        self.connections = 0
+        self.published = 0
+        self.evicted = 0
+
+    def _event(self, channels: Sequence[str], type: str, data: bytes) -> ChangeEvent:
+        self._seq += 1
+        return ChangeEvent(self._seq, f"{self.epoch}-{self._seq}", channels, type, data)
+
+    def dispatch(self, channels: Sequence[str], data: bytes) -> ChangeEvent:
+        event = self._event(channels, "change", data)
+        self._history.append(event)
+        self.published += 1
+        for channel in channels:
+            for sub in list(self._channels.get(channel, ())):
+                if not sub.push(event):
+                    self.evicted += 1
+                    self.unsubscribe(sub)
+        return event
+
+    def _replay(self, channels: frozenset, last_event_id: str) -> Optional[List[ChangeEvent]]:
+        """History after `last_event_id`, or None when it can't be replayed exactly."""
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest = self._history[0].seq if self._history else self._seq + 1
+        if seq < oldest - 1:
+            return None
+        missed = [e for e in self._history if e.seq > seq and not channels.isdisjoint(e.channels)]
+        return missed if len(missed) < self.buffer_size else None
+
+    def subscribe(self, channels: Iterable[str], last_event_id: Optional[str] = None) -> Subscription:
+        sub = Subscription(channels, self.buffer_size)
+        if last_event_id:
+            missed = self._replay(sub.channels, last_event_id)
+            if missed is None:
+                # the client should refetch its lists, then carry on from here
+                sub.push(self._event(sorted(sub.channels), "reset", b"{}"))
+            else:
+                sub.buffer.extend(missed)
+        for channel in sub.channels:
+            self._channels.setdefault(channel, set()).add(sub)
+        self.connections += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        removed = False
+        for channel in sub.channels:
+            subs = self._channels.get(channel)
+            if subs and sub in subs:
+                removed = True
+                subs.discard(sub)
+                if not subs:
+                    del self._channels[channel]
+        if removed:
+            self.connections -= 1
+
+    def collect(self):
+        yield "taskhive_realtime_connections", "gauge", {}, self.connections
+        yield "taskhive_realtime_events_published_total", "counter", {}, self.published
+        yield "taskhive_realtime_evicted_total", "counter", {}, self.evicted
+
+
+class RedisRelay:
+    """Fans events out to the hubs of the other workers; each hub assigns its own ids."""
+
+    def __init__(self, hub: Hub, redis):
+        self.hub = hub
+        self._redis = redis
+        self._task: Optional[asyncio.Task] = None
+
+    async def send(self, channels: Sequence[str], data: bytes):
+        message = dumps_bytes({"origin": self.hub.epoch, "channels": list(channels)})
+        try:
+            await self._redis.publish(RELAY_CHANNEL, message + b"\n" + data)
+        except Exception:
+            logger.warning("realtime relay publish failed", exc_info=True)
+
+    async def _listen(self, subscribed: asyncio.Event):
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(RELAY_CHANNEL)
+            subscribed.set()
+            async for message in pubsub.listen():
+                header, _, data = message["data"].partition(b"\n")
+                meta = orjson.loads(header)
+                if meta["origin"] != self.hub.epoch:
+                    self.hub.dispatch(meta["channels"], data)
+        finally:
+            await pubsub.close()
+
+    async def _run(self):
+        # events other workers publish while this one is resubscribing don't reach its clients
+        delay = 0.0
+        while True:
+            subscribed = asyncio.Event()
+            try:
+                await self._listen(subscribed)
+                logger.warning("realtime relay subscription ended")
+            except Exception:
+                logger.warning("realtime relay lost its redis subscription", exc_info=True)
+            # back off only while subscribing keeps failing
+            if subscribed.is_set():
+                delay = RELAY_RETRY_MIN_SECONDS
+            else:
+                delay = min(max(delay * 2, RELAY_RETRY_MIN_SECONDS), RELAY_RETRY_MAX_SECONDS)
+            await asyncio.sleep(delay)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+hub = Hub(settings.REALTIME_BUFFER_SIZE, settings.REALTIME_HISTORY_SIZE)
+metrics.register_collector(hub.collect)
+
+
+def _build_relay() -> Optional[RedisRelay]:
+    if settings.CACHE_BACKEND != "redis":
+        return None
+    from app.core.cache import cache_backend
+
+    return RedisRelay(hub, cache_backend._redis)
+
+
+relay = _build_relay()
+
+
+async def publish_change(
+    table: str,
+    op: str,
+    user_id: str,
+    *,
+    row: Optional[Dict[str, Any]] = None,
+    ids: Sequence[int] = (),
+):
+    """
+    Announces a write. `op` is create | update | delete; single-row writes pass
+    `row` (or just `ids` for a delete), batch writes pass the affected `ids`.
+    """
+    if not row and not ids:
+        return
+    channels = [user_channel(user_id)]
+    if table in PUBLIC_TABLES:
+        channels.append(public_channel(table))
+    payload: Dict[str, Any] = {"table": table, "op": op, "ids": list(ids) or [row["id"]]}
+    if row is not None:
+        payload["row"] = row
+    data = dumps_bytes(payload)
+    hub.dispatch(channels, data)
+    if relay is not None:
+        await relay.send(channels, data)
+
+
+async def publish_batch(table: str, op: str, user_id: str, result: BatchResult):
+    await publish_change(table, op, user_id, ids=[r.id for r in result.results if r.ok and r.id is not None])
@@ -1,18 +1,151 @@
-from app.db.supabase_client import get_global_supabase
+"""
+Signed URLs for Supabase Storage.
+
+Uploads: the client PUTs the file to a signed upload URL, or, for large files,
+runs a TUS resumable upload against the storage endpoint authorised by the
+same signed token. Which SDK call produces
+the upload token is decided once in `configure()` at startup.
+
+Downloads: signed download URLs are cached per (bucket, path, expiry) for
+STORAGE_SIGNED_URL_CACHE_FRACTION of their expiry, so a URL handed out from
+the cache still has the rest of it left, and misses in a batch are signed with one call.
+"""
+import asyncio
+import base64
+import inspect
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
 from app.core.config import settings
-from typing import Optional
+from app.core.tracing import span
+from app.db.supabase_client import get_global_supabase
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("taskhive.storage")
 
-async def create_presigned_upload(bucket: str, path: str, expires_in: int = 60):
-    """
-    Returns a signed upload URL. The frontend should PUT the file to this URL (or POST depending on SDK).
-    Note: Supabase Storage supports signed URLs and public access. This uses the Supabase SDK where possible.
-    """
+# Supabase signed upload URLs are valid for two hours; the API has no expiry parameter.
+UPLOAD_URL_TTL_SECONDS = 2 * 3600
+# Supabase's resumable endpoint only accepts 6MB chunks (the last one may be smaller).
+RESUMABLE_CHUNK_SIZE = 6 * 1024 * 1024
+TUS_VERSION = "1.0.0"
+# longest download URL expiry we cache for
+MAX_CACHED_EXPIRY_SECONDS = 7 * 24 * 3600
+
+
+class StorageUnavailable(Exception):
+    pass
+
+
+def _bucket(name: str):
     supabase = get_global_supabase()
     if supabase is None:
-        raise RuntimeError("Supabase not initialized")
+        raise StorageUnavailable("Supabase not initialized")
+    return supabase.storage.from_(name)
+
+
+class StorageSigner:
+    def __init__(self):
+        self._sign_upload = None
+        self.url_cache = TTLCache(
+            "signed_url",
+            max_entries=settings.STORAGE_SIGNED_URL_CACHE_MAX_ENTRIES,
+            max_bytes=settings.STORAGE_SIGNED_URL_CACHE_MAX_ENTRIES * 1024,
+            default_ttl=MAX_CACHED_EXPIRY_SECONDS,
+        )
+
+    def configure(self):
+        """Picks the upload-signing call the installed storage SDK supports."""
+        proxy = type(_bucket(settings.STORAGE_BUCKETS[0]))
+        method = getattr(proxy, "create_signed_upload_url", None)
+        if method is None:
+            logger.warning("storage SDK has no create_signed_upload_url; upload presigning is disabled")
+            self._sign_upload = None
+        elif "options" in inspect.signature(method).parameters:
+            self._sign_upload = self._sign_upload_with_options
+        else:
+            self._sign_upload = self._sign_upload_legacy
+
+    @staticmethod
+    async def _sign_upload_with_options(bucket: str, path: str, upsert: bool):
+        # only SDKs that take `options` have this type
+        from storage3.types import CreateSignedUploadUrlOptions
+
+        options = CreateSignedUploadUrlOptions(upsert="true") if upsert else None
+        return await _bucket(bucket).create_signed_upload_url(path, options)
+
+    @staticmethod
+    async def _sign_upload_legacy(bucket: str, path: str, upsert: bool):
+        return await _bucket(bucket).create_signed_upload_url(path)
+
+    async def presign_upload(self, bucket: str, path: str, upsert: bool = False) -> Dict[str, Any]:
+        if self._sign_upload is None:
+            raise StorageUnavailable("Upload presigning is not available")
+        with span("storage.sign_upload"):
+            signed = await self._sign_upload(bucket, path, upsert)
+        return {
+            "path": path,
+            "url": signed["signed_url"],
+            "token": signed["token"],
+            "expires_in": UPLOAD_URL_TTL_SECONDS,
+        }
+
+    async def presign_uploads(self, bucket: str, paths: Sequence[str], upsert: bool = False) -> List[Dict[str, Any]]:
+        """Signs every path concurrently; a failure is reported in its own entry."""
+        limit = asyncio.Semaphore(settings.STORAGE_PRESIGN_CONCURRENCY)
+
+        async def one(path: str):
+            async with limit:
+                try:
+                    return {**await self.presign_upload(bucket, path, upsert), "error": None}
+                except Exception as exc:
+                    logger.warning("upload presign failed", extra={"path": path, "error": str(exc)})
+                    return {"path": path, "url": None, "token": None, "expires_in": None, "error": "Failed to sign"}
+
+        return await asyncio.gather(*(one(path) for path in paths))
+
+    async def resumable_session(
+        self, bucket: str, path: str, size: int, content_type: str, upsert: bool = False
+    ) -> Dict[str, Any]:
+        """What a TUS client needs to upload `path` in resumable chunks with a signed token."""
+        signed = await self.presign_upload(bucket, path, upsert)
+        metadata = {"bucketName": bucket, "objectName": path, "contentType": content_type}
+        encoded = ",".join(f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in metadata.items())
+        return {
+            "path": path,
+            "endpoint": f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1/upload/resumable/sign",
+            "chunk_size": RESUMABLE_CHUNK_SIZE,
+            "expires_in": UPLOAD_URL_TTL_SECONDS,
+            "headers": {
+                "Tus-Resumable": TUS_VERSION,
+                "Upload-Length": str(size),
+                "x-signature": signed["token"],
+                "x-upsert": "true" if upsert else "false",
+                "Upload-Metadata": encoded,
+            },
+            "metadata": metadata,
+        }
+
+    async def signed_download_urls(self, bucket: str, paths: Sequence[str], expires_in: int) -> Dict[str, Optional[str]]:
+        """{path: signed URL or None}; cached URLs are reused, the rest signed in one request."""
+        urls: Dict[str, Optional[str]] = {}
+        missing = []
+        for path in paths:
+            cached = self.url_cache.get((bucket, path, expires_in))
+            if cached is None:
+                missing.append(path)
+            else:
+                urls[path] = cached
+        if missing:
+            with span("storage.sign_download"):
+                signed = await _bucket(bucket).create_signed_urls(missing, expires_in)
+            ttl = expires_in * settings.STORAGE_SIGNED_URL_CACHE_FRACTION
+            for item in signed:
+                url = None if item.get("error") else item.get("signedURL")
+                urls[item["path"]] = url
+                if url and ttl > 0:
+                    self.url_cache.set((bucket, item["path"], expires_in), url, ttl, size=len(url))
+        return {path: urls.get(path) for path in paths}
+
+
+storage_signer = StorageSigner()
 
-    try:
-        res = await supabase.storage.from_(bucket).create_signed_upload_url(path, expires_in)
-        return res
-    except Exception:
-        return await supabase.storage.from_(bucket).create_signed_url(path, expires_in)
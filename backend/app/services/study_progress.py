@@ -0,0 +1,140 @@
+"""
+Study plan progress repair.
+
+A plan's progress comes from the todos linked to it: triggers on todos keep
+`todos_total`, `todos_done` and `subject_counts` on the plan row current as
+todos are created, completed, relinked and deleted (migration 012; Alembic
+0003 on the SQL backend), so listing plans reads them straight off the rows.
+
+Counters maintained by deltas can drift if rows are changed with the triggers
+off (bulk fixes, restores). Every STUDY_PROGRESS_REPAIR_SECONDS one worker
+(whoever takes the lease in the shared cache) recounts all plans in one
+statement inside the database and rewrites only the ones that were off.
+"""
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from fastapi import HTTPException
+
+from app.core import metrics
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.core.tracing import span
+from app.db.supabase_client import get_global_supabase
+
+logger = logging.getLogger("taskhive.study_progress")
+
+# held by the worker running this interval's recount
+REPAIR_LEASE_KEY = "taskhive:study-progress:repair-lease"
+
+# recompute_study_progress() for SQLite, which has no functions: recount, then derive progress/status
+_SQLITE_RECOUNT = """
+    UPDATE study_plans SET todos_total = c.total, todos_done = c.done, subject_counts = c.subjects
+    FROM (
+      SELECT p.id,
+        (SELECT count(*) FROM todos t WHERE t.study_plan_id = p.id) AS total,
+        (SELECT count(*) FROM todos t WHERE t.study_plan_id = p.id AND t.completed) AS done,
+        (SELECT coalesce(json_group_object(subject, json_object('total', total, 'done', done)), '{}')
+           FROM (SELECT t.subject, count(*) AS total, sum(t.completed) AS done FROM todos t
+                 WHERE t.study_plan_id = p.id AND t.subject IS NOT NULL GROUP BY t.subject)) AS subjects
+      FROM study_plans p
+    ) AS c
+    WHERE study_plans.id = c.id
+      AND (study_plans.todos_total != c.total OR study_plans.todos_done != c.done
+           -- compared per subject: the triggers' json_set() doesn't keep keys in GROUP BY order
+           OR (SELECT count(*) FROM json_each(study_plans.subject_counts))
+              != (SELECT count(*) FROM json_each(c.subjects))
+           OR EXISTS (SELECT 1 FROM json_each(c.subjects) s
+                      WHERE json_extract(study_plans.subject_counts, '$."' || s.key || '"') IS NOT s.value))
+"""
+_SQLITE_DERIVE = """
+    UPDATE study_plans SET
+      progress = CAST(round(100.0 * todos_done / todos_total) AS INTEGER),
+      status = CASE WHEN todos_done = todos_total THEN 'completed'
+                    WHEN status = 'completed' THEN 'active' ELSE status END
+    WHERE todos_total > 0
+"""
+
+
+class StudyProgressRepair:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.failures = 0
+        self.repaired = 0
+        self.last_run_seconds: Optional[float] = None
+
+    async def _recompute_sql(self) -> int:
+        from sqlalchemy import text
+
+        from app.db.sql import get_engine
+
+        engine = get_engine()
+        if engine is None:
+            raise HTTPException(status_code=500, detail="Database engine not initialized")
+        async with engine.begin() as conn:
+            if conn.dialect.name == "sqlite":
+                fixed = (await conn.execute(text(_SQLITE_RECOUNT))).rowcount
+                await conn.execute(text(_SQLITE_DERIVE))
+                return fixed
+            return (await conn.execute(text("select recompute_study_progress()"))).scalar_one()
+
+    async def _recompute_supabase(self) -> int:
+        supabase = get_global_supabase()
+        if supabase is None:
+            raise HTTPException(status_code=500, detail="Supabase client not initialized")
+        resp = await supabase.rpc("recompute_study_progress", {}).execute()
+        return resp.data or 0
+
+    async def run_once(self) -> int:
+        """Recounts every plan's linked todos; returns how many plans had drifted."""
+        started = time.perf_counter()
+        with span("db.rpc.recompute_study_progress"):
+            if settings.DATA_BACKEND == "sql":
+                fixed = await self._recompute_sql()
+            else:
+                fixed = await self._recompute_supabase()
+        self.last_run_seconds = time.perf_counter() - started
+        self.runs += 1
+        self.repaired += fixed
+        if fixed:
+            logger.warning("study progress counters repaired", extra={"plans": fixed})
+        return fixed
+
+    async def _run(self):
+        while True:
+            # the triggers keep counters right, so a restart needs no recount; wait a full interval first
+            await asyncio.sleep(self.interval)
+            try:
+                if await cache_backend.add(REPAIR_LEASE_KEY, self.interval * 0.9):
+                    await self.run_once()
+            except Exception:
+                self.failures += 1
+                logger.exception("study progress repair failed")
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def collect(self):
+        yield "taskhive_study_progress_repair_runs_total", "counter", {}, self.runs
+        yield "taskhive_study_progress_repair_failures_total", "counter", {}, self.failures
+        yield "taskhive_study_progress_repaired_plans_total", "counter", {}, self.repaired
+        if self.last_run_seconds is not None:
+            yield "taskhive_study_progress_repair_duration_seconds", "gauge", {}, self.last_run_seconds
+
+
+study_progress = StudyProgressRepair(settings.STUDY_PROGRESS_REPAIR_SECONDS)
+metrics.register_collector(study_progress.collect)
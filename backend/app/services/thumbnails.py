@@ -0,0 +1,142 @@
+"""
+WebP/AVIF thumbnails for marketplace images.
+
+After a client finishes an upload it calls POST /storage/uploads/complete;
+that enqueues a job here and returns straight away. Workers download the
+original, resize and encode it in a process pool (Pillow holds the GIL while
+encoding, which would stall the event loop) and upload every derivative next to
+the original under a deterministic key (app/utils/media.py). Because the keys
+are deterministic, the API can hand out thumbnail URLs without tracking which
+ones exist yet; clients fall back to the original until they do. The same
+keys are rewritten when an original is replaced, so derivatives are stored
+with a short max-age (THUMBNAIL_CACHE_MAX_AGE_SECONDS) rather than as immutable.
+"""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.tracing import span
+from app.services.blob_store import BlobNotFound, blob_store
+from app.utils.media import MEDIA_TYPES, derivative_path
+
+logger = logging.getLogger("taskhive.thumbnails")
+
+
+@dataclass(frozen=True)
+class ThumbnailJob:
+    bucket: str
+    path: str
+
+
+class ThumbnailService:
+    def __init__(
+        self, store, widths: Sequence[int], formats: Sequence[str], workers: int, max_source_bytes: int, max_age: int
+    ):
+        self.store = store
+        self.widths = list(widths)
+        self.formats = list(formats)
+        self.workers = workers
+        self.max_source_bytes = max_source_bytes
+        self.max_age = max_age
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._pending = set()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._tasks = []
+        self.generated = 0
+        self.failed = 0
+        self.skipped = 0
+
+    def enqueue(self, bucket: str, path: str) -> bool:
+        """Queues a job unless the same object is already waiting."""
+        job = ThumbnailJob(bucket, path)
+        if job in self._pending:
+            return False
+        self._pending.add(job)
+        self._queue.put_nowait(job)
+        return True
+
+    async def process(self, job: ThumbnailJob):
+        # Pillow is only needed once there's an image to render (and in the worker processes)
+        from app.utils import images
+
+        try:
+            data = await self.store.read(job.bucket, job.path)
+        except BlobNotFound:
+            self.skipped += 1
+            logger.warning("thumbnail source missing", extra={"path": job.path})
+            return
+        if len(data) > self.max_source_bytes:
+            self.skipped += 1
+            logger.warning("thumbnail source too large", extra={"path": job.path, "bytes": len(data)})
+            return
+        loop = asyncio.get_running_loop()
+        with span("thumbnails.render"):
+            rendered = await loop.run_in_executor(self._pool, images.render, data, self.widths, self.formats)
+        with span("thumbnails.store"):
+            await asyncio.gather(*(
+                self.store.write(
+                    job.bucket, derivative_path(job.path, width, fmt), body, MEDIA_TYPES[fmt], self.max_age
+                )
+                for width, fmt, body in rendered
+            ))
+        self.generated += len(rendered)
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            self._pending.discard(job)
+            try:
+                await self.process(job)
+            except Exception:
+                self.failed += 1
+                logger.exception("thumbnail generation failed", extra={"path": job.path})
+
+    async def drain(self):
+        """Processes everything currently queued (used by tests)."""
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            self._pending.discard(job)
+            await self.process(job)
+
+    def start(self):
+        if self._pool is None:
+            # spawn, not fork: forking a process with a running event loop and open sockets is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        if not self._tasks:
+            # one task per process keeps the pool busy without queueing work inside it
+            self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def collect(self):
+        yield "taskhive_thumbnails_queue_depth", "gauge", {}, self._queue.qsize()
+        yield "taskhive_thumbnails_generated_total", "counter", {}, self.generated
+        yield "taskhive_thumbnails_failed_total", "counter", {}, self.failed
+        yield "taskhive_thumbnails_skipped_total", "counter", {}, self.skipped
+
+
+thumbnails = ThumbnailService(
+    blob_store,
+    settings.THUMBNAIL_WIDTHS,
+    settings.THUMBNAIL_FORMATS,
+    settings.THUMBNAIL_WORKERS,
+    settings.THUMBNAIL_MAX_SOURCE_BYTES,
+    settings.THUMBNAIL_CACHE_MAX_AGE_SECONDS,
+)
+metrics.register_collector(thumbnails.collect)
@@ -0,0 +1,107 @@
+"""
+Single-row PATCH: optimistic concurrency, no-op detection and `Prefer: return=minimal`.
+
+Every row carries a `version` that goes up on each write (a trigger on
+Supabase, the UPDATE itself on the SQL backend). A PATCH reads the row first:
+
+- with `If-Match`, the tag must be the row's current ETag (as sent by GET
+  /{id} or the previous PATCH), otherwise 412;
+- fields whose new value equals the stored one are dropped, and if nothing is
+  left the write (and the realtime event / cache invalidation) is skipped;
+- the write only applies if `version` is still the one that was read, so an
+  edit that lands in between turns into a 412 instead of being overwritten.
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.db.repository import Repository
+from app.utils.etag import etag_for, fingerprint
+from app.utils.responses import serialize
+
+PREFER_MINIMAL = "return=minimal"
+
+
+def _row_etags(row: Dict[str, Any], adapter: TypeAdapter):
+    # GET /{id} tags either the raw row (conditional_response) or the rendered body (feed_cache)
+    return {fingerprint(row), etag_for(serialize(row, adapter))}
+
+
+def _if_match_ok(if_match: str, row: Dict[str, Any], adapter: TypeAdapter) -> bool:
+    if if_match.strip() == "*":
+        return True
+    # If-Match uses the strong comparison: weak tags never match
+    tags = {tag.strip() for tag in if_match.split(",") if not tag.strip().startswith("W/")}
+    return bool(tags & _row_etags(row, adapter))
+
+
+def _precondition_failed():
+    raise HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="The item was changed since it was read; fetch it again and retry",
+    )
+
+
+def changed_fields(payload: BaseModel, current: BaseModel) -> Dict[str, Any]:
+    """The JSON-ready values of the fields `payload` sets to something other than what `current` has."""
+    values = payload.model_dump(mode="json", exclude_unset=True)
+    return {name: value for name, value in values.items() if getattr(payload, name) != getattr(current, name, None)}
+
+
+async def conditional_update(
+    request: Request,
+    repo: Repository,
+    item_id: int,
+    user_id: str,
+    payload: BaseModel,
+    adapter: TypeAdapter,
+    not_found: str,
+    derive: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    (row after the PATCH, whether anything was written). `derive` recomputes
+    columns that follow from the others (e.g. recurrence.series_columns) whenever something changed.
+    """
+    current = await repo.get(item_id, user_id)
+    if not current:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    if_match = request.headers.get("if-match")
+    if if_match and not _if_match_ok(if_match, current, adapter):
+        _precondition_failed()
+
+    changes = changed_fields(payload, adapter.validate_python(current))
+    if not changes:
+        return current, False
+    if derive:
+        changes.update(derive({**current, **changes}))
+
+    row = await repo.update(item_id, user_id, changes, expected_version=current["version"])
+    if row is None:
+        if if_match:
+            _precondition_failed()
+        # no precondition asked for: last write wins, as before
+        row = await repo.update(item_id, user_id, changes)
+        if row is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    return row, True
+
+
+def prefers_minimal(request: Request) -> bool:
+    prefer = request.headers.get("prefer", "")
+    return any(part.strip() == PREFER_MINIMAL for part in prefer.split(","))
+
+
+def update_response(request: Request, row: Dict[str, Any], adapter: TypeAdapter, changed: bool) -> Response:
+    headers = {"ETag": fingerprint(row)}
+    if not changed:
+        headers["X-Unchanged"] = "true"
+    if prefers_minimal(request):
+        headers["Preference-Applied"] = PREFER_MINIMAL
+        return Response(status_code=status.HTTP_204_NO_CONTENT, headers=headers)
+    return Response(content=serialize(row, adapter), media_type="application/json", headers=headers)
+
+
+# exposed to browsers so they can send If-Match and see what happened
+RESPONSE_HEADERS = ["ETag", "Preference-Applied", "X-Unchanged"]
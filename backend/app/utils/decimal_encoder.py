@@ -1,13 +1,39 @@
 import json
+from datetime import date, datetime
 from decimal import Decimal
-from fastapi.encoders import jsonable_encoder
+
+import orjson
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, Decimal):
             # convert to string to preserve precision, alternatively float()
             return str(o)
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
         return super().default(o)
 
+def orjson_default(o):
+    # orjson handles datetime/UUID natively; Decimal is the one type we need to help with
+    if isinstance(o, Decimal):
+        return str(o)
+    raise TypeError(f"Type is not JSON serializable: {type(o).__name__}")
+
+def dumps_bytes(obj) -> bytes:
+    return orjson.dumps(obj, default=orjson_default)
+
+def dumps(obj) -> str:
+    """Compact JSON text with Decimal/datetime support, in a single pass."""
+    return dumps_bytes(obj).decode()
+
 def encode(obj):
-    return json.loads(json.dumps(obj, cls=DecimalEncoder))
+    """JSON-compatible copy of `obj` (Decimal -> str, datetime -> ISO 8601) without serializing it."""
+    if isinstance(obj, dict):
+        return {k: encode(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [encode(v) for v in obj]
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return obj
@@ -0,0 +1,46 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from app.utils.decimal_encoder import dumps_bytes
+from app.utils.responses import serialize
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag from the exact bytes we send."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    # a weak comparison is fine for GET revalidation
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def fingerprint(payload: Any) -> str:
+    """
+    ETag computed from the raw DB rows rather than the rendered response, so a
+    matching If-None-Match can be answered before any validation/encoding.
+    """
+    return etag_for(dumps_bytes(payload))
+
+
+def conditional_response(
+    request: Request,
+    payload: Any,
+    adapter: TypeAdapter,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    etag = fingerprint(payload)
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    body = serialize(payload, adapter)
+    return Response(content=body, media_type="application/json", headers=headers)
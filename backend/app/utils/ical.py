@@ -0,0 +1,64 @@
+"""Minimal RFC 5545 writer for the events feed; one VEVENT per series, RRULE left for the client to expand."""
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from app.utils.recurrence import parse_ts
+
+PRODID = "-//Taskhive//Events//EN"
+
+CALENDAR_HEADER = (
+    "BEGIN:VCALENDAR\r\n"
+    "VERSION:2.0\r\n"
+    f"PRODID:{PRODID}\r\n"
+    "CALSCALE:GREGORIAN\r\n"
+)
+CALENDAR_FOOTER = "END:VCALENDAR\r\n"
+
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Lines longer than 75 octets continue on the next line after a space."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        # don't split a multi-byte character
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode())
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    return parse_ts(value).astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def vevent(row: Dict[str, Any], host: str) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{row['id']}@{host}",
+        f"DTSTAMP:{_utc(row.get('created_at')) or datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART:{_utc(row['starts_at'])}",
+    ]
+    if row.get("ends_at"):
+        lines.append(f"DTEND:{_utc(row['ends_at'])}")
+    if row.get("rrule"):
+        lines.append(f"RRULE:{row['rrule']}")
+    lines.append(f"SUMMARY:{_escape(row['title'])}")
+    if row.get("description"):
+        lines.append(f"DESCRIPTION:{_escape(row['description'])}")
+    if row.get("location"):
+        lines.append(f"LOCATION:{_escape(row['location'])}")
+    lines.append("END:VEVENT")
+    return "".join(_fold(line) for line in lines)
@@ -0,0 +1,35 @@
+"""
+Image resizing for the thumbnail pipeline. Runs in worker processes, so it
+only depends on Pillow and takes/returns plain bytes.
+"""
+import io
+from typing import List, Sequence, Tuple
+
+from PIL import Image, ImageOps
+
+# refuse to decode anything bigger (decompression bombs)
+Image.MAX_IMAGE_PIXELS = 50_000_000
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+    "avif": {"format": "AVIF", "quality": 55, "speed": 6},
+}
+
+
+def render(data: bytes, widths: Sequence[int], formats: Sequence[str]) -> List[Tuple[int, str, bytes]]:
+    """(width, format, encoded bytes) for every width/format pair; never upscales."""
+    with Image.open(io.BytesIO(data)) as img:
+        # let the JPEG decoder skip detail we'll throw away anyway
+        img.draft("RGB", (max(widths), max(widths) * 4))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        out = []
+        # largest first so each step resizes an already smaller image
+        for width in sorted(widths, reverse=True):
+            if img.width > width:
+                img = img.resize((width, max(1, round(img.height * width / img.width))), Image.Resampling.LANCZOS)
+            for fmt in formats:
+                buf = io.BytesIO()
+                img.save(buf, **SAVE_OPTIONS[fmt])
+                out.append((width, fmt, buf.getvalue()))
+        return out
@@ -0,0 +1,37 @@
+"""Deterministic keys and URLs for stored media and their derivatives."""
+from typing import Dict, List
+from urllib.parse import quote
+
+from app.core.config import settings
+
+MEDIA_TYPES = {"webp": "image/webp", "avif": "image/avif"}
+
+
+def is_clean_key(key: str) -> bool:
+    """No empty, "." or ".." segment, so the key can't climb out of the folder it is put in."""
+    return not any(part in ("", ".", "..") for part in key.split("/"))
+
+
+def is_user_path(user_id: str, path: str) -> bool:
+    """`path` is in the user's own upload folder (`<user id>/...`) and nowhere else."""
+    folder, _, key = path.partition("/")
+    return folder == user_id and is_clean_key(key)
+
+
+def derivative_path(path: str, width: int, fmt: str) -> str:
+    """Stored next to the original: `u1/photo.jpg` -> `u1/photo.jpg.200w.webp`."""
+    return f"{path}.{width}w.{fmt}"
+
+
+def public_url(bucket: str, path: str) -> str:
+    if settings.STORAGE_BACKEND == "local":
+        return f"{settings.STORAGE_LOCAL_BASE_URL.rstrip('/')}/{bucket}/{quote(path)}"
+    return f"{settings.SUPABASE_URL.rstrip('/')}/storage/v1/object/public/{bucket}/{quote(path)}"
+
+
+def thumbnails_for(path: str, bucket: str) -> List[Dict[str, object]]:
+    return [
+        {"width": width, "format": fmt, "url": public_url(bucket, derivative_path(path, width, fmt))}
+        for width in settings.THUMBNAIL_WIDTHS
+        for fmt in settings.THUMBNAIL_FORMATS
+    ]
@@ -1,5 +1,57 @@
-from typing import Optional, Tuple
+import base64
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 
-def to_cursor_paging(limit: int = 20, cursor: Optional[str] = None) -> Tuple[int, Optional[str]]:
-    # For supabase we can call .limit(limit) and .gt("id", cursor) where cursor is last_id
-    return (limit, cursor)
+from fastapi import HTTPException, status
+
+# Clients get the next page's cursor in this header so list bodies stay plain arrays.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class Page(NamedTuple):
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort_value: Any, row_id: int) -> str:
+    raw = json.dumps([sort_value, row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def to_cursor_paging(limit: int = 20, cursor: Optional[str] = None) -> Tuple[int, Optional[Tuple[Any, int]]]:
+    """Decoded (sort_value, id) position to continue after, or None for the first page."""
+    return (limit, decode_cursor(cursor) if cursor else None)
+
+
+def keyset_filter(order: str, desc: bool, after: Tuple[Any, int]) -> str:
+    """
+    PostgREST `or` filter for rows strictly after `after` in (order, id) order,
+    with id as the tie-breaker for equal sort values.
+    """
+    sort_value, row_id = after
+    op = "lt" if desc else "gt"
+    value = json.dumps(sort_value)  # double-quoted so timestamps with '+' / ':' survive
+    return f"{order}.{op}.{value},and({order}.eq.{value},id.{op}.{row_id})"
+
+
+def keyset_bound(order: str, desc: bool, after: Tuple[Any, int]) -> Tuple[str, str, Any]:
+    """
+    Repository filter on the sort column alone, implied by keyset_filter and
+    sent alongside it: Postgres can't start an index scan from an OR, but it
+    can from `order <= value`, so the (..., order, id) index is read from the
+    cursor on instead of from the top.
+    """
+    return (order, "lte" if desc else "gte", after[0])
+
+
+def next_cursor_headers(page: Page) -> Dict[str, str]:
+    return {NEXT_CURSOR_HEADER: page.next_cursor} if page.next_cursor else {}
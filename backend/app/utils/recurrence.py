@@ -0,0 +1,195 @@
+"""
+RRULE handling for recurring events.
+
+Only the series is stored (starts_at/ends_at of the first occurrence plus an
+RFC 5545 RRULE, and series_ends_at when COUNT/UNTIL ends it); occurrences are
+generated on demand for the window being read and never written back. Rules
+are expanded in UTC.
+
+Neither writes nor reads step through a whole series: COUNT and UNTIL are
+capped, and both the series end and a read window are expanded from an
+interval or two before they start where the period allows it, otherwise for at
+most MAX_EXPANSION_STEPS occurrences.
+"""
+import functools
+import heapq
+import itertools
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from dateutil.rrule import rrule, rrulestr
+
+# too dense to expand on a read path
+DISALLOWED_FREQS = {"SECONDLY", "MINUTELY"}
+# longest series a rule may describe: COUNT, and how far ahead UNTIL may be
+MAX_COUNT = 5_000
+MAX_UNTIL_AHEAD = timedelta(days=100 * 366)
+# occurrences a single read generates per series at most
+MAX_EXPANSION_STEPS = 10_000
+# periods that are a fixed length in UTC, so dtstart can move by whole intervals of them
+_FIXED_PERIODS = {"HOURLY": timedelta(hours=1), "DAILY": timedelta(days=1), "WEEKLY": timedelta(weeks=1)}
+
+_VALIDATION_START = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _parts(rule: str) -> Dict[str, str]:
+    return dict(part.split("=", 1) for part in rule.upper().split(";") if "=" in part)
+
+
+@functools.lru_cache(maxsize=1024)
+def _rule(rule: str, dtstart: datetime) -> rrule:
+    """Parsed once per series; `dtstart` must be UTC."""
+    return rrulestr(rule, dtstart=dtstart)
+
+
+def _rule_from(rule: str, first: datetime, not_before: datetime) -> rrule:
+    """
+    The series' rule, with dtstart moved forward by whole intervals to at most
+    `not_before` when that can't change which occurrences follow it: fixed-length
+    periods keep their phase, and the defaults dateutil takes from dtstart
+    (weekday, time of day) stay the same. COUNT counts from the real start, and
+    months and years vary in length, so those series are expanded from dtstart.
+    """
+    parts = _parts(rule)
+    period = _FIXED_PERIODS.get(parts.get("FREQ"))
+    if period is None or "COUNT" in parts or not_before <= first:
+        return _rule(rule, first)
+    step = period * int(parts.get("INTERVAL", "1"))
+    skipped = (not_before - first) // step
+    return _rule(rule, first).replace(dtstart=first + skipped * step) if skipped else _rule(rule, first)
+
+
+def validate_rrule(rule: Optional[str]) -> Optional[str]:
+    """Normalises an RRULE value ("FREQ=WEEKLY;BYDAY=MO" or "RRULE:..."); ValueError if unusable."""
+    if rule is None:
+        return None
+    rule = rule.strip()
+    if rule.upper().startswith("RRULE:"):
+        rule = rule[6:]
+    if not rule:
+        return None
+    if "\n" in rule or "DTSTART" in rule.upper():
+        raise ValueError("rrule must be a single RRULE value; the series starts at starts_at")
+    parts = _parts(rule)
+    if parts.get("FREQ") in DISALLOWED_FREQS:
+        raise ValueError(f"FREQ={parts['FREQ']} is not supported")
+    try:
+        parsed = rrulestr(rule, dtstart=_VALIDATION_START)
+    except (ValueError, TypeError) as exc:
+        raise ValueError(f"invalid rrule: {exc}") from None
+    if parsed._count is not None and parsed._count > MAX_COUNT:
+        raise ValueError(f"COUNT can be at most {MAX_COUNT}")
+    if parsed._until is not None and parsed._until > datetime.now(timezone.utc) + MAX_UNTIL_AHEAD:
+        raise ValueError(f"UNTIL can be at most {MAX_UNTIL_AHEAD.days // 366} years ahead")
+    return rule
+
+
+def to_utc(value: datetime) -> datetime:
+    """Naive datetimes are taken to be UTC."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def span_filter(start: datetime, end: Optional[datetime] = None) -> Tuple[str, str, str]:
+    """Repository filter for events whose `span` overlaps [start, end); no end means open-ended."""
+    fmt = "%Y-%m-%dT%H:%M:%SZ"
+    upper = to_utc(end).strftime(fmt) if end else ""
+    return ("span", "ov", f"[{to_utc(start).strftime(fmt)},{upper})")
+
+
+def parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def series_end(values: Dict[str, Any]) -> Optional[str]:
+    """
+    When the last occurrence of a series ends (ISO, UTC), for `series_ends_at`
+    and the upper bound of the `span` column; None for single events and for
+    series without COUNT or UNTIL, which never end. Should the last occurrence
+    not turn up within MAX_EXPANSION_STEPS, UNTIL stands in for it: the column
+    only has to bound the series.
+    """
+    if not values.get("rrule"):
+        return None
+    first = to_utc(parse_ts(values["starts_at"]))
+    rule = _rule(values["rrule"], first)
+    if rule._count is None and rule._until is None:
+        return None
+    parts = _parts(values["rrule"])
+    period = _FIXED_PERIODS.get(parts.get("FREQ"))
+    if rule._until is None and period is not None and not any(key.startswith("BY") for key in parts):
+        # one occurrence per interval
+        last = first + (rule._count - 1) * period * rule._interval
+    else:
+        # COUNT is capped well below MAX_EXPANSION_STEPS; an UNTIL-only series is
+        # walked from a couple of intervals before UNTIL where the period allows
+        near_until = rule._until - 2 * period * rule._interval if period and rule._until else first
+        steps, last = 0, None
+        for steps, last in enumerate(
+            itertools.islice(_rule_from(values["rrule"], first, near_until), MAX_EXPANSION_STEPS), 1
+        ):
+            pass
+        if last is None or (steps == MAX_EXPANSION_STEPS and rule._until is not None):
+            last = rule._until or first
+    if values.get("ends_at"):
+        last += max(to_utc(parse_ts(values["ends_at"])) - first, timedelta(0))
+    return last.isoformat()
+
+
+def series_columns(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Derived columns of an event row (or create payload) with these values."""
+    return {"series_ends_at": series_end(values)}
+
+
+def _shifted(row: Dict[str, Any], start: datetime, duration: Optional[timedelta]) -> Dict[str, Any]:
+    return {
+        **row,
+        "starts_at": start.isoformat(),
+        "ends_at": (start + duration).isoformat() if duration is not None else None,
+    }
+
+
+def occurrences(row: Dict[str, Any], window_start: datetime, window_end: datetime) -> Iterator[Tuple[datetime, Dict[str, Any]]]:
+    """(start, occurrence) for each occurrence of `row` overlapping [window_start, window_end), in order."""
+    first = to_utc(parse_ts(row["starts_at"]))
+    duration = to_utc(parse_ts(row["ends_at"])) - first if row.get("ends_at") else None
+    if not row.get("rrule"):
+        # the database already checked the overlap
+        yield first, row
+        return
+    length = duration or timedelta(0)
+    # the earliest occurrence that can still be running at window_start began `length` before it
+    earliest = window_start - length
+    for start in itertools.islice(_rule_from(row["rrule"], first, earliest), MAX_EXPANSION_STEPS):
+        if start >= window_end:
+            return
+        if start < earliest or (length and start + length <= window_start):
+            continue
+        yield start, _shifted(row, start, duration)
+
+
+async def expand(rows: AsyncIterator[Dict[str, Any]], window_start: datetime, window_end: datetime) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Occurrences of every row in the window, ordered by start. `rows` must come
+    ordered by starts_at: no occurrence can begin before its series does, so
+    anything starting before the next row's starts_at can be emitted right away
+    and only one pending occurrence per open series is held in memory.
+    """
+    heap = []
+    tiebreak = itertools.count()
+
+    def advance(series):
+        nxt = next(series, None)
+        if nxt is not None:
+            heapq.heappush(heap, (nxt[0], next(tiebreak), nxt[1], series))
+
+    async for row in rows:
+        series_start = parse_ts(row["starts_at"])
+        while heap and heap[0][0] <= series_start:
+            _, _, occurrence, series = heapq.heappop(heap)
+            yield occurrence
+            advance(series)
+        advance(occurrences(row, window_start, window_end))
+    while heap:
+        _, _, occurrence, series = heapq.heappop(heap)
+        yield occurrence
+        advance(series)
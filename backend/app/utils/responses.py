@@ -0,0 +1,27 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+from app.core.tracing import span
+from app.utils.decimal_encoder import dumps_bytes
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed default response class with native datetime and Decimal-as-string support."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
+
+
+def serialize(payload: Any, adapter: TypeAdapter) -> bytes:
+    """
+    JSON body for rows read from the database. With TRUST_DB_ROWS the rows are
+    encoded as-is (they were already projected to the *Out columns); otherwise
+    they're validated against the response schema once and encoded by pydantic-core.
+    """
+    with span("serialize"):
+        if settings.TRUST_DB_ROWS:
+            return dumps_bytes(payload)
+        return adapter.dump_json(adapter.validate_python(payload))
@@ -1,10 +1,13 @@
 from fastapi import HTTPException, status
 
 def require_admin(user: dict):
-    jwt = user.get("raw", {})
-    claims = jwt.get("user_metadata", {}) or jwt.get("app_metadata", {}) or {}
-    role = claims.get("role") or jwt.get("role")
+    # raw_data is the verified JWT claims (local verification) or the supabase User (remote lookup).
+    # Only app_metadata counts: user_metadata can be edited by the user themselves.
+    raw = user.get("raw_data") or {}
+    app_metadata = raw.get("app_metadata") if isinstance(raw, dict) else getattr(raw, "app_metadata", None)
+    role = (app_metadata or {}).get("role")
     if role != "admin":
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
 
-# Expect the token to contain a 'role' claim OR check elsewhere if maintaining an admins table, query it instead.
\ No newline at end of file
+# Grant the role with the service key: auth.admin.update_user_by_id(id, {"app_metadata": {"role": "admin"}}).
+# If you maintain an admins table instead, query it here.
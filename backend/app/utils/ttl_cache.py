@@ -0,0 +1,111 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.core import metrics
+
+
+class TTLCache:
+    """
+    In-process LRU cache with per-entry expiry, bounded by entry count and by an
+    approximate byte budget. `get_or_load` coalesces concurrent misses for the
+    same key into a single loader call.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, default_ttl: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        metrics.register_collector(self._collect)
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0):
+        ttl = self.default_ttl if ttl is None else min(ttl, self.default_ttl)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        if key in self._data:
+            self._remove(key)
+        self._data[key] = (value, time.monotonic() + ttl, size)
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def delete(self, key: Hashable):
+        if key in self._data:
+            self._remove(key)
+
+    def clear(self):
+        self._data.clear()
+        self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        _, _, size = self._data.pop(key)
+        self._bytes -= size
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Tuple[Any, Optional[float], int]]],
+    ) -> Any:
+        """
+        `loader` returns (value, ttl, size). Exceptions propagate to every waiter
+        and nothing is cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            value, ttl, size = await loader()
+            self.set(key, value, ttl, size)
+            fut.set_result(value)
+            return value
+        except BaseException as exc:
+            fut.set_exception(exc)
+            # mark retrieved so a failure nobody else awaited isn't logged
+            fut.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def _collect(self):
+        labels = {"cache": self.name}
+        yield "taskhive_cache_hits_total", "counter", labels, self.hits
+        yield "taskhive_cache_misses_total", "counter", labels, self.misses
+        yield "taskhive_cache_evictions_total", "counter", labels, self.evictions
+        yield "taskhive_cache_expirations_total", "counter", labels, self.expirations
+        yield "taskhive_cache_entries", "gauge", labels, len(self._data)
+        yield "taskhive_cache_bytes", "gauge", labels, self._bytes
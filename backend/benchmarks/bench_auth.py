@@ -0,0 +1,105 @@
+"""
+Per-request auth latency: remote supabase.auth.get_user vs local JWT verification.
+
+Boots a stub auth server on localhost (optionally with injected latency) so the
+numbers don't depend on a live Supabase project.
+
+    cd backend && python -m benchmarks.bench_auth --requests 500 --latency-ms 0
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+JWT_SECRET = "bench-secret-bench-secret-bench-secret"
+
+
+def _start_stub(latency_ms: float):
+    user_id = str(uuid.uuid4())
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            if self.path.endswith("/user"):
+                body = {
+                    "id": user_id,
+                    "aud": "authenticated",
+                    "email": "bench@example.com",
+                    "app_metadata": {},
+                    "user_metadata": {},
+                    "created_at": "2024-01-01T00:00:00Z",
+                }
+            elif self.path.endswith("/jwks.json"):
+                body = {"keys": []}
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            raw = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, user_id
+
+
+def _summary(name: str, samples):
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(f"{name:<8} mean={statistics.mean(samples) * 1000:8.3f}ms  p50={p(0.50):8.3f}ms  p99={p(0.99):8.3f}ms")
+
+
+async def main(n: int, latency_ms: float):
+    server, user_id = _start_stub(latency_ms)
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ["SUPABASE_URL"] = url
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+    os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+
+    from jose import jwt
+    from app.db import supabase_client
+    from app.services.auth_service import verify_token
+
+    await supabase_client.init_supabase_client()
+    supabase = supabase_client.get_global_supabase()
+    token = jwt.encode(
+        {"sub": user_id, "aud": "authenticated", "email": "bench@example.com", "exp": int(time.time()) + 3600},
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+
+    remote, local = [], []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await supabase.auth.get_user(token)
+        remote.append(time.perf_counter() - t0)
+    for _ in range(n):
+        t0 = time.perf_counter()
+        await verify_token(token)
+        local.append(time.perf_counter() - t0)
+
+    print(f"{n} requests, stub latency {latency_ms}ms")
+    _summary("remote", remote)
+    _summary("local", local)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,128 @@
+"""
+Home-screen latency: the four list calls the frontend used to make one after
+another vs a single GET /dashboard.
+
+Runs the app in-process against a stub PostgREST on localhost that answers
+every query after --latency-ms, so the difference is the round trips saved
+and the queries overlapped, not anything about a real database.
+
+    cd backend && python -m benchmarks.bench_dashboard --requests 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+JWT_SECRET = "bench-secret-bench-secret-bench-secret"
+USER_ID = str(uuid.uuid4())
+TS = "2030-01-01T00:00:00+00:00"
+
+ROWS = {
+    "todos": {"id": 1, "user_id": USER_ID, "title": "Read chapter 5", "description": None,
+              "due_date": "2020-01-01T00:00:00+00:00", "completed": False, "created_at": TS, "updated_at": None, "version": 1,
+              "study_plan_id": 1, "subject": "Math"},
+    "study_plans": {"id": 1, "user_id": USER_ID, "title": "Semester 2", "subjects": ["Math"], "duration": None,
+                    "progress": 40, "status": "active", "created_at": TS, "deadline": None, "version": 1,
+                    "todos_total": 5, "todos_done": 2, "subject_counts": {"Math": {"total": 5, "done": 2}}},
+    "events": {"id": 1, "user_id": USER_ID, "title": "Study group", "description": None, "starts_at": TS,
+               "ends_at": None, "created_at": TS, "location": None, "rrule": None, "version": 1},
+    "marketplace_items": {"id": 1, "user_id": USER_ID, "title": "Calculator", "description": None,
+                          "price": 20.0, "available": True, "created_at": TS, "version": 1},
+}
+
+# what the home screen fetched before /dashboard existed
+SERIAL_CALLS = ["/todos/", "/study/", "/events/mine", "/marketplace/mine"]
+
+
+def _start_stub(latency_ms: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body go out as separate writes; without this, Nagle + delayed ACK add ~40ms
+        disable_nagle_algorithm = True
+
+        def _reply(self, with_body: bool):
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            table = self.path.split("?")[0].rsplit("/", 1)[-1]
+            raw = json.dumps([ROWS[table]] * 10).encode() if table in ROWS else b"[]"
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Range", "0-9/10")
+            self.send_header("Content-Length", str(len(raw) if with_body else 0))
+            self.end_headers()
+            if with_body:
+                self.wfile.write(raw)
+
+        def do_GET(self):
+            self._reply(True)
+
+        def do_HEAD(self):
+            self._reply(False)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _summary(name: str, samples):
+    samples = sorted(samples)
+    p = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * 1000
+    print(f"{name:<10} mean={statistics.mean(samples) * 1000:8.2f}ms  p50={p(0.50):8.2f}ms  p99={p(0.99):8.2f}ms")
+
+
+async def main(n: int, latency_ms: float):
+    server = _start_stub(latency_ms)
+    os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+    os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    import httpx
+    from jose import jwt
+    from app.main import app
+
+    token = jwt.encode(
+        {"sub": USER_ID, "aud": "authenticated", "email": "bench@example.com", "exp": int(time.time()) + 3600},
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+
+    serial, dashboard = [], []
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as client:
+            for path in SERIAL_CALLS + ["/dashboard"]:
+                (await client.get(path)).raise_for_status()  # warm up connections
+            for _ in range(n):
+                t0 = time.perf_counter()
+                for path in SERIAL_CALLS:
+                    (await client.get(path)).raise_for_status()
+                serial.append(time.perf_counter() - t0)
+            for _ in range(n):
+                t0 = time.perf_counter()
+                resp = await client.get("/dashboard")
+                resp.raise_for_status()
+                dashboard.append(time.perf_counter() - t0)
+            assert not resp.json()["unavailable"], resp.json()["unavailable"]
+
+    print(f"{n} home-screen loads, stub latency {latency_ms}ms per query")
+    _summary("4 serial", serial)
+    _summary("dashboard", dashboard)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
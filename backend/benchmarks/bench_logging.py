@@ -0,0 +1,94 @@
+"""
+Logging under load: synchronous RotatingFileHandler vs the queue pipeline.
+
+Many asyncio tasks log concurrently (as request handlers would) while a ticker
+measures how late the event loop wakes up. Small maxBytes forces frequent
+rotations so their cost shows up.
+
+    cd backend && python -m benchmarks.bench_logging --tasks 200 --records 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener, RotatingFileHandler
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+
+from app.core.logging import DroppingQueueHandler, JsonFormatter, RequestIdFilter, request_id_var
+
+
+async def _ticker(stop: asyncio.Event, lags: list, interval: float = 0.001):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        t0 = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(loop.time() - t0 - interval)
+
+
+async def _worker(log: logging.Logger, n: int, wid: int):
+    request_id_var.set(f"req-{wid}")
+    for i in range(n):
+        log.info("handled request", extra={"route": "/todos/", "i": i})
+        if i % 10 == 0:
+            await asyncio.sleep(0)
+
+
+async def run(log: logging.Logger, tasks: int, records: int):
+    stop = asyncio.Event()
+    lags: list = []
+    ticker = asyncio.create_task(_ticker(stop, lags))
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker(log, records, w) for w in range(tasks)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await ticker
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0
+    return tasks * records / elapsed, p99, (lags[-1] * 1000 if lags else 0.0)
+
+
+def main(tasks: int, records: int, max_bytes: int):
+    tmp = tempfile.mkdtemp()
+    results = {}
+
+    sync_log = logging.getLogger("bench.sync")
+    sync_log.propagate = False
+    sync_log.setLevel(logging.INFO)
+    fh = RotatingFileHandler(os.path.join(tmp, "sync.log"), maxBytes=max_bytes, backupCount=3)
+    fh.setFormatter(JsonFormatter())
+    fh.addFilter(RequestIdFilter())
+    sync_log.addHandler(fh)
+    results["sync"] = asyncio.run(run(sync_log, tasks, records))
+
+    q_log = logging.getLogger("bench.queue")
+    q_log.propagate = False
+    q_log.setLevel(logging.INFO)
+    qh = DroppingQueueHandler(queue.Queue(maxsize=10_000))
+    qh.addFilter(RequestIdFilter())
+    q_log.addHandler(qh)
+    fh2 = RotatingFileHandler(os.path.join(tmp, "queue.log"), maxBytes=max_bytes, backupCount=3)
+    fh2.setFormatter(JsonFormatter())
+    listener = QueueListener(qh.queue, fh2)
+    listener.start()
+    results["queue"] = asyncio.run(run(q_log, tasks, records))
+    listener.stop()
+
+    print(f"{tasks} tasks x {records} records, rotation every {max_bytes} bytes")
+    print(f"{'pipeline':<8} {'records/s':>12} {'loop lag p99':>14} {'loop lag max':>14}")
+    for name, (rate, p99, worst) in results.items():
+        print(f"{name:<8} {rate:>12.0f} {p99:>12.2f}ms {worst:>12.2f}ms")
+    print(f"queue pipeline dropped {qh.dropped} records")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--max-bytes", type=int, default=1_000_000)
+    args = parser.parse_args()
+    main(args.tasks, args.records, args.max_bytes)
@@ -0,0 +1,89 @@
+"""
+Serialization cost of a 200-row MarketplaceItemOut list response.
+
+  before   - what the routes did: validate each row into the model, jsonable_encoder,
+             stdlib json.dumps (plus the old decimal_encoder json round-trip)
+  adapter  - one TypeAdapter validate + pydantic-core dump_json (default path now)
+  trusted  - orjson straight from the DB rows (TRUST_DB_ROWS=true)
+
+    cd backend && python -m benchmarks.bench_serialization
+"""
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from typing import List
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.marketplace import MarketplaceItemOut
+from app.utils.decimal_encoder import DecimalEncoder, dumps_bytes
+
+
+def make_rows(n: int):
+    # shaped like PostgREST output: timestamps as strings, numeric as JSON numbers
+    return [
+        {
+            "id": i,
+            "user_id": "5d0f7c5e-8a4e-4b55-9f55-6f3a6f1b2c%02d" % (i % 100),
+            "title": f"Used graphing calculator #{i}",
+            "description": "Gently used, works fine. Pick up on campus." * 2,
+            "price": 1999.99 - i,
+            "available": i % 7 != 0,
+            "created_at": "2024-09-01T12:34:56.789012+00:00",
+            "version": 1,
+        }
+        for i in range(n)
+    ]
+
+
+adapter = TypeAdapter(List[MarketplaceItemOut])
+
+
+def before(rows):
+    models = [MarketplaceItemOut.model_validate(r) for r in rows]
+    data = json.loads(json.dumps(jsonable_encoder(models), cls=DecimalEncoder))
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def with_adapter(rows):
+    return adapter.dump_json(adapter.validate_python(rows))
+
+
+def trusted(rows):
+    return dumps_bytes(rows)
+
+
+def measure(fn, rows, repeat: int):
+    fn(rows)  # warm up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(rows)
+    per_call_ms = (time.perf_counter() - t0) / repeat * 1000
+    tracemalloc.start()
+    fn(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call_ms, peak
+
+
+def main(n: int, repeat: int):
+    rows = make_rows(n)
+    print(f"{n} rows x {repeat} calls")
+    print(f"{'path':<10} {'ms/call':>10} {'peak KiB':>10}")
+    for name, fn in (("before", before), ("adapter", with_adapter), ("trusted", trusted)):
+        ms, peak = measure(fn, rows, repeat)
+        print(f"{name:<10} {ms:>10.3f} {peak / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.repeat)
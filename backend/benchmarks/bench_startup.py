@@ -0,0 +1,167 @@
+"""
+Cold start and per-request middleware overhead.
+
+  cold start - fresh interpreters importing app.main and running the lifespan
+               startup against benchmarks/fake_supabase.py, i.e. what a cold
+               boot costs before the first request can be served
+  imports    - the slowest modules app.main pulls in (python -X importtime)
+  middleware - one GET / driven straight through ASGI, with the full
+               middleware stack vs the bare router, and vs the same headers
+               added by call_next (BaseHTTPMiddleware) middlewares as before
+
+    cd backend && python -m benchmarks.bench_startup --runs 10 --requests 5000
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+ENV = {
+    "SUPABASE_URL": "http://supabase.fake",
+    "SUPABASE_SERVICE_ROLE_KEY": "bench",
+    "SUPABASE_JWT_SECRET": "bench-secret-bench-secret-bench-secret",
+    "RATE_LIMIT_ENABLED": "false",
+    "DATA_BACKEND": "supabase",
+    "LOG_LEVEL": "WARNING",
+}
+os.environ.update({key: os.environ.get(key, value) for key, value in ENV.items()})
+
+# runs in a fresh interpreter per sample
+CHILD = """
+import time
+t0 = time.perf_counter()
+import app.main
+t1 = time.perf_counter()
+
+import asyncio, json
+from benchmarks.fake_supabase import FakeSupabase, install
+
+install(FakeSupabase())
+
+async def boot():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        t2 = time.perf_counter()
+    return t2
+
+t2 = asyncio.run(boot())
+print(json.dumps({"import_s": t1 - t0, "ready_s": t2 - t0}))
+"""
+
+
+def cold_start(runs: int):
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        out = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True, check=True)
+        child = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append({**child, "process_s": time.perf_counter() - started})
+    print(f"cold start, {runs} runs{'':<6}{'median':>10}{'min':>10}{'max':>10}")
+    for key, label in (("import_s", "import app.main"), ("ready_s", "import + lifespan"), ("process_s", "whole process")):
+        values = [s[key] * 1000 for s in samples]
+        print(f"  {label:<24}{statistics.median(values):>8.1f}ms{min(values):>8.1f}ms{max(values):>8.1f}ms")
+
+
+def slowest_imports(top: int):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"],
+                         capture_output=True, text=True, check=True)
+    # "import time: self [us] | cumulative | <indent>name"; two spaces of indent = imported by app.main itself
+    direct = []
+    for line in out.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].startswith("   ") and not parts[2].startswith("    "):
+            direct.append((int(parts[1]), parts[2].strip()))
+    print("slowest imports of app.main (cumulative, first import wins)")
+    for cumulative, name in sorted(direct, reverse=True)[:top]:
+        print(f"  {name:<40}{cumulative / 1000:>8.1f}ms")
+
+
+def _legacy_stack(inner):
+    """The same headers added the old way, with function middlewares (call_next)."""
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from starlette.middleware.cors import CORSMiddleware
+
+    from app.core import tracing
+    from app.instrumentation import REQUEST_ID_HEADER
+    from app.security_headers import response_headers
+
+    headers = response_headers()
+
+    async def security(request, call_next):
+        response = await call_next(request)
+        for name, value in headers.items():
+            response.headers.setdefault(name, value)
+        return response
+
+    async def instrumentation(request, call_next):
+        token = tracing.start_request()
+        start = time.perf_counter()
+        response = await call_next(request)
+        response.headers["Server-Timing"] = tracing.server_timing(tracing.end_request(token), time.perf_counter() - start)
+        response.headers[REQUEST_ID_HEADER] = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        return response
+
+    app = BaseHTTPMiddleware(inner, dispatch=security)
+    app = BaseHTTPMiddleware(app, dispatch=instrumentation)
+    return CORSMiddleware(app, allow_origins=["https://taskhive.shop"], allow_credentials=True,
+                          allow_methods=["*"], allow_headers=["*"])
+
+
+async def _drive(asgi, app, n: int) -> float:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/", "raw_path": b"/", "query_string": b"", "root_path": "", "app": app,
+        "headers": [(b"host", b"bench"), (b"origin", b"https://taskhive.shop")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(n):
+        await asgi(dict(scope), receive, send)
+    return (time.perf_counter() - started) / n
+
+
+async def middleware_overhead(requests: int, repeat: int):
+    from fastapi import FastAPI
+
+    from app.main import app
+
+    # the same routes with only FastAPI's own error/exit-stack layers around them
+    bare = FastAPI()
+    bare.router = app.router
+    stacks = {"bare router": bare, "full stack": app, "call_next": _legacy_stack(bare)}
+    for asgi in stacks.values():
+        await _drive(asgi, app, 200)  # builds the middleware stacks, warms caches
+    best = {name: min([await _drive(asgi, app, requests) for _ in range(repeat)]) for name, asgi in stacks.items()}
+    print(f"GET / through ASGI, best of {repeat} x {requests}")
+    print(f"  {'stack':<16}{'us/request':>12}{'overhead':>12}")
+    for name, seconds in best.items():
+        overhead = (seconds - best["bare router"]) * 1e6
+        print(f"  {name:<16}{seconds * 1e6:>12.1f}{overhead:>11.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10, help="cold starts to sample")
+    parser.add_argument("--top", type=int, default=12, help="imports to list")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    cold_start(args.runs)
+    slowest_imports(args.top)
+    asyncio.run(middleware_overhead(args.requests, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+In-process stand-in for the Supabase HTTP APIs the backend calls, for load
+tests and the test suite (tests/), neither of which should need a live project.
+
+`FakeSupabase` is an httpx transport: the app's shared Supabase HTTP client is
+built on it (see `install`), so every PostgREST, RPC and storage call is
+answered from in-memory tables after `latency_ms` (+ up to `jitter_ms`) of
+simulated network/database time. It understands the subset of PostgREST the
+repositories use: eq/neq/gt/gte/lt/lte/in/is filters, keyset `or=`, order,
+limit/offset, select, exact counts (HEAD), inserts, upserts, updates and deletes, plus
+`wfts` search and `ov` range overlap.
+"""
+import asyncio
+import functools
+import itertools
+import json
+import random
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+import httpx
+
+DEFAULTS = {
+    "todos": {"description": None, "due_date": None, "completed": False, "updated_at": None,
+              "study_plan_id": None, "subject": None},
+    "study_plans": {"subjects": [], "duration": None, "progress": 0, "status": "draft", "deadline": None,
+                    "todos_total": 0, "todos_done": 0, "subject_counts": {}},
+    "marketplace_items": {"description": None, "available": True, "image_path": None},
+    "events": {"description": None, "ends_at": None, "location": None, "rrule": None, "series_ends_at": None},
+}
+
+ADMIN_STATS = {
+    "totals": {"users": 1000, "listings_available": 800, "listings_unavailable": 200},
+    "daily": [],
+    "active_users_7d": 120,
+    "active_users_30d": 400,
+}
+
+_RESERVED = {"select", "order", "limit", "offset", "or", "and", "on_conflict", "columns"}
+_FILTER = re.compile(r"^(not\.)?([a-z]+(?:\([a-z]+\))?)\.(.*)$", re.S)
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _split_top(expr: str) -> List[str]:
+    """Splits `a,and(b,c),"x,y"` on the commas that aren't nested or quoted."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, ch in enumerate(expr):
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and ch == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return parts
+
+
+def _typed(raw: str, like: Any) -> Any:
+    raw = raw.strip('"')
+    if isinstance(like, bool):
+        return raw.lower() == "true"
+    if isinstance(like, (int, float)):
+        return float(raw)
+    return raw
+
+
+@functools.lru_cache(maxsize=100_000)
+def _ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _overlaps(row: Dict[str, Any], bounds: str) -> bool:
+    lower, upper = bounds[1:-1].split(",")
+    start, end = _ts(row["starts_at"]), _ts(row["ends_at"]) if row.get("ends_at") else None
+    if upper and start >= _ts(upper):
+        return False
+    if row.get("rrule"):
+        return not row.get("series_ends_at") or _ts(row["series_ends_at"]) >= _ts(lower)
+    return (end if end and end > start else start) >= _ts(lower)
+
+
+def _matches(row: Dict[str, Any], column: str, op: str, raw: str) -> bool:
+    value = row.get(column)
+    if op == "is":
+        return value is None if raw == "null" else value is _typed(raw, True)
+    if op == "in":
+        return str(value) in {v.strip('"') for v in raw.strip("()").split(",")}
+    if op.startswith("wfts"):
+        text = f"{row.get('title') or ''} {row.get('description') or ''}".lower()
+        return all(term.lower() in text for term in raw.split())
+    if op == "ov":
+        return _overlaps(row, raw)
+    if value is None:
+        return False
+    target = _typed(raw, value)
+    if isinstance(value, str) and column.endswith(("_at", "_date", "deadline")):
+        value, target = _ts(value), _ts(target)
+    return {
+        "eq": value == target, "neq": value != target, "gt": value > target,
+        "gte": value >= target, "lt": value < target, "lte": value <= target,
+    }[op]
+
+
+def _parse_logic(expr: str, any_of: bool) -> tuple:
+    """`a.op.v,and(b.op.v,...)` -> ("or"|"and", [terms]); parsed once per query, not per row."""
+    terms = []
+    for part in _split_top(expr):
+        if part.startswith(("and(", "or(")):
+            name, inner = part.split("(", 1)
+            terms.append(_parse_logic(inner[:-1], name == "or"))
+        else:
+            column, rest = part.split(".", 1)
+            terms.append((column, *rest.split(".", 1)))
+    return ("or" if any_of else "and", terms)
+
+
+def _logic(row: Dict[str, Any], node: tuple) -> bool:
+    kind, terms = node
+    results = (_logic(row, t) if t[0] in ("and", "or") else _matches(row, *t) for t in terms)
+    return any(results) if kind == "or" else all(results)
+
+
+class FakeSupabase(httpx.AsyncBaseTransport):
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0, seed: int = 0):
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.calls = 0
+        self.busy = 0.0  # CPU seconds spent answering (the fake shares the app's event loop)
+        self._rng = random.Random(seed)
+        self.reset()
+
+    # ---- data ----
+
+    def reset(self):
+        """Empties every table and restarts ids at 1."""
+        self.tables: Dict[str, List[Dict[str, Any]]] = {name: [] for name in DEFAULTS}
+        # rows per (table, user_id): the fake's stand-in for the user_id indexes, so
+        # per-user queries don't scan every row and the fake doesn't dominate the profile
+        self.by_owner: Dict[str, Dict[str, List[Dict[str, Any]]]] = {name: {} for name in DEFAULTS}
+        self.ids = {name: itertools.count(1) for name in DEFAULTS}
+
+    def insert(self, table: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        row = {"id": next(self.ids[table]), "created_at": _now(), "version": 1, **DEFAULTS[table], **values}
+        if table == "marketplace_items":
+            row["price"] = float(row.get("price") or 0)
+        self.tables[table].append(row)
+        self.by_owner[table].setdefault(row.get("user_id"), []).append(row)
+        return row
+
+    def upsert(self, table: str, key: str, values: Dict[str, Any]) -> Dict[str, Any]:
+        """`on_conflict=<key>` with merge-duplicates: update the row with the same key, else insert."""
+        row = next((r for r in self.tables[table] if r.get(key) == values.get(key)), None)
+        if row is None:
+            return self.insert(table, values)
+        # as the version trigger does
+        row.update(values, version=row["version"] + 1)
+        return row
+
+    def delete(self, table: str, rows: List[Dict[str, Any]]):
+        gone = {id(r) for r in rows}
+        self.tables[table] = [r for r in self.tables[table] if id(r) not in gone]
+        for owned in self.by_owner[table].values():
+            owned[:] = [r for r in owned if id(r) not in gone]
+
+    def seed(self, user_ids: List[str], rows_per_user: int):
+        """A few of everything per user, spread over the last/next month."""
+        rng = random.Random(1)
+        now = datetime.now(timezone.utc)
+        words = ["calculator", "textbook", "laptop", "lamp", "chair", "bike", "notebook", "headphones"]
+        for user_id in user_ids:
+            for i in range(rows_per_user):
+                when = (now + timedelta(hours=rng.randint(-720, 720))).isoformat()
+                self.insert("todos", {"user_id": user_id, "title": f"Todo {i}", "due_date": when,
+                                      "completed": rng.random() < 0.3})
+                self.insert("study_plans", {"user_id": user_id, "title": f"Plan {i}", "subjects": ["Math"],
+                                            "deadline": when, "status": rng.choice(["draft", "active", "completed"])})
+                self.insert("events", {"user_id": user_id, "title": f"Event {i}", "starts_at": when,
+                                       "rrule": "FREQ=WEEKLY;COUNT=8" if i % 5 == 0 else None})
+                self.insert("marketplace_items", {"user_id": user_id, "title": f"Used {rng.choice(words)}",
+                                                  "description": f"{rng.choice(words)} in good shape",
+                                                  "price": round(rng.uniform(1, 300), 2),
+                                                  "available": rng.random() < 0.8})
+
+    # ---- PostgREST ----
+
+    def _select(self, table: str, params: List[tuple]) -> List[Dict[str, Any]]:
+        owner = next((raw[3:] for key, raw in params if key == "user_id" and raw.startswith("eq.")), None)
+        rows = self.by_owner[table].get(owner, []) if owner else self.tables[table]
+        for key, raw in params:
+            if key in _RESERVED or (key == "user_id" and owner):
+                continue
+            m = _FILTER.match(raw)
+            negate, op, value = bool(m.group(1)), m.group(2), m.group(3)
+            rows = [r for r in rows if _matches(r, key, op, value) != negate]
+        for key, raw in params:
+            if key == "or":
+                node = _parse_logic(raw[1:-1], True)
+                rows = [r for r in rows if _logic(r, node)]
+        return rows
+
+    @staticmethod
+    def _order(rows: List[Dict[str, Any]], spec: Optional[str]) -> List[Dict[str, Any]]:
+        for term in reversed((spec or "").split(",") if spec else []):
+            column, *mods = term.split(".")
+            desc = "desc" in mods
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            # postgres: nulls sort as larger than everything
+            rows = missing + present if desc else present + missing
+        return rows
+
+    @staticmethod
+    def _project(rows: List[Dict[str, Any]], params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """`select=a,b` (reads, and writes returning a representation): those columns, in that order."""
+        columns = params.get("select", "*")
+        if columns == "*":
+            return rows
+        keep = columns.split(",")
+        return [{c: r.get(c) for c in keep} for r in rows]
+
+    def _postgrest(self, request: httpx.Request, table: str) -> httpx.Response:
+        params = parse_qsl(request.url.query.decode(), keep_blank_values=True)
+        single = dict(params)
+        if table.startswith("rpc/"):
+            return httpx.Response(200, json=ADMIN_STATS if table == "rpc/admin_stats" else None)
+        if request.method in ("GET", "HEAD"):
+            rows = self._order(self._select(table, params), single.get("order"))
+            total = len(rows)
+            offset = int(single.get("offset", 0))
+            rows = rows[offset:offset + int(single["limit"])] if "limit" in single else rows[offset:]
+            rows = self._project(rows, single)
+            headers = {"Content-Range": f"0-{max(0, len(rows) - 1)}/{total}"}
+            if request.method == "HEAD":
+                return httpx.Response(200, headers=headers)
+            return httpx.Response(200, json=rows, headers=headers)
+        if request.method == "POST":
+            body = json.loads(request.content)
+            values_list = body if isinstance(body, list) else [body]
+            if "on_conflict" in single:
+                rows = [self.upsert(table, single["on_conflict"], values) for values in values_list]
+            else:
+                rows = [self.insert(table, values) for values in values_list]
+            return httpx.Response(201, json=self._project(rows, single))
+        matched = self._select(table, params)
+        if request.method == "PATCH":
+            body = json.loads(request.content)
+            for row in matched:
+                # as the version trigger does
+                row.update(body, version=row["version"] + 1)
+            return httpx.Response(200, json=self._project(matched, single))
+        if request.method == "DELETE":
+            self.delete(table, matched)
+            return httpx.Response(200, json=self._project(matched, single))
+        return httpx.Response(405, json={"message": "method not allowed"})
+
+    # ---- storage ----
+
+    @staticmethod
+    def _storage(request: httpx.Request, path: str) -> httpx.Response:
+        if path.startswith("object/upload/sign/"):
+            target = path[len("object/upload/sign/"):]
+            return httpx.Response(200, json={"url": f"/object/upload/sign/{target}?token=fake-upload-token"})
+        if path.startswith("object/sign/"):
+            body = json.loads(request.content or b"{}")
+            if "paths" in body:
+                return httpx.Response(200, json=[
+                    {"path": p, "signedURL": f"/object/sign/{p}?token=fake", "error": None} for p in body["paths"]
+                ])
+            return httpx.Response(200, json={"signedURL": f"/{path}?token=fake"})
+        return httpx.Response(404, json={"message": "not found"})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        path = request.url.path
+        if path.startswith("/rest/v1/"):
+            response = self._postgrest(request, path[len("/rest/v1/"):])
+        elif path.startswith("/storage/v1/"):
+            response = self._storage(request, path[len("/storage/v1/"):])
+        else:
+            response = httpx.Response(404, json={"message": "not found"})
+        response.request = request
+        self.busy += time.perf_counter() - t0
+        return response
+
+
+def install(fake: FakeSupabase):
+    """Makes the app build its Supabase client on `fake`. Call before the app's lifespan starts."""
+    from app.db import supabase_client
+
+    supabase_client._build_http_client = lambda: httpx.AsyncClient(transport=fake, timeout=30.0)
@@ -0,0 +1,225 @@
+"""
+Load test: a weighted mix of authenticated reads and writes across the API,
+driven by concurrent clients against the app in-process, with Supabase
+replaced by benchmarks/fake_supabase.py (so the numbers are the app's own
+overhead plus whatever --latency-ms the fake adds per Supabase call).
+
+Prints p50/p95/p99 and req/s per route and writes everything to a JSON file
+(default benchmarks/results/loadtest-<commit>.json). Pass --compare with an
+earlier file to see the change per route.
+
+    cd backend && python -m benchmarks.loadtest --concurrency 32 --duration 20 --latency-ms 5
+    cd backend && python -m benchmarks.loadtest --compare benchmarks/results/loadtest-<old>.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+JWT_SECRET = "bench-secret-bench-secret-bench-secret"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def _range_params(rng: random.Random) -> Dict[str, str]:
+    start = datetime.now(timezone.utc) + timedelta(days=rng.randint(-14, 14))
+    return {"from": start.isoformat(), "to": (start + timedelta(days=7)).isoformat()}
+
+
+# (name, weight, method, path, request builder) -- the name is what results are keyed by.
+# Roughly what the frontend sends: mostly list reads, some creates, a little of everything else.
+MIX: List[Tuple[str, int, str, str, Callable[[random.Random], Dict[str, Any]]]] = [
+    ("GET /todos/", 16, "GET", "/todos/", lambda r: {"params": {"limit": 20}}),
+    ("POST /todos/", 6, "POST", "/todos/", lambda r: {"json": {"title": f"Load test {r.random():.6f}"}}),
+    ("GET /study/", 8, "GET", "/study/", lambda r: {"params": {"limit": 20}}),
+    ("POST /study/", 2, "POST", "/study/", lambda r: {"json": {"title": "Plan", "subjects": ["Math", "DSA"]}}),
+    ("GET /marketplace/", 12, "GET", "/marketplace/", lambda r: {"params": {"limit": 20}}),
+    ("GET /marketplace/search", 8, "GET", "/marketplace/search",
+     lambda r: {"params": {"q": r.choice(["calculator", "lamp", "bike"]), "max_price": 200}}),
+    ("POST /marketplace/", 2, "POST", "/marketplace/",
+     lambda r: {"json": {"title": "Used lamp", "price": f"{r.uniform(1, 100):.2f}"}}),
+    ("GET /events/mine", 8, "GET", "/events/mine", lambda r: {"params": {"limit": 20}}),
+    ("GET /events/range", 6, "GET", "/events/range", lambda r: {"params": _range_params(r)}),
+    ("POST /events/", 2, "POST", "/events/",
+     lambda r: {"json": {"title": "Study group", "starts_at": datetime.now(timezone.utc).isoformat(), "ends_at": None}}),
+    ("GET /dashboard", 8, "GET", "/dashboard", lambda r: {}),
+    ("POST /storage/presign", 3, "POST", "/storage/presign", lambda r: {"params": {"filename": f"{uuid.uuid4()}.jpg"}}),
+    ("GET /admin/stats", 1, "GET", "/admin/stats", lambda r: {}),
+]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(sorted_samples: List[float], q: float) -> float:
+    return sorted_samples[min(len(sorted_samples) - 1, int(q * len(sorted_samples)))]
+
+
+def _summarise(samples: List[float], statuses: Dict[int, int], elapsed: float) -> Dict[str, Any]:
+    samples = sorted(samples)
+    ms = lambda v: round(v * 1000, 3)
+    return {
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2),
+        "p50_ms": ms(_percentile(samples, 0.50)),
+        "p95_ms": ms(_percentile(samples, 0.95)),
+        "p99_ms": ms(_percentile(samples, 0.99)),
+        "max_ms": ms(samples[-1]),
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+def _tokens(users: List[str], admin: str) -> Dict[str, str]:
+    from jose import jwt
+
+    exp = int(time.time()) + 24 * 3600
+    tokens = {}
+    for user_id in users:
+        claims = {"sub": user_id, "aud": "authenticated", "email": f"{user_id[:8]}@example.com", "exp": exp}
+        if user_id == admin:
+            claims["app_metadata"] = {"role": "admin"}
+        tokens[user_id] = jwt.encode(claims, JWT_SECRET, algorithm="HS256")
+    return tokens
+
+
+async def run(args) -> Dict[str, Any]:
+    os.environ["SUPABASE_URL"] = "http://supabase.fake"
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+    os.environ["SUPABASE_JWT_SECRET"] = JWT_SECRET
+    os.environ["AUTH_VERIFY_MODE"] = "local"
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    os.environ["DATA_BACKEND"] = "supabase"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    import httpx
+    from benchmarks.fake_supabase import FakeSupabase, install
+
+    fake = FakeSupabase(args.latency_ms, args.jitter_ms, seed=args.seed)
+    users = [str(uuid.UUID(int=random.Random(args.seed + i).getrandbits(128))) for i in range(args.users)]
+    fake.seed(users, args.rows_per_user)
+    install(fake)
+    tokens = _tokens(users, admin=users[0])
+
+    from app.main import app
+
+    names = [name for name, *_ in MIX]
+    weights = [weight for _, weight, *_ in MIX]
+    routes = {name: (method, path, build) for name, _, method, path, build in MIX}
+    samples: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    async def client_loop(client, worker: int, deadline: float, budget: List[int]):
+        rng = random.Random(args.seed * 1000 + worker)
+        user_id = users[worker % len(users)]
+        admin_headers = {"Authorization": f"Bearer {tokens[users[0]]}"}
+        headers = {"Authorization": f"Bearer {tokens[user_id]}"}
+        while time.perf_counter() < deadline and budget[0] > 0:
+            budget[0] -= 1
+            name = rng.choices(names, weights)[0]
+            method, path, build = routes[name]
+            t0 = time.perf_counter()
+            resp = await client.request(method, path, headers=admin_headers if name == "GET /admin/stats" else headers,
+                                        **build(rng))
+            elapsed = time.perf_counter() - t0
+            samples[name].append(elapsed)
+            statuses[name][resp.status_code] += 1
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        clients = [httpx.AsyncClient(transport=transport, base_url="http://loadtest") for _ in range(args.concurrency)]
+        # warm-up: imports, caches and connection setup shouldn't count
+        warm = time.perf_counter() + args.warmup
+        await asyncio.gather(*(client_loop(c, i, warm, [args.requests]) for i, c in enumerate(clients)))
+        samples.clear()
+        statuses.clear()
+        calls_before, busy_before = fake.calls, fake.busy
+
+        started = time.perf_counter()
+        budget = [args.requests]
+        await asyncio.gather(*(
+            client_loop(c, i, started + args.duration, budget) for i, c in enumerate(clients)
+        ))
+        elapsed = time.perf_counter() - started
+        for client in clients:
+            await client.aclose()
+
+    all_samples = [s for route in samples.values() for s in route]
+    all_statuses: Dict[int, int] = defaultdict(int)
+    for route in statuses.values():
+        for code, n in route.items():
+            all_statuses[code] += n
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {
+            "concurrency": args.concurrency, "duration_s": args.duration, "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms, "users": args.users, "rows_per_user": args.rows_per_user, "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "supabase_calls": fake.calls - calls_before,
+        "fake_cpu_s": round(fake.busy - busy_before, 3),
+        "total": _summarise(all_samples, all_statuses, elapsed),
+        "routes": {name: _summarise(samples[name], statuses[name], elapsed) for name in names if samples[name]},
+    }
+
+
+def _print(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]):
+    cfg = results["config"]
+    print(f"commit {results['commit']}  concurrency={cfg['concurrency']}  latency={cfg['latency_ms']}ms"
+          f"  {results['total']['requests']} requests in {results['elapsed_s']}s"
+          f"  ({results['supabase_calls']} Supabase calls, {results['fake_cpu_s']}s of it in the fake)")
+    header = f"{'route':<26}{'req':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>6}"
+    if baseline:
+        header += f"{'Δp95':>9}{'Δreq/s':>9}"
+    print(header)
+    rows = list(results["routes"].items()) + [("TOTAL", results["total"])]
+    for name, r in rows:
+        line = f"{name:<26}{r['requests']:>7}{r['rps']:>9.1f}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['errors']:>6}"
+        old = baseline and (baseline["total"] if name == "TOTAL" else baseline["routes"].get(name))
+        if old:
+            d_p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+            d_rps = (r["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+            line += f"{d_p95:>+8.1f}%{d_rps:>+8.1f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to measure")
+    parser.add_argument("--requests", type=int, default=1_000_000, help="stop after this many requests")
+    parser.add_argument("--warmup", type=float, default=2.0, help="seconds of unmeasured traffic first")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="added to every Supabase call")
+    parser.add_argument("--jitter-ms", type=float, default=2.0, help="random extra latency, 0..jitter")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rows-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", type=Path, help="results file (default benchmarks/results/loadtest-<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results file to diff against")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    _print(results, baseline)
+    out = args.out or RESULTS_DIR / f"loadtest-{results['commit'] or 'unknown'}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2))
+    print(f"results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
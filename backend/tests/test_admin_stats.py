@@ -0,0 +1,34 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.services.admin_stats import AdminStats
+
+
+def test_disabled_without_supabase_counters():
+    stats = AdminStats(60, 120, 30, enabled=False)
+
+    async def scenario():
+        stats.start()
+        assert stats._task is None
+        with pytest.raises(HTTPException) as exc:
+            await stats.get()
+        return exc.value.status_code
+
+    assert asyncio.run(scenario()) == 501
+
+
+def test_failed_refresh_on_request_is_503(monkeypatch):
+    import httpx
+
+    stats = AdminStats(60, 120, 30)
+
+    async def unreachable():
+        raise httpx.ConnectTimeout("supabase unreachable")
+
+    monkeypatch.setattr(stats, "_fetch", unreachable)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(stats.get())
+    assert exc.value.status_code == 503
+    assert stats.refresh_failures == 1
@@ -0,0 +1,48 @@
+import asyncio
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from app.core.config import settings
+from app.services import auth_service
+from conftest import JWT_SECRET, auth, token_for
+
+
+def _claims(user_id="u1"):
+    return {"sub": user_id, "aud": "authenticated", "exp": int(time.time()) + 60}
+
+
+def test_valid_token(client, user_id):
+    assert client.get("/todos/", headers=auth(user_id)).status_code == 200
+    assert asyncio.run(auth_service.verify_token(token_for(user_id)))["sub"] == user_id
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer nope"}])
+def test_missing_or_garbage_token_is_401(client, headers):
+    assert client.get("/todos/", headers=headers).status_code == 401
+
+
+def test_algorithm_is_not_taken_from_the_token(monkeypatch):
+    # an HS512 token signed with a key the JWKS lookup hands back must not verify
+    async def get_key(kid):
+        return JWT_SECRET
+
+    monkeypatch.setattr(auth_service.jwks_cache, "get_key", get_key)
+    token = jwt.encode(_claims(), JWT_SECRET, algorithm="HS512")
+    with pytest.raises(JWTError):
+        asyncio.run(auth_service.verify_token(token))
+
+
+def test_local_mode_without_secret_or_keys_fails_startup(monkeypatch):
+    async def no_keys():
+        auth_service.jwks_cache._keys = {}
+
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", None)
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", False)
+    monkeypatch.setattr(auth_service.jwks_cache, "_refresh", no_keys)
+    with pytest.raises(RuntimeError):
+        asyncio.run(auth_service.check_local_verification())
+
+    monkeypatch.setattr(settings, "AUTH_REMOTE_FALLBACK", True)
+    asyncio.run(auth_service.check_local_verification())
@@ -0,0 +1,90 @@
+from conftest import auth
+
+from app.db.repository import todos_repo
+
+
+def test_batch_create_returns_ids_in_item_order(client, user_id):
+    items = [{"title": f"todo {i}"} for i in range(3)]
+    resp = client.post("/todos/batch", json=items, headers=auth(user_id))
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["succeeded"] == 3
+    titles = {row["id"]: row["title"] for row in client.get("/todos/", headers=auth(user_id)).json()}
+    assert [titles[r["id"]] for r in body["results"]] == ["todo 0", "todo 1", "todo 2"]
+
+
+def test_batch_create_validates_every_item(client, user_id):
+    resp = client.post("/todos/batch", json=[{"title": "ok"}, {"title": ""}], headers=auth(user_id))
+    assert resp.status_code == 422
+
+
+def test_batch_update_is_one_read_and_one_update_per_row(client, fake, user_id, other_user_id):
+    mine = [fake.insert("todos", {"user_id": user_id, "title": f"todo {i}"}) for i in range(3)]
+    theirs = fake.insert("todos", {"user_id": other_user_id, "title": "not yours"})
+    items = [
+        {"id": mine[0]["id"], "completed": True},
+        {"id": mine[1]["id"], "title": "renamed"},
+        {"id": mine[2]["id"], "description": "notes", "completed": True},
+        {"id": theirs["id"], "title": "stolen"},
+        {"id": 999, "title": "missing"},
+        {"id": mine[0]["id"]},
+    ]
+
+    calls = fake.calls
+    resp = client.patch("/todos/batch", json=items, headers=auth(user_id))
+    assert resp.status_code == 200, resp.text
+    assert fake.calls - calls == 1 + 3
+
+    results = resp.json()["results"]
+    assert [r["ok"] for r in results] == [True, True, True, False, False, False]
+    assert results[5]["error"] == "No fields to update"
+    assert [(r["title"], r["completed"], r["description"], r["version"]) for r in mine] == [
+        ("todo 0", True, None, 2), ("renamed", False, None, 2), ("todo 2", True, "notes", 2),
+    ]
+    assert theirs["title"] == "not yours"
+
+
+def test_batch_update_rejects_non_integer_ids(client, fake, user_id):
+    fake.insert("todos", {"user_id": user_id, "title": "todo"})
+    for bad in (True, "1", None):
+        resp = client.patch("/todos/batch", json=[{"id": bad, "completed": True}], headers=auth(user_id))
+        assert resp.status_code == 422
+
+
+def test_batch_update_leaves_trigger_counters_alone(client, fake, user_id):
+    plan = fake.insert("study_plans", {"user_id": user_id, "title": "plan", "todos_total": 4, "todos_done": 1,
+                                       "subject_counts": {"Math": {"total": 4, "done": 1}}})
+    resp = client.patch("/study/batch", json=[{"id": plan["id"], "title": "renamed"}], headers=auth(user_id))
+    assert resp.json()["succeeded"] == 1
+    assert (plan["title"], plan["todos_total"], plan["todos_done"]) == ("renamed", 4, 1)
+
+
+def _after_read(monkeypatch, action):
+    """Runs `action` between batch_update's read and its writes, as a concurrent request would."""
+    read = todos_repo.list
+
+    async def list_then_act(**kwargs):
+        rows = await read(**kwargs)
+        action()
+        return rows
+
+    monkeypatch.setattr(todos_repo, "list", list_then_act)
+
+
+def test_batch_update_does_not_overwrite_a_concurrent_change(client, fake, user_id, monkeypatch):
+    todo = fake.insert("todos", {"user_id": user_id, "title": "todo"})
+    _after_read(monkeypatch, lambda: todo.update(title="edited elsewhere", version=todo["version"] + 1))
+
+    resp = client.patch("/todos/batch", json=[{"id": todo["id"], "completed": True}], headers=auth(user_id))
+    result = resp.json()["results"][0]
+    assert not result["ok"] and "retry" in result["error"]
+    assert (todo["title"], todo["completed"]) == ("edited elsewhere", False)
+
+
+def test_batch_update_does_not_recreate_a_deleted_row(client, fake, user_id, monkeypatch):
+    todo = fake.insert("todos", {"user_id": user_id, "title": "todo"})
+    _after_read(monkeypatch, lambda: fake.delete("todos", [todo]))
+
+    resp = client.patch("/todos/batch", json=[{"id": todo["id"], "completed": True}], headers=auth(user_id))
+    assert resp.json()["failed"] == 1
+    assert fake.tables["todos"] == []
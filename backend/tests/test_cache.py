@@ -0,0 +1,81 @@
+import asyncio
+import json
+
+from pydantic import TypeAdapter
+from starlette.requests import Request
+
+from app.core.cache import MemoryCacheBackend, ResponseCache
+
+ADAPTER = TypeAdapter(list)
+
+
+def _request(path="/marketplace/"):
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": []})
+
+
+class BrokenBackend(MemoryCacheBackend):
+    def __init__(self, fail_on):
+        super().__init__(100, 1 << 20, 60)
+        self.fail_on = fail_on
+
+    async def get_int(self, key):
+        if "get_int" in self.fail_on:
+            raise ConnectionError("redis down")
+        return await super().get_int(key)
+
+    async def set(self, key, value, ttl):
+        if "set" in self.fail_on:
+            raise ConnectionError("redis down")
+        await super().set(key, value, ttl)
+
+
+def _loader(calls, delay=0.0):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        return [{"id": 1}], {"X-Total": "1"}
+    return load
+
+
+def test_backend_errors_fall_through_to_the_loader():
+    for fail_on in ({"get_int"}, {"set"}):
+        cache, calls = ResponseCache(BrokenBackend(fail_on), ttl=60, max_age=30), []
+        resp = asyncio.run(cache.respond(_request(), "items", ADAPTER, _loader(calls)))
+        assert resp.status_code == 200
+        assert json.loads(resp.body) == [{"id": 1}]
+        assert resp.headers["x-total"] == "1"
+        assert calls == [1]
+
+
+def test_concurrent_misses_share_one_load():
+    cache, calls = ResponseCache(MemoryCacheBackend(100, 1 << 20, 60), ttl=60, max_age=30), []
+
+    async def burst():
+        return await asyncio.gather(*(
+            cache.respond(_request(), "items", ADAPTER, _loader(calls, delay=0.01)) for _ in range(10)
+        ))
+
+    responses = asyncio.run(burst())
+    assert calls == [1]
+    assert {resp.body for resp in responses} == {responses[0].body}
+    assert len({resp.headers["etag"] for resp in responses}) == 1
+
+    # now served from the backend
+    asyncio.run(cache.respond(_request(), "items", ADAPTER, _loader(calls)))
+    assert calls == [1]
+
+
+def test_failed_load_reaches_every_waiter_and_caches_nothing():
+    cache = ResponseCache(MemoryCacheBackend(100, 1 << 20, 60), ttl=60, max_age=30)
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    async def burst():
+        return await asyncio.gather(*(
+            cache.respond(_request(), "items", ADAPTER, failing) for _ in range(3)
+        ), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(burst()))
+    assert cache._inflight == {}
@@ -0,0 +1,41 @@
+from conftest import auth
+
+
+def _range(client, start, end):
+    resp = client.get("/events/range", params={"from": start, "to": end})
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def test_finished_series_is_not_read_for_later_ranges(client, fake, user_id):
+    body = {"title": "lecture", "starts_at": "2026-01-05T09:00:00Z", "ends_at": "2026-01-05T10:00:00Z",
+            "rrule": "FREQ=WEEKLY;COUNT=3"}
+    event = client.post("/events/", json=body, headers=auth(user_id)).json()
+    assert event["series_ends_at"] == "2026-01-19T10:00:00Z"
+
+    assert len(_range(client, "2026-01-01T00:00:00Z", "2026-02-01T00:00:00Z")) == 3
+    assert _range(client, "2026-03-01T00:00:00Z", "2026-04-01T00:00:00Z") == []
+
+
+def test_patch_recomputes_series_end(client, user_id):
+    body = {"title": "lecture", "starts_at": "2026-01-05T09:00:00Z", "ends_at": None, "rrule": "FREQ=DAILY;COUNT=2"}
+    event = client.post("/events/", json=body, headers=auth(user_id)).json()
+
+    resp = client.patch(f"/events/{event['id']}", json={"rrule": "FREQ=DAILY"}, headers=auth(user_id))
+    assert resp.json()["series_ends_at"] is None
+    resp = client.patch("/events/batch", json=[{"id": event["id"], "rrule": "FREQ=DAILY;COUNT=4"}], headers=auth(user_id))
+    assert resp.json()["succeeded"] == 1
+    assert client.get(f"/events/{event['id']}").json()["series_ends_at"] == "2026-01-08T09:00:00Z"
+
+
+def test_oversized_series_is_rejected(client, user_id):
+    body = {"title": "spam", "starts_at": "2026-01-05T09:00:00Z", "ends_at": None,
+            "rrule": "FREQ=HOURLY;COUNT=2000000"}
+    assert client.post("/events/", json=body, headers=auth(user_id)).status_code == 422
+
+
+def test_naive_start_with_utc_until(client, user_id):
+    body = {"title": "lecture", "starts_at": "2026-01-05T09:00:00", "ends_at": None, "rrule": "FREQ=DAILY;UNTIL=20260108T000000Z"}
+    resp = client.post("/events/", json=body, headers=auth(user_id))
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["series_ends_at"] == "2026-01-07T09:00:00Z"
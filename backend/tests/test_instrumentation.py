@@ -0,0 +1,28 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.instrumentation import InstrumentationMiddleware
+
+
+def _client(server_timing: bool) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(InstrumentationMiddleware, server_timing=server_timing)
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return TestClient(app)
+
+
+def test_server_timing_is_off_by_default(client):
+    resp = client.get("/")
+    assert "server-timing" not in resp.headers
+    assert resp.headers["x-request-id"]
+
+
+def test_server_timing_when_enabled():
+    resp = _client(server_timing=True).get("/ping", headers={"X-Request-ID": "abc"})
+    assert "total;dur=" in resp.headers["server-timing"]
+    assert resp.headers["x-request-id"] == "abc"
+    assert "server-timing" not in _client(server_timing=False).get("/ping").headers
@@ -0,0 +1,17 @@
+import pytest
+
+from conftest import auth
+
+
+@pytest.mark.parametrize("suffix", ["/../{other}/photo.png", "//photo.png", "/./photo.png", "/", ""])
+def test_image_path_must_stay_in_the_sellers_folder(client, user_id, other_user_id, suffix):
+    body = {"title": "calculator", "price": "10.00", "image_path": user_id + suffix.format(other=other_user_id)}
+    resp = client.post("/marketplace/", json=body, headers=auth(user_id))
+    assert resp.status_code == 400
+
+
+def test_image_path_in_the_sellers_folder(client, user_id):
+    body = {"title": "calculator", "price": "10.00", "image_path": f"{user_id}/listings/photo.png"}
+    resp = client.post("/marketplace/", json=body, headers=auth(user_id))
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["image_path"] == body["image_path"]
@@ -0,0 +1,22 @@
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-me")
+    return "scrape-me"
+
+
+def test_metrics_not_served_without_a_token_configured(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_need_the_token(client, metrics_token):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer nope"}).status_code == 401
+
+    resp = client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert resp.status_code == 200
+    assert "taskhive_" in resp.text
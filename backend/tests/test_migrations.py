@@ -0,0 +1,49 @@
+"""
+app/db/tables.py is the schema at head; upgrading a fresh database through
+every Alembic revision must produce exactly that (on SQLite, which is what
+runs here; on Postgres the revisions also add tables.REVISION_ONLY).
+"""
+import asyncio
+from pathlib import Path
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+
+from app.core.config import settings
+from app.db.sql import build_engine
+from app.db.tables import include_object, metadata
+
+ALEMBIC_DIR = Path(__file__).parents[1] / "app/db/alembic"
+
+
+def _columns(index):
+    # SQLite doesn't reflect "created_at desc"; compare which columns are indexed, in order
+    return [getattr(expr, "name", None) or str(expr).split()[0] for expr in index.expressions]
+
+
+def _real_differences(diff):
+    added = {d[1].name: d[1] for d in diff if d[0] == "add_index"}
+    removed = {d[1].name: d[1] for d in diff if d[0] == "remove_index"}
+    same = {name for name in added.keys() & removed.keys() if _columns(added[name]) == _columns(removed[name])}
+    return [d for d in diff if not (d[0] in ("add_index", "remove_index") and d[1].name in same)]
+
+
+def test_upgrade_to_head_matches_tables(tmp_path, monkeypatch):
+    url = f"sqlite+aiosqlite:///{tmp_path / 'migrated.db'}"
+    monkeypatch.setattr(settings, "DATABASE_URL", url)
+    config = Config()  # no ini file: leave the test run's logging alone
+    config.set_main_option("script_location", str(ALEMBIC_DIR))
+    command.upgrade(config, "head")
+
+    async def diff():
+        engine = build_engine(url)
+        async with engine.connect() as conn:
+            found = await conn.run_sync(lambda sync: compare_metadata(
+                MigrationContext.configure(sync, opts={"include_object": include_object}), metadata
+            ))
+        await engine.dispose()
+        return found
+
+    assert _real_differences(asyncio.run(diff())) == []
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.cache import cache_backend
+from app.core.config import settings
+from app.services import notifications
+from app.services.notifications import InProcessJobQueue, NotificationJob
+
+
+class FlakyNotifier:
+    def __init__(self, ok: bool):
+        self.ok = ok
+        self.sent = []
+        self.closed = False
+
+    async def send_batch(self, jobs):
+        self.sent.extend(job.ref_id for job in jobs)
+        return [self.ok] * len(jobs)
+
+    async def close(self):
+        self.closed = True
+
+
+def _job(ref_id: int) -> NotificationJob:
+    return NotificationJob(kind="todo_due", user_id="u1", ref_id=ref_id, due_at=f"2026-01-01T00:00:0{ref_id}Z", title="t")
+
+
+def test_stop_delivers_queued_jobs_and_closes_the_notifier():
+    notifier = FlakyNotifier(ok=True)
+
+    async def run():
+        queue = InProcessJobQueue(notifier, batch_size=10, batch_wait=0.01)
+        for i in range(3):
+            await queue.enqueue(_job(i))
+        await queue.stop()  # never started: everything is still queued
+
+    asyncio.run(run())
+    assert notifier.sent == [0, 1, 2]
+    assert notifier.closed
+
+
+def test_stop_cancels_pending_retries(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFY_RETRY_BASE_SECONDS", 60.0)
+    notifier = FlakyNotifier(ok=False)
+
+    async def run():
+        queue = InProcessJobQueue(notifier, batch_size=10, batch_wait=0.01)
+        queue.start()
+        await queue.enqueue(_job(7))
+        while not queue._retries:
+            await asyncio.sleep(0.01)
+        retries = set(queue._retries)
+        await queue.stop()
+        return retries, queue._retries
+
+    retries, left = asyncio.run(run())
+    assert all(task.cancelled() for task in retries)
+    assert not left
+    assert notifier.sent == [7]
+
+
+def test_memory_cache_backend_delivers_in_process(fake, user_id, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "NOTIFY_QUEUE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "NOTIFY_BATCH_WAIT_SECONDS", 0.01)
+    notifier = FlakyNotifier(ok=True)
+    monkeypatch.setattr(notifications, "_build_notifier", lambda: notifier)
+    due = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    todo = fake.insert("todos", {"user_id": user_id, "title": "essay", "due_date": due})
+
+    async def run():
+        await cache_backend.delete(notifications.SCAN_LEASE_KEY)
+        service = notifications.build_notification_service()
+        service.start()
+        while not notifier.sent:
+            await asyncio.sleep(0.01)
+        await service.stop()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert notifier.sent == [todo["id"]]
+    assert notifier.closed
+
+
+def test_celery_needs_the_shared_cache(monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_BACKEND", "memory")
+    monkeypatch.setattr(settings, "NOTIFY_QUEUE_BACKEND", "celery")
+    with pytest.raises(RuntimeError):
+        notifications.build_notification_service()
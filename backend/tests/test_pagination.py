@@ -0,0 +1,39 @@
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import Page, decode_cursor, encode_cursor, keyset_bound, keyset_filter, next_cursor_headers
+
+
+def test_cursor_round_trip():
+    value = "2026-01-02T03:04:05.123456+00:00"
+    assert decode_cursor(encode_cursor(value, 42)) == (value, 42)
+
+
+def test_cursor_has_no_padding():
+    assert "=" not in encode_cursor("2026-01-02T03:04:05+00:00", 1)
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "bm90IGpzb24", "WzEsMiwzXQ"])
+def test_bad_cursor_is_400(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor)
+    assert exc.value.status_code == 400
+
+
+def test_keyset_filter_descending():
+    expr = keyset_filter("created_at", True, ("2026-01-02T00:00:00+00:00", 7))
+    assert expr == 'created_at.lt."2026-01-02T00:00:00+00:00",and(created_at.eq."2026-01-02T00:00:00+00:00",id.lt.7)'
+
+
+def test_keyset_filter_ascending_number():
+    assert keyset_filter("price", False, (9.5, 3)) == "price.gt.9.5,and(price.eq.9.5,id.gt.3)"
+
+
+def test_next_cursor_header_only_when_more():
+    assert next_cursor_headers(Page([], None)) == {}
+    assert next_cursor_headers(Page([], "abc")) == {"X-Next-Cursor": "abc"}
+
+
+def test_keyset_bound_matches_direction():
+    assert keyset_bound("created_at", True, ("2026-01-02T00:00:00+00:00", 7)) == ("created_at", "lte", "2026-01-02T00:00:00+00:00")
+    assert keyset_bound("price", False, (9.5, 3)) == ("price", "gte", 9.5)
@@ -0,0 +1,60 @@
+import asyncio
+
+from conftest import auth
+
+from app.core.cache import MemoryCacheBackend
+from app.core.rate_limit import RateLimiter
+
+
+class RecordingBackend(MemoryCacheBackend):
+    def __init__(self):
+        super().__init__(100, 1 << 20, 60)
+        self.calls = []
+
+    async def incr_many(self, amounts, ttl):
+        self.calls.append(list(amounts))
+        return await super().incr_many(amounts, ttl)
+
+
+def test_sync_pushes_only_buckets_with_pending_hits_in_one_call():
+    backend = RecordingBackend()
+    limiter = RateLimiter(backend, 1, shared=True)
+    for _ in range(3):
+        limiter.hit("default", "user:a", 10)
+    limiter.hit("default", "user:b", 10)
+    asyncio.run(limiter.sync())
+    assert len(backend.calls) == 1
+    assert sorted(amount for _, amount in backend.calls[0]) == [1, 3]
+
+    # nothing new locally: no round trip at all
+    asyncio.run(limiter.sync())
+    assert len(backend.calls) == 1
+
+
+def test_sync_debits_what_other_workers_used():
+    backend = RecordingBackend()
+    ours, theirs = RateLimiter(backend, 1, shared=True), RateLimiter(backend, 1, shared=True)
+    ours.hit("default", "user:a", 10)
+    for _ in range(4):
+        theirs.hit("default", "user:a", 10)
+    asyncio.run(theirs.sync())
+    asyncio.run(ours.sync())
+    bucket, _ = ours._buckets[("default", "user:a")]
+    assert 4.9 < bucket.tokens < 5.1
+
+
+def test_token_is_verified_once_per_request(client, user_id, monkeypatch):
+    from app.api import deps
+    from app.core.config import settings
+
+    calls = []
+    verify = deps.verify_token
+
+    async def counting(token):
+        calls.append(token)
+        return await verify(token)
+
+    monkeypatch.setattr(deps, "verify_token", counting)
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    assert client.get("/todos/", headers=auth(user_id)).status_code == 200
+    assert len(calls) == 1
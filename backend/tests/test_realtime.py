@@ -0,0 +1,52 @@
+import asyncio
+
+import orjson
+
+from app.services import realtime
+from app.services.realtime import Hub, RedisRelay
+
+
+class DroppingRedis:
+    """Each pubsub() is one connection; the first ones drop, the last delivers `message` and stays open."""
+
+    def __init__(self, drops: int, message: bytes):
+        self.drops = drops
+        self.message = message
+        self.subscriptions = 0
+        self.closed = 0
+
+    def pubsub(self, **kwargs):
+        redis = self
+
+        class PubSub:
+            async def subscribe(self, channel):
+                redis.subscriptions += 1
+
+            async def listen(self):
+                if redis.subscriptions <= redis.drops:
+                    raise ConnectionError("connection reset by peer")
+                yield {"data": redis.message}
+                await asyncio.Event().wait()
+
+            async def close(self):
+                redis.closed += 1
+
+        return PubSub()
+
+
+def test_relay_resubscribes_after_losing_redis(monkeypatch):
+    monkeypatch.setattr(realtime, "RELAY_RETRY_MIN_SECONDS", 0.01)
+    hub = Hub(buffer_size=10, history_size=10)
+    sub = hub.subscribe(["user:u1"])
+    redis = DroppingRedis(drops=2, message=orjson.dumps({"origin": "other", "channels": ["user:u1"]}) + b"\n{}")
+    relay = RedisRelay(hub, redis)
+
+    async def run():
+        relay.start()
+        while not sub.buffer:
+            await asyncio.sleep(0.01)
+        await relay.stop()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert redis.subscriptions == 3
+    assert redis.closed == 3
@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.recurrence import expand, occurrences, series_end, span_filter, to_utc, validate_rrule
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def event(id, starts_at, ends_at=None, rrule=None):
+    return {"id": id, "title": f"event {id}", "starts_at": starts_at, "ends_at": ends_at, "rrule": rrule}
+
+
+def test_validate_rrule_normalises():
+    assert validate_rrule(None) is None
+    assert validate_rrule("  ") is None
+    assert validate_rrule("RRULE:FREQ=WEEKLY;BYDAY=MO") == "FREQ=WEEKLY;BYDAY=MO"
+
+
+@pytest.mark.parametrize("rule", ["FREQ=MINUTELY", "FREQ=SECONDLY;COUNT=3", "FREQ=NOPE",
+                                  "DTSTART:20260101T000000Z\nRRULE:FREQ=DAILY",
+                                  "FREQ=HOURLY;COUNT=2000000", "FREQ=DAILY;UNTIL=99991231T000000Z"])
+def test_validate_rrule_rejects(rule):
+    with pytest.raises(ValueError):
+        validate_rrule(rule)
+
+
+def test_to_utc_and_span_filter():
+    assert to_utc(datetime(2026, 1, 1)) == utc(2026, 1, 1)
+    assert span_filter(utc(2026, 1, 1), utc(2026, 2, 1)) == ("span", "ov", "[2026-01-01T00:00:00Z,2026-02-01T00:00:00Z)")
+    assert span_filter(utc(2026, 1, 1)) == ("span", "ov", "[2026-01-01T00:00:00Z,)")
+
+
+def test_single_event_passes_through():
+    row = event(1, "2026-01-05T10:00:00+00:00", "2026-01-05T11:00:00+00:00")
+    assert list(occurrences(row, utc(2026, 1, 1), utc(2026, 2, 1))) == [(utc(2026, 1, 5, 10), row)]
+
+
+def test_occurrences_in_window_keep_duration():
+    row = event(1, "2026-01-01T10:00:00+00:00", "2026-01-01T11:30:00+00:00", "FREQ=DAILY")
+    got = [occ for _, occ in occurrences(row, utc(2026, 1, 10), utc(2026, 1, 13))]
+    assert [occ["starts_at"] for occ in got] == [
+        "2026-01-10T10:00:00+00:00", "2026-01-11T10:00:00+00:00", "2026-01-12T10:00:00+00:00",
+    ]
+    assert got[0]["ends_at"] == "2026-01-10T11:30:00+00:00"
+    assert all(occ["id"] == 1 for occ in got)
+
+
+def test_occurrence_still_running_at_window_start_is_included():
+    row = event(1, "2026-01-01T23:00:00+00:00", "2026-01-02T01:00:00+00:00", "FREQ=DAILY")
+    starts = [start for start, _ in occurrences(row, utc(2026, 1, 5), utc(2026, 1, 6))]
+    assert starts == [utc(2026, 1, 4, 23), utc(2026, 1, 5, 23)]
+
+
+def test_count_ends_the_series():
+    row = event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=WEEKLY;COUNT=3")
+    assert len(list(occurrences(row, utc(2026, 1, 1), utc(2027, 1, 1)))) == 3
+
+
+def test_expand_merges_series_in_start_order():
+    rows = [
+        event(1, "2026-01-01T09:00:00+00:00", None, "FREQ=DAILY"),
+        event(2, "2026-01-02T08:00:00+00:00", "2026-01-02T08:30:00+00:00"),
+        event(3, "2026-01-02T12:00:00+00:00", None, "FREQ=DAILY;COUNT=2"),
+    ]
+
+    async def source():
+        for row in rows:
+            yield row
+
+    async def collect():
+        return [(occ["id"], occ["starts_at"]) async for occ in expand(source(), utc(2026, 1, 1), utc(2026, 1, 4))]
+
+    assert asyncio.run(collect()) == [
+        (1, "2026-01-01T09:00:00+00:00"),
+        (2, "2026-01-02T08:00:00+00:00"),
+        (1, "2026-01-02T09:00:00+00:00"),
+        (3, "2026-01-02T12:00:00+00:00"),
+        (1, "2026-01-03T09:00:00+00:00"),
+        (3, "2026-01-03T12:00:00+00:00"),
+    ]
+
+
+def test_series_end():
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00")) is None
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=DAILY")) is None
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", "2026-01-01T11:00:00+00:00", "FREQ=WEEKLY;COUNT=3")) \
+        == "2026-01-15T11:00:00+00:00"
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=DAILY;UNTIL=20260105T000000Z")) \
+        == "2026-01-04T10:00:00+00:00"
+    # naive starts_at is UTC, so it can be paired with a UTC UNTIL
+    assert series_end(event(1, "2026-01-01T10:00:00", None, "FREQ=DAILY;UNTIL=20260105T000000Z")) \
+        == "2026-01-04T10:00:00+00:00"
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=MONTHLY;BYDAY=MO;BYSETPOS=1;COUNT=3")) \
+        == "2026-03-02T10:00:00+00:00"
+
+
+def test_series_end_of_long_series_is_exact():
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=HOURLY;UNTIL=21000101T053000Z")) \
+        == "2100-01-01T05:00:00+00:00"
+    assert series_end(event(1, "2026-01-01T10:00:00+00:00", None, "FREQ=HOURLY;INTERVAL=3;COUNT=5000")) \
+        == "2027-09-18T07:00:00+00:00"
+
+
+def test_windows_far_into_a_series_match_a_fresh_expansion():
+    row = event(1, "2020-01-01T10:00:00+00:00", None, "FREQ=DAILY;BYHOUR=10,18")
+    for month in (1, 6, 12):
+        got = [start for start, _ in occurrences(row, utc(2026, month, 1), utc(2026, month, 3))]
+        assert got == [utc(2026, month, 1, 10), utc(2026, month, 1, 18), utc(2026, month, 2, 10), utc(2026, month, 2, 18)]
+
+
+def test_window_long_after_dtstart_starts_near_the_window():
+    row = event(1, "1900-01-01T00:30:00+00:00", "1900-01-01T01:00:00+00:00", "FREQ=HOURLY;INTERVAL=5")
+    got = [start for start, _ in occurrences(row, utc(2026, 3, 1), utc(2026, 3, 2))]
+    first = utc(1900, 1, 1, 0, 30)
+    assert got and all((start - first).total_seconds() % (5 * 3600) == 0 for start in got)
+    assert [start.hour for start in got] == [(got[0].hour + 5 * i) % 24 for i in range(len(got))]
+    assert got[0] - utc(2026, 3, 1) < timedelta(hours=5) and len(got) == 5
+
+
+def test_expansion_is_bounded():
+    row = event(1, "1900-01-06T10:00:00+00:00", None, "FREQ=MONTHLY;BYDAY=SA,SU;BYHOUR=1,2,3")
+    assert list(occurrences(row, utc(2026, 3, 1), utc(2026, 3, 2))) == []
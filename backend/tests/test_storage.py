@@ -0,0 +1,56 @@
+import pytest
+from conftest import auth
+
+from app.services.storage_service import storage_signer
+
+
+@pytest.fixture(autouse=True)
+def _fresh_url_cache():
+    storage_signer.url_cache.clear()
+
+
+def test_download_urls_for_own_files(client, fake, user_id):
+    paths = [f"{user_id}/a.jpg", f"{user_id}/docs/b.pdf"]
+    resp = client.post("/storage/download-urls", json={"paths": paths}, headers=auth(user_id))
+    assert resp.status_code == 200, resp.text
+    assert all(resp.json()["urls"][path] for path in paths)
+
+    calls = fake.calls
+    again = client.post("/storage/download-urls", json={"paths": paths}, headers=auth(user_id))
+    assert again.json() == resp.json()
+    assert fake.calls == calls
+
+
+@pytest.mark.parametrize("suffix", ["../{other}/x.jpg", "./x.jpg", "a//x.jpg", ""])
+def test_download_urls_reject_paths_climbing_out(client, user_id, other_user_id, suffix):
+    path = f"{user_id}/" + suffix.format(other=other_user_id)
+    resp = client.post("/storage/download-urls", json={"paths": [path]}, headers=auth(user_id))
+    assert resp.status_code == 400
+
+
+def test_download_urls_of_another_user_are_forbidden(client, user_id, other_user_id):
+    resp = client.post("/storage/download-urls", json={"paths": [f"{other_user_id}/x.jpg"]}, headers=auth(user_id))
+    assert resp.status_code == 403
+
+
+def test_cached_download_url_keeps_most_of_its_expiry(client, user_id, monkeypatch):
+    ttls = []
+    set_ = storage_signer.url_cache.set
+
+    def recording_set(key, value, ttl, size):
+        ttls.append(ttl)
+        set_(key, value, ttl, size=size)
+
+    monkeypatch.setattr(storage_signer.url_cache, "set", recording_set)
+    resp = client.post("/storage/download-urls", json={"paths": [f"{user_id}/a.jpg"], "expires_in": 120},
+                       headers=auth(user_id))
+    assert resp.status_code == 200
+    assert ttls == [60]
+
+
+def test_resumable_session_carries_upload_length(client, user_id):
+    resp = client.post("/storage/uploads/resumable", json={"filename": "big.mov", "size": 50_000_000},
+                       headers=auth(user_id))
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["headers"]["Upload-Length"] == "50000000"
+    assert resp.json()["path"] == f"{user_id}/big.mov"
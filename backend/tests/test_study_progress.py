@@ -0,0 +1,103 @@
+import asyncio
+import importlib.util
+import json
+from pathlib import Path
+
+from sqlalchemy import text
+
+from app.core.cache import cache_backend
+from app.db import sql
+from app.services import study_progress as module
+from app.services.study_progress import REPAIR_LEASE_KEY, StudyProgressRepair
+
+USER = "00000000-0000-0000-0000-000000000001"
+
+
+def _revision(filename: str):
+    path = Path(__file__).parents[1] / "app/db/alembic/versions" / filename
+    spec = importlib.util.spec_from_file_location(f"revision_{path.stem}", path)
+    revision = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(revision)
+    return revision
+
+
+def _sqlite_triggers():
+    guard = _revision("0005_study_progress_guard.py").SQLITE_TRIGGER
+    return [*_revision("0003_study_progress.py").SQLITE_TRIGGERS.values(), guard]
+
+
+def test_sqlite_triggers_and_recount_agree(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql, "_engine", sql.build_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"))
+    repair = StudyProgressRepair(0)
+
+    async def scenario():
+        await sql.create_all()
+        async with sql.get_engine().begin() as conn:
+            for ddl in _sqlite_triggers():
+                await conn.execute(text(ddl))
+            insert_plan = "INSERT INTO study_plans (user_id, title, subjects) VALUES (:u, 'p', '[]') RETURNING id"
+            plan = (await conn.execute(text(insert_plan), {"u": USER})).scalar_one()
+            # inserted out of alphabetical order, unlike the recount's GROUP BY
+            insert_todo = "INSERT INTO todos (user_id, title, study_plan_id, subject) VALUES (:u, 't', :p, :s)"
+            for subject in ("math", "art", "bio"):
+                await conn.execute(text(insert_todo), {"u": USER, "p": plan, "s": subject})
+            await conn.execute(text("DELETE FROM todos WHERE subject = 'bio'"))
+            counts = (await conn.execute(text("SELECT subject_counts FROM study_plans"))).scalar_one()
+        untouched = await repair.run_once()
+        async with sql.get_engine().begin() as conn:
+            await conn.execute(text("UPDATE study_plans SET todos_total = 9"))
+        drifted = await repair.run_once()
+        async with sql.get_engine().begin() as conn:
+            total = (await conn.execute(text("SELECT todos_total FROM study_plans"))).scalar_one()
+        await sql.get_engine().dispose()
+        return json.loads(counts), untouched, drifted, total
+
+    monkeypatch.setattr(module.settings, "DATA_BACKEND", "sql")
+    counts, untouched, drifted, total = asyncio.run(scenario())
+    assert counts == {"math": {"total": 1, "done": 0}, "art": {"total": 1, "done": 0}}
+    assert (untouched, drifted, total) == (0, 1, 2)
+
+
+def test_progress_of_plans_with_todos_follows_them(tmp_path, monkeypatch):
+    monkeypatch.setattr(sql, "_engine", sql.build_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}"))
+
+    async def scenario():
+        await sql.create_all()
+        async with sql.get_engine().begin() as conn:
+            for ddl in _sqlite_triggers():
+                await conn.execute(text(ddl))
+            insert_plan = "INSERT INTO study_plans (user_id, title, subjects) VALUES (:u, :t, '[]') RETURNING id"
+            linked = (await conn.execute(text(insert_plan), {"u": USER, "t": "linked"})).scalar_one()
+            await conn.execute(text("INSERT INTO study_plans (user_id, title, subjects) VALUES (:u, 'free', '[]')"),
+                               {"u": USER})
+            insert_todo = "INSERT INTO todos (user_id, title, study_plan_id, completed) VALUES (:u, 't', :p, :c)"
+            for completed in (True, False):
+                await conn.execute(text(insert_todo), {"u": USER, "p": linked, "c": completed})
+            await conn.execute(text("UPDATE study_plans SET progress = 90, status = 'paused'"))
+            rows = await conn.execute(text("SELECT title, progress, status FROM study_plans ORDER BY title"))
+            result = [tuple(row) for row in rows]
+        await sql.get_engine().dispose()
+        return result
+
+    assert asyncio.run(scenario()) == [("free", 90, "paused"), ("linked", 50, "active")]
+
+
+def test_only_the_lease_holder_recounts(monkeypatch):
+    runs = []
+    repair = StudyProgressRepair(0.01)
+
+    async def run_once():
+        runs.append(1)
+        return 0
+
+    monkeypatch.setattr(repair, "run_once", run_once)
+
+    async def scenario():
+        await cache_backend.add(REPAIR_LEASE_KEY, 60)  # another worker holds it
+        repair.start()
+        await asyncio.sleep(0.05)
+        await repair.stop()
+        await cache_backend.delete(REPAIR_LEASE_KEY)
+
+    asyncio.run(scenario())
+    assert runs == []
@@ -0,0 +1,26 @@
+import asyncio
+
+from app.db import supabase_client
+
+
+def test_fallback_closes_the_unused_http_client(monkeypatch):
+    async def broken(*args, **kwargs):
+        raise RuntimeError("no async client")
+
+    monkeypatch.setattr(supabase_client, "_async_client", None)
+    monkeypatch.setattr(supabase_client, "_http_client", None)
+    monkeypatch.setattr(supabase_client, "acreate_client", broken)
+    monkeypatch.setattr(supabase_client, "create_client", lambda url, key: "sync client")
+    built = []
+    build = supabase_client._build_http_client
+
+    def recording_build():
+        built.append(build())
+        return built[-1]
+
+    monkeypatch.setattr(supabase_client, "_build_http_client", recording_build)
+
+    asyncio.run(supabase_client.init_supabase_client())
+    assert supabase_client.get_global_supabase() == "sync client"
+    assert supabase_client._http_client is None
+    assert built[0].is_closed
@@ -0,0 +1,41 @@
+import asyncio
+import io
+
+from PIL import Image
+
+from app.services.blob_store import LocalBlobStore
+from app.services.thumbnails import ThumbnailService
+from app.utils.media import derivative_path
+
+
+def _jpeg(width: int, height: int) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 80, 40)).save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_drain_writes_every_derivative(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    service = ThumbnailService(store, [100, 400, 1000], ["webp", "avif"], 1, max_source_bytes=1 << 20, max_age=60)
+    original = "u1/photo.jpg"
+
+    async def run():
+        await store.write("public", original, _jpeg(800, 600), "image/jpeg", 60)
+        assert service.enqueue("public", original)
+        assert not service.enqueue("public", original)
+        await service.drain()
+
+    asyncio.run(run())
+    for width, size in ((100, (100, 75)), (400, (400, 300)), (1000, (800, 600))):  # never upscaled
+        for fmt in ("webp", "avif"):
+            with Image.open(tmp_path / "public" / derivative_path(original, width, fmt)) as img:
+                assert (img.format.lower(), img.size) == (fmt, size)
+    assert service.generated == 6
+
+
+def test_missing_original_is_skipped(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    service = ThumbnailService(store, [100], ["webp"], 1, max_source_bytes=1 << 20, max_age=60)
+    service.enqueue("public", "u1/gone.jpg")
+    asyncio.run(service.drain())
+    assert (service.generated, service.skipped) == (0, 1)
@@ -0,0 +1,89 @@
+from conftest import auth
+
+
+def _create(client, user_id, **fields):
+    resp = client.post("/todos/", json={"title": "read chapter 5", **fields}, headers=auth(user_id))
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+def test_create_and_get(client, user_id):
+    todo = _create(client, user_id, description="graphs")
+
+    resp = client.get(f"/todos/{todo['id']}", headers=auth(user_id))
+    assert resp.status_code == 200
+    assert resp.json() == todo
+    assert resp.headers["etag"]
+
+
+def test_other_users_todo_is_not_found(client, user_id, other_user_id):
+    todo = _create(client, user_id)
+
+    assert client.get(f"/todos/{todo['id']}", headers=auth(other_user_id)).status_code == 404
+    resp = client.patch(f"/todos/{todo['id']}", json={"completed": True}, headers=auth(other_user_id))
+    assert resp.status_code == 404
+
+
+def test_delete_of_someone_elses_todo_is_404_and_publishes_nothing(client, fake, user_id, other_user_id, monkeypatch):
+    from app.api.routers import todos
+
+    published = []
+
+    async def record(*args, **kwargs):
+        published.append((args, kwargs))
+
+    todo = _create(client, user_id)
+    monkeypatch.setattr(todos, "publish_change", record)
+
+    resp = client.delete(f"/todos/{todo['id']}", headers=auth(other_user_id))
+    assert resp.status_code == 404
+    assert published == []
+    assert [row["id"] for row in fake.tables["todos"]] == [todo["id"]]
+
+    assert client.delete(f"/todos/{todo['id']}", headers=auth(user_id)).status_code == 204
+    assert published == [(("todos", "delete", user_id), {"ids": [todo["id"]]})]
+    assert fake.tables["todos"] == []
+
+
+def test_delete_missing_todo_is_404(client, user_id):
+    assert client.delete("/todos/999", headers=auth(user_id)).status_code == 404
+
+
+def test_cursor_pages_cover_every_todo_once(client, fake, user_id):
+    # equal created_at values exercise the id tie-breaker
+    for i in range(7):
+        fake.insert("todos", {"user_id": user_id, "title": f"todo {i}", "created_at": f"2026-01-0{1 + i // 2}T00:00:00+00:00"})
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/todos/", params=params, headers=auth(user_id))
+        assert resp.status_code == 200
+        seen.extend(row["id"] for row in resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    assert seen == [7, 6, 5, 4, 3, 2, 1]
+
+
+def test_invalid_cursor_is_400(client, user_id):
+    resp = client.get("/todos/", params={"cursor": "not-a-cursor"}, headers=auth(user_id))
+    assert resp.status_code == 400
+
+
+def test_patch_etag_chains_as_if_match(client, user_id):
+    todo = _create(client, user_id)
+    url, headers = f"/todos/{todo['id']}", auth(user_id)
+    etag = client.get(url, headers=headers).headers["etag"]
+
+    first = client.patch(url, json={"title": "first"}, headers={**headers, "If-Match": etag})
+    assert first.status_code == 200, first.text
+    assert first.headers["etag"] == client.get(url, headers=headers).headers["etag"]
+
+    second = client.patch(url, json={"title": "second"}, headers={**headers, "If-Match": first.headers["etag"]})
+    assert second.status_code == 200, second.text
+    assert second.json()["version"] == todo["version"] + 2
+
+    stale = client.patch(url, json={"title": "third"}, headers={**headers, "If-Match": first.headers["etag"]})
+    assert stale.status_code == 412